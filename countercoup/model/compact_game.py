@@ -0,0 +1,706 @@
+from countercoup.model.action import Action
+from countercoup.model.card import Card
+from countercoup.model.game import Game
+from countercoup.model.exceptions import IllegalMoveException, IllegalGameException
+from countercoup.model.items.cards import Captain, Assassin, Contessa, Duke, Ambassador
+from countercoup.model.items.states import SelectAction, DecideToBlock, DecideToCounteract, SelectCardsToDiscard\
+    , GameFinished, DecideToBlockCounteract, SelectCardToLose
+from countercoup.model.items.actions import Income, ForeignAid, Coup, Tax, Assassinate, Exchange, Steal
+from random import shuffle
+
+
+class CompactGame:
+    """
+    A compact model for the card game Coup. Plays by exactly the same rules as Game, but the whole game state is
+    packed into a single bytearray, so that cloning a game is a single buffer copy
+    """
+
+    __slots__ = ['buffer']
+
+    # Cards, actions and states are stored by their index in these lists. The cards are in the same order as the
+    # deck in Game, so that shuffling gives the same deck for the same random seed
+    cards = [Duke, Contessa, Captain, Assassin, Ambassador]
+    actions = [Income, ForeignAid, Coup, Tax, Assassinate, Exchange, Steal]
+    states = [SelectAction, DecideToBlock, DecideToCounteract, SelectCardsToDiscard, GameFinished
+              , DecideToBlockCounteract, SelectCardToLose]
+
+    _card_index = {x: n for n, x in enumerate(cards)}
+    _action_index = {x: n for n, x in enumerate(actions)}
+    _state_index = {x: n for n, x in enumerate(states)}
+
+    # Value stored in place of None
+    NONE = 255
+
+    # Offsets of the game fields in the buffer
+    NUM_OF_PLAYERS = 0
+    STATE = 1
+    CURRENT_PLAYER = 2
+    ACTION_PLAYER = 3
+    ATTACK_PLAYER = 4
+    COUNTERACT_PLAYER = 5
+    WINNING_PLAYER = 6
+    CURRENT_ACTION = 7
+    LOSE_CARD_STATE = 8
+    LOSE_CARD_PLAYER = 9
+    DECK_SIZE = 10
+    DECK = 11
+    PLAYERS = 26
+
+    # Offsets of the fields for each player, relative to the start of the player. The hand is kept in the same
+    # order as in Game, padded with NONE, with room for the two cards drawn during an exchange
+    PLAYER_SIZE = 11
+    HAND = 0
+    HAND_SIZE = 4
+    DISCARD = 4
+    COINS = 9
+    IN_GAME = 10
+
+    # Offsets of the fields in each history record, relative to the start of the record. The current history
+    # follows the players, and committed history records are appended to the end of the buffer
+    HISTORY_SIZE = 8
+    H_ACTION = 0
+    H_ACTION_PLAYER = 1
+    H_ATTACKING_PLAYER = 2
+    H_BLOCKING_PLAYER = 3
+    H_BLOCK_SUCCESSFUL = 4
+    H_COUNTERACTING_PLAYER = 5
+    H_COUNTERACT_BLOCK_PLAYER = 6
+    H_COUNTERACT_BLOCK_SUCCESSFUL = 7
+
+    def __init__(self, num_of_players: int = None, buffer: bytearray = None):
+
+        if buffer is not None:
+            self.buffer = buffer
+            return
+
+        if num_of_players is None or num_of_players < 2 or num_of_players > 6:
+            raise IllegalGameException("Number of players must be between 2 and 6")
+
+        deck = bytearray([0, 1, 2, 3, 4] * 3)
+        shuffle(deck)
+
+        b = bytearray(self.__history_start(num_of_players))
+        b[self.NUM_OF_PLAYERS] = num_of_players
+        b[self.STATE] = self._state_index[SelectAction]
+        b[self.CURRENT_PLAYER] = 0
+        b[self.ACTION_PLAYER] = 0
+        b[self.ATTACK_PLAYER:self.DECK_SIZE] = bytes([self.NONE] * (self.DECK_SIZE - self.ATTACK_PLAYER))
+
+        for x in range(num_of_players):
+            p = self.PLAYERS + x * self.PLAYER_SIZE
+            b[p + self.HAND:p + self.HAND + self.HAND_SIZE] = bytes([deck[2 * x], deck[2 * x + 1]
+                                                                     , self.NONE, self.NONE])
+            b[p + self.COINS] = 2
+            b[p + self.IN_GAME] = 1
+
+        remaining = deck[2 * num_of_players:]
+        b[self.DECK_SIZE] = len(remaining)
+        b[self.DECK:self.DECK + len(remaining)] = remaining
+
+        ch = self.__current_history(num_of_players)
+        b[ch:ch + self.HISTORY_SIZE] = bytes([self.NONE] * self.HISTORY_SIZE)
+
+        self.buffer = b
+
+    @classmethod
+    def __current_history(cls, num_of_players: int) -> int:
+        """
+        Return the offset of the current history record
+        :param num_of_players: the number of players in the game
+        :return: the offset in the buffer
+        """
+        return cls.PLAYERS + num_of_players * cls.PLAYER_SIZE
+
+    @classmethod
+    def __history_start(cls, num_of_players: int) -> int:
+        """
+        Return the offset of the first committed history record
+        :param num_of_players: the number of players in the game
+        :return: the offset in the buffer
+        """
+        return cls.PLAYERS + num_of_players * cls.PLAYER_SIZE + cls.HISTORY_SIZE
+
+    @classmethod
+    def from_game(cls, g: Game):
+        """
+        Pack a Game into a CompactGame
+        :param g: the Game to pack
+        :return: the CompactGame with the same state
+        """
+
+        def val(x, index=None):
+            if x is None:
+                return cls.NONE
+            elif index is not None:
+                return index[x]
+            else:
+                return int(x)
+
+        def history_record(h):
+            if h is None:
+                return [cls.NONE] * cls.HISTORY_SIZE
+
+            return [val(h.action, cls._action_index)
+                    , val(h.action_player)
+                    , val(h.attacking_player)
+                    , val(h.blocking_player)
+                    , val(h.block_successful)
+                    , val(h.counteracting_player)
+                    , val(h.counteract_block_player)
+                    , val(h.counteract_block_successful)]
+
+        b = bytearray(cls.__history_start(len(g.players)))
+        b[cls.NUM_OF_PLAYERS] = len(g.players)
+        b[cls.STATE] = cls._state_index[g.state]
+        b[cls.CURRENT_PLAYER] = val(g.current_player)
+        b[cls.ACTION_PLAYER] = val(g.action_player)
+        b[cls.ATTACK_PLAYER] = val(g.attack_player)
+        b[cls.COUNTERACT_PLAYER] = val(g.counteract_player)
+        b[cls.WINNING_PLAYER] = val(g.winning_player)
+        b[cls.CURRENT_ACTION] = val(g.current_action, cls._action_index)
+        b[cls.LOSE_CARD_STATE] = val(g.lose_card_state, cls._state_index)
+        b[cls.LOSE_CARD_PLAYER] = val(g.lose_card_player)
+        b[cls.DECK_SIZE] = len(g.deck)
+        b[cls.DECK:cls.DECK + len(g.deck)] = bytes([cls._card_index[x] for x in g.deck])
+
+        for num, player in enumerate(g.players):
+            p = cls.PLAYERS + num * cls.PLAYER_SIZE
+
+            b[p + cls.HAND:p + cls.HAND + cls.HAND_SIZE] = bytes([cls._card_index[c] for c in player.cards]
+                                                                 + [cls.NONE] * (cls.HAND_SIZE - len(player.cards)))
+
+            for c in player.discard:
+                b[p + cls.DISCARD + cls._card_index[c]] += 1
+
+            b[p + cls.COINS] = player.coins
+            b[p + cls.IN_GAME] = 1 if player.in_game else 0
+
+        ch = cls.__current_history(len(g.players))
+        b[ch:ch + cls.HISTORY_SIZE] = bytes(history_record(g.current_history))
+
+        for h in g.history:
+            b += bytes(history_record(h))
+
+        return cls(buffer=b)
+
+    def clone(self):
+        """
+        Clone the game
+        :return: an independent copy of the game
+        """
+        return CompactGame(buffer=self.buffer[:])
+
+    def snapshot(self) -> bytes:
+        """
+        Take a snapshot of the game state, which can later be rolled back to using restore()
+        :return: the snapshot
+        """
+        return bytes(self.buffer)
+
+    def restore(self, snapshot: bytes):
+        """
+        Roll the game back to a snapshot taken with snapshot()
+        :param snapshot: the snapshot to restore
+        """
+        self.buffer = bytearray(snapshot)
+
+    def __get(self, offset: int):
+        val = self.buffer[offset]
+        return None if val == self.NONE else val
+
+    @property
+    def state(self):
+        return self.states[self.buffer[self.STATE]]
+
+    @property
+    def current_player(self):
+        return self.__get(self.CURRENT_PLAYER)
+
+    @property
+    def action_player(self):
+        return self.__get(self.ACTION_PLAYER)
+
+    @property
+    def attack_player(self):
+        return self.__get(self.ATTACK_PLAYER)
+
+    @property
+    def counteract_player(self):
+        return self.__get(self.COUNTERACT_PLAYER)
+
+    @property
+    def winning_player(self):
+        return self.__get(self.WINNING_PLAYER)
+
+    @property
+    def current_action(self):
+        val = self.buffer[self.CURRENT_ACTION]
+        return None if val == self.NONE else self.actions[val]
+
+    def get_cards(self, player: int) -> []:
+        """
+        Get the cards in a players hand
+        :param player: the player ID
+        :return: a list of cards
+        """
+
+        return [self.cards[x] for x in self.__hand(player)]
+
+    def get_coins(self, player: int) -> int:
+        """
+        Get the number of coins a player has
+        :param player: the player ID
+        :return: the number of coins
+        """
+        return self.buffer[self.PLAYERS + player * self.PLAYER_SIZE + self.COINS]
+
+    def is_in_game(self, player: int) -> bool:
+        """
+        Check if a player is still in the game
+        :param player: the player ID
+        :return: True if the player is in the game
+        """
+        return self.buffer[self.PLAYERS + player * self.PLAYER_SIZE + self.IN_GAME] == 1
+
+    def get_opponents(self):
+        """
+        Return a list of opponents to the current player
+        :return: the list of opponents
+        """
+        return [n for n in range(self.buffer[self.NUM_OF_PLAYERS]) if n != self.buffer[self.CURRENT_PLAYER]]
+
+    def get_game_length(self):
+        """
+        Get the length of the game so far
+        :return: the number of rounds in the game
+        """
+        return (len(self.buffer) - self.__history_start(self.buffer[self.NUM_OF_PLAYERS])) // self.HISTORY_SIZE
+
+    def __player(self, player: int) -> int:
+        return self.PLAYERS + player * self.PLAYER_SIZE
+
+    def __hand(self, player: int) -> bytearray:
+        """
+        Get the card indexes in a players hand, in order
+        :param player: the player ID
+        :return: a copy of the hand, which can be changed and written back with __set_hand
+        """
+
+        h = self.__player(player) + self.HAND
+        hand = self.buffer[h:h + self.HAND_SIZE]
+        return hand[:hand.index(self.NONE)] if self.NONE in hand else hand
+
+    def __set_hand(self, player: int, hand: bytearray):
+        h = self.__player(player) + self.HAND
+        self.buffer[h:h + self.HAND_SIZE] = hand + bytes([self.NONE] * (self.HAND_SIZE - len(hand)))
+
+    def __set_history(self, field: int, val: int):
+        self.buffer[self.__current_history(self.buffer[self.NUM_OF_PLAYERS]) + field] = val
+
+    def __commit_history(self):
+        """
+        Append the current history to the history, and clear the current history
+        """
+
+        b = self.buffer
+        ch = self.__current_history(b[self.NUM_OF_PLAYERS])
+        b += b[ch:ch + self.HISTORY_SIZE]
+        b[ch:ch + self.HISTORY_SIZE] = bytes([self.NONE] * self.HISTORY_SIZE)
+
+    def __draw_card(self, player: int):
+        """
+        Move the top card of the deck into a players hand
+        :param player: the player drawing the card
+        """
+
+        b = self.buffer
+        size = b[self.DECK_SIZE]
+        card = b[self.DECK]
+
+        b[self.DECK:self.DECK + size - 1] = b[self.DECK + 1:self.DECK + size]
+        b[self.DECK + size - 1] = 0
+        b[self.DECK_SIZE] = size - 1
+
+        hand = self.__hand(player)
+        hand.append(card)
+        self.__set_hand(player, hand)
+
+    def __return_card(self, player: int, card: int):
+        """
+        Move a card from a players hand to the bottom of the deck
+        :param player: the player returning the card
+        :param card: the card index
+        """
+
+        hand = self.__hand(player)
+        hand.remove(card)
+        self.__set_hand(player, hand)
+
+        b = self.buffer
+        b[self.DECK + b[self.DECK_SIZE]] = card
+        b[self.DECK_SIZE] += 1
+
+    def __shuffle_deck(self):
+        b = self.buffer
+        deck = b[self.DECK:self.DECK + b[self.DECK_SIZE]]
+        shuffle(deck)
+        b[self.DECK:self.DECK + b[self.DECK_SIZE]] = deck
+
+    def __next_player(self, player_id):
+        """
+        Return the next active player
+        :param player_id: the current player ID
+        :return: the next active player ID. If all players are non-active, return NONE
+        """
+
+        b = self.buffer
+        num_of_players = b[self.NUM_OF_PLAYERS]
+
+        for x in range(1, num_of_players + 1):
+            next_player = (player_id + x) % num_of_players
+            if b[self.PLAYERS + next_player * self.PLAYER_SIZE + self.IN_GAME]:
+                return next_player
+
+        return self.NONE
+
+    def __play_action(self):
+        """
+        Play the current action, and either move to the next player or end the game
+        """
+
+        b = self.buffer
+        action = self.actions[b[self.CURRENT_ACTION]]
+        action_player = b[self.ACTION_PLAYER]
+        coins = self.__player(action_player) + self.COINS
+
+        if action == Exchange:
+            b[self.STATE] = self._state_index[SelectCardsToDiscard]
+            b[self.CURRENT_PLAYER] = action_player
+        else:
+            b[self.STATE] = self._state_index[SelectAction]
+            b[self.ACTION_PLAYER] = self.__next_player(action_player)
+            b[self.CURRENT_PLAYER] = b[self.ACTION_PLAYER]
+
+        # Do the action depending on the action selected.
+        if action == Income:
+            b[coins] += 1
+        elif action == ForeignAid:
+            b[coins] += 2
+        elif action == Tax:
+            b[coins] += 3
+        elif action in [Coup, Assassinate]:
+            self.__lose_card(b[self.ATTACK_PLAYER])
+        elif action == Steal:
+            attack_coins = self.__player(b[self.ATTACK_PLAYER]) + self.COINS
+            steal_value = min([2, b[attack_coins]])
+            b[coins] += steal_value
+            b[attack_coins] -= steal_value
+        elif action == Exchange:
+            self.__shuffle_deck()
+            self.__draw_card(action_player)
+            self.__draw_card(action_player)
+
+        self.__commit_history()
+        b[self.CURRENT_ACTION] = self.NONE
+        b[self.ATTACK_PLAYER] = self.NONE
+        b[self.COUNTERACT_PLAYER] = self.NONE
+
+    def select_action(self, action: Action, attack_player: int = None):
+        """
+        Play an action, and either play the action (if no-one can block or counteract it), or move
+        to the block/counteract stage
+        :param action: the action to be played
+        :param attack_player: the player to be attacked, if playing Coup, Assassinate or Steal
+        """
+
+        b = self.buffer
+
+        if b[self.STATE] != self._state_index[SelectAction]:
+            raise IllegalMoveException("Not at correct state to play this")
+
+        coins = self.__player(b[self.ACTION_PLAYER]) + self.COINS
+
+        # If we don't have enough coins, we can't play the action
+        if b[coins] - action.cost < 0:
+            raise IllegalMoveException("Too few coins to play this action")
+
+        # If we have ten or more coins, we can only Coup
+        if b[coins] >= 10 and action != Coup:
+            raise IllegalMoveException("Too many coins, can only Coup")
+
+        b[self.CURRENT_ACTION] = self._action_index[action]
+
+        ch = self.__current_history(b[self.NUM_OF_PLAYERS])
+        b[ch:ch + self.HISTORY_SIZE] = bytes([self.NONE] * self.HISTORY_SIZE)
+        b[ch + self.H_ACTION] = self._action_index[action]
+        b[ch + self.H_ACTION_PLAYER] = b[self.CURRENT_PLAYER]
+
+        if action.attack_action:
+            if attack_player is None:
+                raise IllegalMoveException("Need attacked player for this action")
+            elif not b[self.__player(attack_player) + self.IN_GAME]:
+                raise IllegalMoveException("Attacked player not in game")
+            else:
+                b[self.ATTACK_PLAYER] = attack_player
+                b[ch + self.H_ATTACKING_PLAYER] = attack_player
+
+        # Player pays up.
+        b[self.__player(b[self.CURRENT_PLAYER]) + self.COINS] -= action.cost
+
+        # If the current action cannot be blocked or counteracted, then jump straight to playing the action
+        if action.c_action_cards == [] and action.action_card is None:
+            self.__play_action()
+        # If this is not a character action, then jump straight to the counteraction stage
+        elif action.action_card is None:
+            self.__determine_counteract()
+        # Else move onto the blocking stage
+        else:
+            b[self.STATE] = self._state_index[DecideToBlock]
+            b[self.CURRENT_PLAYER] = self.__next_player(b[self.ACTION_PLAYER])
+
+    def decide_to_block(self, decision: bool):
+        """
+        Make the decision to block. If true, then either the current player or the blocking player is losing
+        a card!
+        :param decision: the decision to block or not.
+        """
+
+        b = self.buffer
+
+        if b[self.STATE] != self._state_index[DecideToBlock]:
+            raise IllegalMoveException("Not at correct state to play this")
+
+        action_player = b[self.ACTION_PLAYER]
+
+        if decision:
+            action = self.actions[b[self.CURRENT_ACTION]]
+            action_card = self._card_index[action.action_card]
+            self.__set_history(self.H_BLOCKING_PLAYER, b[self.CURRENT_PLAYER])
+
+            if action_card in self.__hand(action_player):
+                # The block was unsuccessful - the challenging player loses a card, and the action player swaps
+                # the action card for a new one
+                self.__set_history(self.H_BLOCK_SUCCESSFUL, 0)
+
+                self.__return_card(action_player, action_card)
+                self.__shuffle_deck()
+                self.__draw_card(action_player)
+
+                self.__lose_card(b[self.CURRENT_PLAYER])
+            else:
+                self.__set_history(self.H_BLOCK_SUCCESSFUL, 1)
+                b[self.STATE] = self._state_index[SelectAction]
+
+                # If block successful, any costs are returned to the action player
+                b[self.__player(action_player) + self.COINS] += action.cost
+
+                self.__lose_card(action_player)
+
+        else:
+            b[self.CURRENT_PLAYER] = self.__next_player(b[self.CURRENT_PLAYER])
+
+            if b[self.CURRENT_PLAYER] == action_player:
+                self.__determine_counteract()
+
+    def __determine_counteract(self):
+        """
+        Determine what to do when we move to the counteract stage
+        """
+
+        b = self.buffer
+        action = self.actions[b[self.CURRENT_ACTION]]
+        attack_player = b[self.ATTACK_PLAYER]
+
+        if not action.c_action_cards \
+                or (attack_player != self.NONE and not b[self.__player(attack_player) + self.IN_GAME]):
+            self.__play_action()
+        elif attack_player != self.NONE:
+            b[self.STATE] = self._state_index[DecideToCounteract]
+            b[self.CURRENT_PLAYER] = attack_player
+        else:
+            b[self.STATE] = self._state_index[DecideToCounteract]
+            b[self.CURRENT_PLAYER] = self.__next_player(b[self.ACTION_PLAYER])
+
+    def decide_to_counteract(self, decision: bool):
+        """
+        Decide if the current player should counteract or not
+        :param decision: the decision to counteract
+        """
+
+        b = self.buffer
+
+        if b[self.STATE] != self._state_index[DecideToCounteract]:
+            raise IllegalMoveException("Not at correct state to play this")
+
+        current_player = b[self.CURRENT_PLAYER]
+
+        if decision:
+            b[self.STATE] = self._state_index[DecideToBlockCounteract]
+            self.__set_history(self.H_COUNTERACTING_PLAYER, current_player)
+            b[self.COUNTERACT_PLAYER] = current_player
+            b[self.CURRENT_PLAYER] = self.__next_player(current_player)
+        else:
+            if b[self.ATTACK_PLAYER] != self.NONE or self.__next_player(current_player) == b[self.ACTION_PLAYER]:
+                b[self.COUNTERACT_PLAYER] = self.NONE
+                self.__play_action()
+            else:
+                b[self.CURRENT_PLAYER] = self.__next_player(current_player)
+
+    def decide_to_block_counteract(self, decision: bool):
+        """
+        Decide if the current player should block a declared counteraction
+        :param decision: the decision to block the counteraction
+        """
+
+        b = self.buffer
+
+        if b[self.STATE] != self._state_index[DecideToBlockCounteract]:
+            raise IllegalMoveException("Not at correct state to play this")
+
+        counteract_player = b[self.COUNTERACT_PLAYER]
+
+        if decision:
+            self.__set_history(self.H_COUNTERACT_BLOCK_PLAYER, b[self.CURRENT_PLAYER])
+            c_action_cards = [x for x in self.__hand(counteract_player)
+                              if self.cards[x] in self.actions[b[self.CURRENT_ACTION]].c_action_cards]
+
+            if c_action_cards:
+                self.__set_history(self.H_COUNTERACT_BLOCK_SUCCESSFUL, 0)
+
+                self.__return_card(counteract_player, c_action_cards[0])
+                self.__shuffle_deck()
+                self.__draw_card(counteract_player)
+
+                self.__commit_history()
+
+                self.__lose_card(b[self.CURRENT_PLAYER])
+
+            else:
+                b[self.STATE] = self._state_index[DecideToCounteract]
+                self.__set_history(self.H_COUNTERACT_BLOCK_SUCCESSFUL, 1)
+
+                self.__lose_card(counteract_player)
+
+        else:
+            b[self.CURRENT_PLAYER] = self.__next_player(b[self.CURRENT_PLAYER])
+
+            if b[self.CURRENT_PLAYER] == counteract_player:
+                self.__commit_history()
+
+                b[self.STATE] = self._state_index[SelectAction]
+                b[self.CURRENT_ACTION] = self.NONE
+                b[self.COUNTERACT_PLAYER] = self.NONE
+                b[self.ACTION_PLAYER] = self.__next_player(b[self.ACTION_PLAYER])
+                b[self.CURRENT_PLAYER] = b[self.ACTION_PLAYER]
+
+    def __lose_card(self, player: int):
+        """
+        Begin process of player losing card. Either put game in state of picking card to lose, or lose only card
+        and leaves the game
+        :param player: the player thats losing a card
+        """
+
+        b = self.buffer
+        p = self.__player(player)
+
+        if b[p + self.IN_GAME]:
+            b[self.LOSE_CARD_STATE] = b[self.STATE]
+            b[self.LOSE_CARD_PLAYER] = b[self.CURRENT_PLAYER]
+            b[self.CURRENT_PLAYER] = player
+            b[self.STATE] = self._state_index[SelectCardToLose]
+
+            hand = self.__hand(player)
+            if len(hand) == 1:
+                self.select_card_to_lose(self.cards[hand[0]])
+
+    def __determine_winner(self):
+        """
+        Determine if there is a winner
+        :return: the winner! None if there isn't a winner.
+        """
+
+        players_in_game = [x for x in range(self.buffer[self.NUM_OF_PLAYERS]) if self.is_in_game(x)]
+
+        if len(players_in_game) == 1:
+            return players_in_game[0]
+        else:
+            return None
+
+    def select_card_to_lose(self, card: Card):
+        """
+        If the player is losing a card, determine which card to lose. Also used to determine if the game is finished
+        :param card: the card that the player is discarding
+        """
+
+        b = self.buffer
+
+        if b[self.STATE] != self._state_index[SelectCardToLose]:
+            raise IllegalMoveException("Not at correct state to play this")
+
+        p = self.__player(b[self.CURRENT_PLAYER])
+        c = self._card_index[card]
+        hand = self.__hand(b[self.CURRENT_PLAYER])
+
+        if c not in hand:
+            raise IllegalMoveException("You can't lose a card you don't already have")
+
+        hand.remove(c)
+        self.__set_hand(b[self.CURRENT_PLAYER], hand)
+        b[p + self.DISCARD + c] += 1
+
+        # If the cards are empty for the player, the player is out of the game
+        if not hand:
+            b[p + self.IN_GAME] = 0
+
+        winner = self.__determine_winner()
+        if winner is not None:
+            b[self.STATE] = self._state_index[GameFinished]
+            b[self.WINNING_PLAYER] = winner
+            self.__commit_history()
+        else:
+            lose_card_state = self.states[b[self.LOSE_CARD_STATE]]
+
+            if lose_card_state == DecideToBlock:
+                self.__determine_counteract()
+            elif lose_card_state in [SelectAction, DecideToBlockCounteract]:
+                b[self.ACTION_PLAYER] = self.__next_player(b[self.ACTION_PLAYER])
+                b[self.CURRENT_PLAYER] = b[self.ACTION_PLAYER]
+                b[self.STATE] = self._state_index[SelectAction]
+                b[self.COUNTERACT_PLAYER] = self.NONE
+            elif lose_card_state == DecideToCounteract:
+                if b[self.ATTACK_PLAYER] != self.NONE \
+                        or self.__next_player(b[self.COUNTERACT_PLAYER]) == b[self.ACTION_PLAYER]:
+                    self.__play_action()
+                else:
+                    b[self.STATE] = self._state_index[DecideToCounteract]
+                    b[self.CURRENT_PLAYER] = self.__next_player(b[self.COUNTERACT_PLAYER])
+            else:
+                b[self.STATE] = b[self.LOSE_CARD_STATE]
+                b[self.CURRENT_PLAYER] = b[self.LOSE_CARD_PLAYER]
+
+    def select_cards_to_discard(self, card1: Card, card2: Card):
+        """
+        When playing Ambassador, select the cards that the player is NOT keeping in their hand
+        :param card1: the first card to discard
+        :param card2: the second card to discard
+        """
+
+        b = self.buffer
+
+        if b[self.STATE] != self._state_index[SelectCardsToDiscard]:
+            raise IllegalMoveException("Not at correct state to play this")
+
+        action_player = b[self.ACTION_PLAYER]
+        hand = self.__hand(action_player)
+        c1 = self._card_index[card1]
+        c2 = self._card_index[card2]
+
+        if c1 not in hand or c2 not in hand or (c1 == c2 and hand.count(c1) < 2):
+            raise IllegalMoveException("You can't lose a card you don't already have")
+
+        self.__return_card(action_player, c1)
+        self.__return_card(action_player, c2)
+
+        b[self.STATE] = self._state_index[SelectAction]
+        b[self.ACTION_PLAYER] = self.__next_player(action_player)
+        b[self.CURRENT_PLAYER] = b[self.ACTION_PLAYER]
@@ -9,6 +9,7 @@ from countercoup.model.items.actions import Income, ForeignAid, Coup, Tax, Assas
 from countercoup.model.history import History
 from countercoup.model.game_info import GameInfoSet
 from random import shuffle
+from copy import copy
 
 
 class Game(GameInfoSet):
@@ -45,6 +46,60 @@ class Game(GameInfoSet):
         self.history = []
         self.current_history = None
 
+    def snapshot(self) -> tuple:
+        """
+        Take a snapshot of the game state, which can later be rolled back to using restore(). Much cheaper than a
+        deepcopy, as History objects are never changed once they are committed to the history list
+        :return: a tuple holding the game state
+        """
+
+        return (self.state
+                , self.current_player
+                , self.action_player
+                , self.attack_player
+                , self.counteract_player
+                , self.winning_player
+                , self.current_action
+                , self.counteract_card
+                , self.lose_card_state
+                , self.lose_card_player
+                , [(p.coins, p.cards.copy(), p.in_game, p.discard.copy()) for p in self.players]
+                , self.deck.copy()
+                , len(self.history)
+                , copy(self.current_history))
+
+    def restore(self, snapshot: tuple):
+        """
+        Roll the game back to a snapshot taken with snapshot(). A snapshot can be restored any number of times,
+        so that sibling actions can be explored in place
+        :param snapshot: the snapshot to restore
+        """
+
+        (self.state
+         , self.current_player
+         , self.action_player
+         , self.attack_player
+         , self.counteract_player
+         , self.winning_player
+         , self.current_action
+         , self.counteract_card
+         , self.lose_card_state
+         , self.lose_card_player
+         , players
+         , deck
+         , history_length
+         , current_history) = snapshot
+
+        for player, (coins, cards, in_game, discard) in zip(self.players, players):
+            player.coins = coins
+            player.cards = cards.copy()
+            player.in_game = in_game
+            player.discard = discard.copy()
+
+        self.deck = deck.copy()
+        del self.history[history_length:]
+        self.current_history = copy(current_history)
+
     def __next_player(self, player_id):
         """
         Return the next active player
@@ -245,7 +300,7 @@ class Game(GameInfoSet):
             raise IllegalMoveException("Not at correct state to play this")
 
         if decision:
-            self.current_history.counteract_player = self.current_player
+            self.current_history.counteract_block_player = self.current_player
             both_cards = [x for x in self.get_counteract_player().cards if x in self.current_action.c_action_cards]
 
             if both_cards:
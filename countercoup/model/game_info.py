@@ -15,6 +15,9 @@ class GameInfoSet:
     current_action = None
     current_history = None
 
+    # Encoder used by Infoset to incrementally encode the history
+    history_encoder = None
+
     def get_curr_player(self):
         """
         Get the current player
@@ -1,25 +1,27 @@
 from countercoup.model.game import GameInfoSet
+from numpy import ndarray
 
 
 class Agent:
     """
-    Base class for agents
+    Base class for agents. Strategies are arrays of probabilities over the outputs of the network used for each
+    decision (see Outputs)
     """
 
-    def get_action_strategy(self, g: GameInfoSet) -> dict:
+    def get_action_strategy(self, g: GameInfoSet) -> ndarray:
         pass
 
-    def get_block_strategy(self, g: GameInfoSet) -> dict:
+    def get_block_strategy(self, g: GameInfoSet) -> ndarray:
         pass
 
-    def get_counteract_strategy(self, g: GameInfoSet) -> dict:
+    def get_counteract_strategy(self, g: GameInfoSet) -> ndarray:
         pass
 
-    def get_block_counteract_strategy(self, g: GameInfoSet) -> dict:
+    def get_block_counteract_strategy(self, g: GameInfoSet) -> ndarray:
         pass
 
-    def get_lose_card_strategy(self, g: GameInfoSet) -> dict:
+    def get_lose_card_strategy(self, g: GameInfoSet) -> ndarray:
         pass
 
-    def get_discard_strategy(self, g: GameInfoSet) -> dict:
+    def get_discard_strategy(self, g: GameInfoSet) -> ndarray:
         pass
@@ -1,7 +1,7 @@
 from countercoup.player.agent import Agent
 from countercoup.model.game_info import GameInfoSet
-from countercoup.model.hand import Hand
 from countercoup.shared.tools import Tools
+from numpy import ndarray, array
 
 
 class Aggressive(Agent):
@@ -9,24 +9,23 @@ class Aggressive(Agent):
     An agent that is more aggressive than a Random agent
     """
 
-    def get_action_strategy(self, g: GameInfoSet) -> dict:
-        actions = Tools.get_actions(g)
-        return {x: 1 / len(actions) for x in actions}
+    def get_action_strategy(self, g: GameInfoSet) -> ndarray:
+        actions = Tools.get_action_mask(g)
+        return actions / actions.sum()
 
-    def get_block_strategy(self, g: GameInfoSet) -> dict:
-        return {True: 0.75, False: 0.25}
+    def get_block_strategy(self, g: GameInfoSet) -> ndarray:
+        return array([0.75, 0.25])
 
-    def get_counteract_strategy(self, g: GameInfoSet) -> dict:
-        return {True: 0.75, False: 0.25}
+    def get_counteract_strategy(self, g: GameInfoSet) -> ndarray:
+        return array([0.75, 0.25])
 
-    def get_block_counteract_strategy(self, g: GameInfoSet) -> dict:
-        return {True: 0.75, False: 0.25}
+    def get_block_counteract_strategy(self, g: GameInfoSet) -> ndarray:
+        return array([0.75, 0.25])
 
-    def get_lose_card_strategy(self, g: GameInfoSet) -> dict:
-        hands = Hand.get_singular_hands(g.get_curr_player().cards)
-        return {x: 1 / len(hands) for x in hands}
-
-    def get_discard_strategy(self, g: GameInfoSet) -> dict:
-        hands = Hand.get_all_hands(g.get_curr_player().cards)
-        return {x: 1 / len(hands) for x in hands}
+    def get_lose_card_strategy(self, g: GameInfoSet) -> ndarray:
+        hands = Tools.get_lose_mask(g.get_curr_player().cards)
+        return hands / hands.sum()
 
+    def get_discard_strategy(self, g: GameInfoSet) -> ndarray:
+        hands = Tools.get_discard_mask(g.get_curr_player().cards)
+        return hands / hands.sum()
@@ -1,9 +1,9 @@
-from countercoup.shared.net_group import NetworkGroup
+from countercoup.shared.numpy_group import NumpyNetworkGroup
 from countercoup.shared.tools import Tools
 from countercoup.shared.infoset import Infoset
 from countercoup.player.agent import Agent
 from countercoup.model.game_info import GameInfoSet
-from countercoup.model.hand import Hand
+from numpy import ndarray, ones, where, maximum
 
 
 class CounterCoup(Agent):
@@ -11,23 +11,55 @@ class CounterCoup(Agent):
     Agent that plays according to our CounterCoup networks
     """
 
-    def __init__(self, file_path):
-        self.net_group = NetworkGroup(file_path)
+    def __init__(self, file_path, cache_size: int = 100000):
+        """
+        Load the networks
+        :param file_path: the path of a saved NetworkGroup, or of one exported with NetworkGroup.export. Exported
+                          groups are run in Numpy, without importing TensorFlow
+        :param cache_size: the number of outputs cached in front of each Keras network, 0 for no caches. Exported
+                           groups aren't cached - a Numpy query costs about as much as looking up its cache key
+        """
 
-    def get_action_strategy(self, g: GameInfoSet) -> dict:
-        return Tools.normalise(self.net_group.action.get_output(Infoset(g), Tools.get_actions(g)))
+        if NumpyNetworkGroup.is_export(file_path):
+            self.net_group = NumpyNetworkGroup(file_path)
+        else:
+            # Only pull in TensorFlow when it's needed
+            from countercoup.shared.net_group import NetworkGroup
+            self.net_group = NetworkGroup(file_path)
 
-    def get_block_strategy(self, g: GameInfoSet) -> dict:
-        return Tools.normalise(self.net_group.block.get_output(Infoset(g)))
+            if cache_size > 0:
+                self.net_group.enable_cache(cache_size)
 
-    def get_counteract_strategy(self, g: GameInfoSet) -> dict:
-        return Tools.normalise(self.net_group.counteract.get_output(Infoset(g)))
+    def get_action_strategy(self, g: GameInfoSet) -> ndarray:
+        return self.get_strategy(self.net_group.action, g, Tools.get_action_mask(g))
 
-    def get_block_counteract_strategy(self, g: GameInfoSet) -> dict:
-        return Tools.normalise(self.net_group.block.get_output(Infoset(g)))
+    def get_block_strategy(self, g: GameInfoSet) -> ndarray:
+        return self.get_strategy(self.net_group.block, g)
 
-    def get_lose_card_strategy(self, g: GameInfoSet) -> dict:
-        return Tools.normalise(self.net_group.lose.get_output(Infoset(g), Hand.get_singular_hands(g.get_curr_player().cards)))
+    def get_counteract_strategy(self, g: GameInfoSet) -> ndarray:
+        return self.get_strategy(self.net_group.counteract, g)
 
-    def get_discard_strategy(self, g: GameInfoSet) -> dict:
-        return Tools.normalise(self.net_group.lose.get_output(Infoset(g), Hand.get_all_hands(g.get_curr_player().cards)))
+    def get_block_counteract_strategy(self, g: GameInfoSet) -> ndarray:
+        return self.get_strategy(self.net_group.block, g)
+
+    def get_lose_card_strategy(self, g: GameInfoSet) -> ndarray:
+        return self.get_strategy(self.net_group.lose, g, Tools.get_lose_mask(g.get_curr_player().cards))
+
+    def get_discard_strategy(self, g: GameInfoSet) -> ndarray:
+        return self.get_strategy(self.net_group.lose, g, Tools.get_discard_mask(g.get_curr_player().cards))
+
+    @staticmethod
+    def get_strategy(network, g: GameInfoSet, mask: ndarray = None) -> ndarray:
+        """
+        Get the strategy from a strategy network, restricted to the allowed outputs
+        :param network: the strategy network, a Network or NumpyNetwork
+        :param g: the game
+        :param mask: the outputs that are allowed, as a boolean array. Defaults to all of them
+        :return: the normalised strategy
+        """
+
+        if mask is None:
+            mask = ones(len(network.outputs), dtype=bool)
+
+        # The networks approximate a strategy, so can stray slightly below zero
+        return Tools.normalise(where(mask, maximum(network.get_output_vector(Infoset(g, network.uses_history)), 0), 0), mask)
@@ -1,7 +1,8 @@
 from countercoup.player.agent import Agent
 from countercoup.model.game_info import GameInfoSet
-from countercoup.model.hand import Hand
+from countercoup.shared.outputs import Outputs
 from countercoup.shared.tools import Tools
+from numpy import ndarray, array
 
 
 class Timid(Agent):
@@ -9,29 +10,29 @@ class Timid(Agent):
     Agent that never bluffs, and never blocks, but always counteracts if it has the card
     """
 
-    def get_action_strategy(self, g: GameInfoSet) -> dict:
-        actions = [x for x in Tools.get_actions(g)
-                   if x[0].action_card in g.get_curr_player().cards or x[0].action_card is None]
-        return {x: 1 / len(actions) for x in actions}
+    def get_action_strategy(self, g: GameInfoSet) -> ndarray:
+        cards = g.get_curr_player().cards
+        actions = Tools.get_action_mask(g) & array([x[0].action_card in cards or x[0].action_card is None
+                                                    for x in Outputs.action])
+        return actions / actions.sum()
 
-    def get_block_strategy(self, g: GameInfoSet) -> dict:
-        return {True: 0, False: 1}
+    def get_block_strategy(self, g: GameInfoSet) -> ndarray:
+        return array([0., 1.])
 
-    def get_counteract_strategy(self, g: GameInfoSet) -> dict:
+    def get_counteract_strategy(self, g: GameInfoSet) -> ndarray:
         cards = [x for x in g.current_action.c_action_cards if x in g.get_curr_player().cards]
         if cards:
-            return {True: 1, False: 0}
+            return array([1., 0.])
         else:
-            return {True: 0, False: 1}
+            return array([0., 1.])
 
-    def get_block_counteract_strategy(self, g: GameInfoSet) -> dict:
-        return {True: 0, False: 1}
+    def get_block_counteract_strategy(self, g: GameInfoSet) -> ndarray:
+        return array([0., 1.])
 
-    def get_lose_card_strategy(self, g: GameInfoSet) -> dict:
-        hands = Hand.get_singular_hands(g.get_curr_player().cards)
-        return {x: 1 / len(hands) for x in hands}
-
-    def get_discard_strategy(self, g: GameInfoSet) -> dict:
-        hands = Hand.get_all_hands(g.get_curr_player().cards)
-        return {x: 1 / len(hands) for x in hands}
+    def get_lose_card_strategy(self, g: GameInfoSet) -> ndarray:
+        hands = Tools.get_lose_mask(g.get_curr_player().cards)
+        return hands / hands.sum()
 
+    def get_discard_strategy(self, g: GameInfoSet) -> ndarray:
+        hands = Tools.get_discard_mask(g.get_curr_player().cards)
+        return hands / hands.sum()
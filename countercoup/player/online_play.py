@@ -4,6 +4,7 @@ from countercoup.model.player import Player
 from countercoup.model.history import History
 from countercoup.model.items.cards import Duke, Assassin, Ambassador, Captain, Contessa
 from countercoup.model.items.actions import Income, ForeignAid, Coup, Tax, Assassinate, Exchange, Steal
+from countercoup.shared.outputs import Outputs
 from countercoup.shared.tools import Tools
 from random import sample
 from socketio.client import Client
@@ -105,11 +106,12 @@ class OnlinePlay:
         """Select an action and send it to the server"""
 
         strategy = self.agent.get_action_strategy(self.game)
-        action = Tools.select_from_strategy(strategy)
+        action = Outputs.action[Tools.select_from_strategy(strategy)]
 
         self._log.info("Selecting action")
         self._log.info("Obtained strategy: {strat}"
-                       .format(strat={(self._action_map[x[0]], x[1]): strategy[x] for x in strategy}))
+                       .format(strat={(self._action_map[x[0]], x[1]): strategy[n]
+                                      for n, x in enumerate(Outputs.action) if strategy[n] > 0}))
         self._log.info("Selected action: {action}, attack: {attack}"
                        .format(action=self._action_map[action[0]], attack=action[1]))
 
@@ -135,10 +137,11 @@ class OnlinePlay:
             self.game.attack_player = self.names.index(payload["target"])
 
         strategy = self.agent.get_block_strategy(self.game)
-        decision = Tools.select_from_strategy(strategy)
+        decision = Outputs.block_counteract[Tools.select_from_strategy(strategy)]
 
         self._log.info("Making block decision")
-        self._log.info("Obtained strategy: {strat}".format(strat=strategy))
+        self._log.info("Obtained strategy: {strat}"
+                       .format(strat=dict(zip(Outputs.block_counteract, strategy))))
         self._log.info("Decision: {dec}".format(dec="not blocked" if not decision else "blocked"))
 
         self.client.emit("g-challengeDecision"
@@ -155,11 +158,12 @@ class OnlinePlay:
             return
 
         strategy = self.agent.get_lose_card_strategy(self.game)
-        decision = Tools.select_from_strategy(strategy).card1
+        decision = Outputs.lose[Tools.select_from_strategy(strategy)].card1
 
         self._log.info("Selecting card to lose")
         self._log.info("Obtained strategy: {strat}"
-                       .format(strat={self._card_map[x.card1]: strategy[x] for x in strategy}))
+                       .format(strat={self._card_map[x.card1]: strategy[n]
+                                      for n, x in enumerate(Outputs.lose) if strategy[n] > 0}))
         self._log.info("Decision: {dec}".format(dec=self._card_map[decision]))
 
         self.client.emit("g-chooseInfluenceDecision"
@@ -181,11 +185,12 @@ class OnlinePlay:
             card = action.action_card
         else:
             strategy = self.agent.get_lose_card_strategy(self.game)
-            card = Tools.select_from_strategy(strategy).card1
+            card = Outputs.lose[Tools.select_from_strategy(strategy)].card1
 
             self._log.info("Selecting card to lose")
             self._log.info("Obtained strategy: {strat}"
-                           .format(strat={self._card_map[x.card1]: strategy[x] for x in strategy}))
+                           .format(strat={self._card_map[x.card1]: strategy[n]
+                                          for n, x in enumerate(Outputs.lose) if strategy[n] > 0}))
             self._log.info("Decision: {dec}".format(dec=self._card_map[card]))
 
         self.client.emit("g-revealDecision", {"revealedCard": self._card_map[card]
@@ -207,11 +212,12 @@ class OnlinePlay:
         self.game.get_curr_player().cards.append(cards[1])
 
         strategy = self.agent.get_discard_strategy(self.game)
-        decision = Tools.select_from_strategy(strategy)
+        decision = Outputs.lose[Tools.select_from_strategy(strategy)]
 
         self._log.info("Selecting cards to discard")
         self._log.info("Obtained strategy: {strat}"
-                       .format(strat={(self._card_map[h.card1], self._card_map[h.card2]): strategy[h] for h in strategy}))
+                       .format(strat={(self._card_map[h.card1], self._card_map[h.card2]): strategy[n]
+                                      for n, h in enumerate(Outputs.lose) if strategy[n] > 0}))
         self._log.info("Cards to discard: {card1}, {card2}"
                        .format(card1=self._card_map[decision.card1], card2=self._card_map[decision.card2]))
 
@@ -240,10 +246,11 @@ class OnlinePlay:
             self.game.attack_player = self.names.index(payload["target"])
 
         strategy = self.agent.get_counteract_strategy(self.game)
-        decision = Tools.select_from_strategy(strategy)
+        decision = Outputs.block_counteract[Tools.select_from_strategy(strategy)]
 
         self._log.info("Making counteraction decision")
-        self._log.info("Obtained strategy: {strat}".format(strat=strategy))
+        self._log.info("Obtained strategy: {strat}"
+                       .format(strat=dict(zip(Outputs.block_counteract, strategy))))
         self._log.info("Decision: {dec}".format(dec="not counteracted" if not decision else "counteracted"))
 
         if decision:
@@ -284,10 +291,11 @@ class OnlinePlay:
             self.game.attack_player = self.names.index(payload["prevAction"]["target"])
 
         strategy = self.agent.get_block_strategy(self.game)
-        decision = Tools.select_from_strategy(strategy)
+        decision = Outputs.block_counteract[Tools.select_from_strategy(strategy)]
 
         self._log.info("Making counteraction block decision")
-        self._log.info("Obtained strategy: {strat}".format(strat=strategy))
+        self._log.info("Obtained strategy: {strat}"
+                       .format(strat=dict(zip(Outputs.block_counteract, strategy))))
         self._log.info("Decision: {dec}".format(dec="not blocked" if not decision else "blocked"))
 
         if decision:
@@ -0,0 +1,247 @@
+from countercoup.shared.sample_encoding import SampleEncoding
+from numpy import zeros, array, arange, repeat, cumsum, frombuffer, unique, where, int64, uint16, float32
+from numpy.random import default_rng
+
+
+class ArrayMemory:
+    """
+    Memory for the trainer, utilising reservoir sampling, with the samples stored in contiguous preallocated
+    Numpy arrays rather than a list of tuples. History vectors are ragged, so the packed rows of every history are
+    kept in a single row pool, which is compacted when it fills up. The histories of a sample are kept one after
+    the other, so each sample only needs one offset into the pool
+    """
+
+    def __init__(self, size: int, row_capacity: int = None):
+        """
+        Set up the memory. The arrays are allocated when the first sample is added, as that gives their widths
+        :param size: the number of samples held in the reservoir
+        :param row_capacity: the initial number of history rows held in the row pool
+        """
+
+        self.size = size
+        self.counter = 0
+        self.length = 0
+        self.row_capacity = row_capacity if row_capacity is not None else 8 * size
+        self.rows_used = 0
+
+        self.fixed = None
+        self.targets = None
+        self.iterations = None
+        self.hist_offsets = None
+        self.hist_lengths = None
+        self.rows = None
+
+        # Order the samples are read in, set by shuffle
+        self.order = None
+
+        self.rng = default_rng()
+
+    def _allocate(self, name: str, shape: tuple, dtype):
+        """
+        Allocate one of the storage arrays
+        :param name: the name of the array
+        :param shape: the shape of the array
+        :param dtype: the type of the array
+        :return: the new array
+        """
+        return zeros(shape, dtype=dtype)
+
+    def __setup(self, item: tuple):
+        """
+        Allocate the storage arrays, using the first sample to get the widths and types
+        :param item: a sample, as returned by Network.create_train_data
+        """
+
+        fixed = item[0][0]
+        num_of_histories = len(item[0]) - 1
+
+        self.fixed = self._allocate('fixed', (self.size, fixed.shape[1]), fixed.dtype)
+        self.targets = self._allocate('targets', (self.size, item[1].shape[1]), item[1].dtype)
+        self.iterations = self._allocate('iterations', (self.size,), item[2].dtype)
+        self.hist_offsets = self._allocate('hist_offsets', (self.size,), int64)
+        self.hist_lengths = self._allocate('hist_lengths', (self.size, num_of_histories), uint16)
+        self.rows = self._allocate('rows', (self.row_capacity,), item[0][1].dtype)
+
+    def add(self, item):
+        """
+        Add to the reservoir
+        :param item: the item being added
+        """
+        self.add_bulk([item])
+
+    def add_bulk(self, items: []):
+        """
+        Add many items to the reservoir. The reservoir slot for every item is drawn at once, and only the
+        items that make it into the reservoir are copied in
+        :param items: the [item] being added
+        """
+
+        if not items:
+            return
+
+        self.order = None
+
+        if self.fixed is None:
+            self.__setup(items[0])
+
+        counters = self.counter + arange(len(items))
+
+        # Fill up the reservoir first, and after that each item replaces a random slot with probability
+        # size / (counter + 1)
+        slots = counters.copy()
+        full = counters >= self.size
+        slots[full] = (self.rng.random(full.sum()) * (counters[full] + 1)).astype(int64)
+
+        keep = slots < self.size
+        item_index = arange(len(items))[keep]
+        slots = slots[keep]
+
+        # If two items land in the same slot, the later one wins
+        slots, last = unique(slots[::-1], return_index=True)
+        item_index = item_index[::-1][last]
+
+        self.counter += len(items)
+        self.length = min(self.counter, self.size)
+
+        if len(slots) == 0:
+            return
+
+        # The samples are small, so copying them in is dominated by the cost per array rather than per byte. Their
+        # bytes are joined into a single buffer for each field instead, which is several times faster than
+        # concatenating the arrays. Samples from Network.create_train_data are always contiguous
+        kept = [items[x] for x in item_index.tolist()]
+        inputs = [x[0] for x in kept]
+
+        self.fixed[slots] = self.__join([x[0] for x in inputs], self.fixed).reshape(len(kept), -1)
+        self.targets[slots] = self.__join([x[1] for x in kept], self.targets).reshape(len(kept), -1)
+        self.iterations[slots] = self.__join([x[2] for x in kept], self.iterations)
+
+        histories = [h for x in inputs for h in x[1:]]
+        lengths = array([h.size for h in histories], dtype=int64).reshape(len(kept), -1)
+
+        totals = lengths.sum(axis=1)
+        self.__reserve_rows(int(totals.sum()))
+
+        self.rows[self.rows_used:self.rows_used + totals.sum()] = self.__join(histories, self.rows)
+        self.hist_offsets[slots] = self.rows_used + cumsum(totals) - totals
+        self.hist_lengths[slots] = lengths
+        self.rows_used += int(totals.sum())
+
+    @staticmethod
+    def __join(arrays: [], storage):
+        """
+        Join the bytes of some contiguous arrays into one flat array
+        :param arrays: the arrays, all of the same type as storage
+        :param storage: the storage array they are going into
+        :return: a flat array of every element of the arrays, in order
+        """
+        return frombuffer(b''.join(arrays), dtype=storage.dtype)
+
+    def __live_rows(self):
+        """
+        Get the index of every row in the row pool that belongs to a sample in the reservoir
+        :return: a tuple of the row index array, and the number of rows of each sample
+        """
+
+        totals = self.hist_lengths[:self.length].sum(axis=1, dtype=int64)
+        offsets = self.hist_offsets[:self.length]
+
+        return repeat(offsets - (cumsum(totals) - totals), totals) + arange(totals.sum()), totals
+
+    def __reserve_rows(self, num_of_rows: int):
+        """
+        Make sure there is space at the end of the row pool, compacting the pool (and growing it if that isn't
+        enough) when it's full
+        :param num_of_rows: the number of rows needed
+        """
+
+        if self.rows_used + num_of_rows <= len(self.rows):
+            return
+
+        index, totals = self.__live_rows()
+        live = self.rows[index]
+
+        capacity = len(self.rows)
+        while len(live) + num_of_rows > capacity:
+            capacity *= 2
+
+        if capacity != len(self.rows):
+            self.rows = self._allocate('rows', (capacity,), self.rows.dtype)
+
+        self.rows[:len(live)] = live
+        self.hist_offsets[:self.length] = cumsum(totals) - totals
+        self.rows_used = len(live)
+
+    def shuffle(self):
+        """
+        Shuffle the order the samples in the reservoir are read in. Only the order is shuffled, so the samples
+        themselves are never moved
+        """
+        self.order = self.rng.permutation(self.length)
+
+    def history_lengths(self, indexes):
+        """
+        Get the length of the longest history of some samples
+        :param indexes: an array of reservoir slots
+        :return: an array of history lengths
+        """
+        return self.hist_lengths[indexes].max(axis=1)
+
+    def __history_offsets(self, indexes):
+        """
+        Get the offset into the row pool of each history of some samples
+        :param indexes: an array of reservoir slots
+        :return: a tuple of the (samples, histories) arrays of offsets and lengths
+        """
+
+        lengths = self.hist_lengths[indexes].astype(int64)
+
+        return self.hist_offsets[indexes, None] + cumsum(lengths, axis=1) - lengths, lengths
+
+    def get_batch(self, indexes) -> tuple:
+        """
+        Gather some samples into a minibatch, unpacking the history rows. Each history input is padded with zeros
+        at the end to the longest history of that input in the batch - the structures mask the padding out
+        :param indexes: an array of reservoir slots
+        :return: a tuple of the list of inputs, the targets and the iterations, all float32
+        """
+
+        inputs = [self.fixed[indexes].astype(float32)]
+
+        offsets, lengths = self.__history_offsets(indexes)
+
+        for h in range(lengths.shape[1]):
+            steps = arange(lengths[:, h].max())
+            mask = steps[None, :] < lengths[:, h, None]
+
+            inputs.append(SampleEncoding.unpack_history(where(mask, self.rows[where(mask, offsets[:, h, None]
+                                                                                     + steps[None, :], 0)], 0)))
+
+        return inputs, self.targets[indexes].astype(float32), self.iterations[indexes].astype(float32)
+
+    def nbytes(self) -> int:
+        """
+        Get the number of bytes used to store the samples
+        :return: the number of bytes
+        """
+
+        if self.fixed is None:
+            return 0
+
+        return sum(x.nbytes for x in [self.fixed, self.targets, self.iterations, self.hist_offsets
+                                      , self.hist_lengths, self.rows])
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, idx):
+        if idx >= self.length:
+            raise IndexError("index larger than memory")
+
+        if self.order is not None:
+            idx = self.order[idx]
+
+        offsets, lengths = self.__history_offsets([idx])
+        histories = [self.rows[None, o:o + n] for o, n in zip(offsets[0], lengths[0])]
+
+        return [self.fixed[None, idx]] + histories, self.targets[None, idx], self.iterations[idx].reshape(1, 1)
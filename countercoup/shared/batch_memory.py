@@ -1,31 +1,97 @@
 from countercoup.shared.memory import Memory
 from keras.utils.data_utils import Sequence
-from random import shuffle
+from concurrent.futures import ThreadPoolExecutor
+from numpy import arange, argsort, array_split
+from numpy.random import default_rng
 
 
 class BatchMemory(Sequence):
     """
-    Sequence based object that can batch up the data for each epoch when training
+    Sequence based object that can batch up the data for each epoch when training. Each epoch takes the next
+    epoch_size samples of a shuffled memory, groups samples with similar history lengths into minibatches so that
+    little padding is needed, and the iteration of each sample is used as its sample weight (linear CFR). Batches
+    are assembled ahead of time on a background thread
     """
 
-    def __init__(self, memory: Memory, batch_size: int):
+    def __init__(self, memory: Memory, epoch_size: int, batch_size: int = 32, bucket_batches: int = 16
+                 , prefetch: int = 4):
+        """
+        Set up the batches
+        :param memory: the memory to train on
+        :param epoch_size: the number of samples in each epoch
+        :param batch_size: the number of samples in each minibatch
+        :param bucket_batches: the number of minibatches whose samples are sorted by history length together
+        :param prefetch: the number of batches to assemble ahead of the one being trained on
+        """
+
         self.memory = memory
+        self.epoch_size = epoch_size
         self.batch_size = batch_size
+        self.bucket_batches = bucket_batches
+        self.prefetch = prefetch
 
         # Give the data a good shufflin'
-        shuffle(self.memory.data)
+        self.rng = default_rng()
+        self.order = self.rng.permutation(len(memory))
 
         # Set the batch_begin at 0
         self.batch_begin = 0
+        self.batches = self.plan_epoch()
+
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = {}
+
+    def plan_epoch(self) -> []:
+        """
+        Split the samples for the current epoch into minibatches. Samples are sorted by history length within
+        each bucket, and then the order of the minibatches is shuffled
+        :return: a list of arrays of indexes, one for each minibatch
+        """
+
+        indexes = self.order[(self.batch_begin + arange(self.epoch_size)) % len(self.order)]
+
+        batches = []
+        bucket_size = self.batch_size * self.bucket_batches
+
+        for start in range(0, len(indexes), bucket_size):
+            bucket = indexes[start:start + bucket_size]
+            bucket = bucket[argsort(self.memory.history_lengths(bucket), kind='stable')]
+            batches += array_split(bucket, -(-len(bucket) // self.batch_size))
+
+        return [batches[x] for x in self.rng.permutation(len(batches))]
 
     def __len__(self):
-        return self.batch_size
+        return len(self.batches)
 
     def __getitem__(self, idx):
-        if idx > self.batch_size - 1:
-            raise IndexError("index larger than batch size")
+        if idx > len(self.batches) - 1:
+            raise IndexError("index larger than number of batches")
 
-        return self.memory[(self.batch_begin + idx) % len(self.memory)]
+        for x in range(idx, min(idx + self.prefetch + 1, len(self.batches))):
+            if x not in self.pending:
+                self.pending[x] = self.executor.submit(self.memory.get_batch, self.batches[x])
+
+        return self.pending.pop(idx).result()
 
     def on_epoch_end(self):
-        self.batch_begin = (self.batch_begin + self.batch_size) % len(self.memory)
+        self.cancel_pending()
+
+        self.batch_begin = (self.batch_begin + self.epoch_size) % len(self.order)
+        self.batches = self.plan_epoch()
+
+    def cancel_pending(self):
+        """
+        Cancel any batches that are waiting to be assembled
+        """
+
+        for future in self.pending.values():
+            future.cancel()
+        self.pending = {}
+
+    def close(self):
+        """
+        Stop the background thread, once training has finished
+        """
+
+        self.cancel_pending()
+        self.executor.shutdown(wait=False)
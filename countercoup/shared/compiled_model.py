@@ -0,0 +1,116 @@
+from countercoup.shared.infoset import Infoset
+from keras.models import Model
+from tensorflow import function, TensorSpec
+from numpy import concatenate, zeros, float32
+
+
+class CompiledModel:
+    """
+    Compiled inference entry point for a Keras model. History inputs are padded with zeros at the end to a length
+    bucket and masked, so the model is only traced once for each bucket rather than for every new combination of
+    history lengths, and calls skip the generic eager overhead of Model.__call__
+    """
+
+    def __init__(self, model: Model, buckets: [] = None):
+        """
+        Set up the entry point. Each bucket is traced the first time it is used
+        :param model: the Keras model
+        :param buckets: the history lengths that inputs are padded up to, in increasing order. Histories longer
+                        than the last bucket are padded to a multiple of it
+        """
+
+        self.model = model
+        self.buckets = buckets if buckets is not None else [2, 4, 8, 16, 32, 64]
+        self.functions = {}
+
+        # The number of times the model has been traced
+        self.traces = 0
+
+    def bucket(self, length: int) -> int:
+        """
+        Get the bucket a history length is padded up to
+        :param length: the history length
+        :return: the padded length
+        """
+
+        for b in self.buckets:
+            if length <= b:
+                return b
+
+        return -(-length // self.buckets[-1]) * self.buckets[-1]
+
+    def __function(self, bucket: int):
+        """
+        Get the compiled function for a bucket, tracing it if this is the first time the bucket is used
+        :param bucket: the padded history length
+        :return: the compiled function, taking the inputs then the history masks
+        """
+
+        if bucket not in self.functions:
+            num_of_histories = len(self.model.inputs) - 1
+            signature = [TensorSpec((None, self.model.inputs[0].shape[1]), 'float32')] \
+                + [TensorSpec((None, bucket, x.shape[2]), 'float32') for x in self.model.inputs[1:]] \
+                + [TensorSpec((None, bucket), 'bool') for _ in range(num_of_histories)]
+
+            def run(*args):
+                # Only runs while tracing
+                self.traces += 1
+
+                inputs = list(args[:num_of_histories + 1])
+                masks = [None] + list(args[num_of_histories + 1:])
+
+                return self.model(inputs, mask=masks, training=False)
+
+            self.functions[bucket] = function(run, input_signature=signature)
+
+        return self.functions[bucket]
+
+    def predict(self, infosets: []):
+        """
+        Run a batch of infosets through the model
+        :param infosets: the list of Infoset objects
+        :return: an array of outputs, one row for each infoset
+        """
+
+        length = self.bucket(max(x.shape[1] for i in infosets for x in i.history_vectors))
+        inputs, masks = self.batch_inputs(infosets, length)
+
+        return self.__function(length)(*inputs, *masks[1:]).numpy()
+
+    def get_output_vector(self, infoset: Infoset):
+        """
+        Run a single infoset through the model
+        :param infoset: the Infoset object that forms the input
+        :return: an array of output values
+        """
+        return self.predict([infoset])[0]
+
+    @staticmethod
+    def batch_inputs(infosets: [], length: int = None) -> tuple:
+        """
+        Stack the inputs of several infosets. History vectors are padded with zeros at the end, and masked so that
+        the padding is skipped by the recurrent cells. Inputs are float32, as Keras drops the mask when it has to
+        cast the inputs
+        :param infosets: the list of Infoset objects
+        :param length: the length histories are padded to. Defaults to the longest history of each input
+        :return: a tuple of the list of inputs and the list of masks
+        """
+
+        inputs = [concatenate([x.fixed_vector for x in infosets]).astype(float32)]
+        masks = [None]
+
+        for n in range(len(infosets[0].history_vectors)):
+            lengths = [x.history_vectors[n].shape[1] for x in infosets]
+            padded = length if length is not None else max(lengths)
+
+            history = zeros((len(infosets), padded, 12), dtype=float32)
+            mask = zeros((len(infosets), padded), dtype=bool)
+
+            for num, x in enumerate(infosets):
+                history[num, :lengths[num]] = x.history_vectors[n][0]
+                mask[num, :lengths[num]] = True
+
+            inputs.append(history)
+            masks.append(mask)
+
+        return inputs, masks
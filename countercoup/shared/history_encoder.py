@@ -0,0 +1,145 @@
+from countercoup.model.game_info import GameInfoSet
+from countercoup.model.history import History
+from countercoup.model.items.actions import Income, ForeignAid, Coup, Tax, Assassinate, Exchange, Steal
+from numpy import zeros, int16
+
+
+class HistoryEncoder:
+    """
+    Incrementally encodes the history of a game into per-player history vectors. Each update only encodes the
+    History entries committed since the last update, appending them to preallocated buffers for each player
+    """
+
+    actions = [Income, ForeignAid, Coup, Tax, Assassinate, Exchange, Steal]
+    c_actions = [ForeignAid, Steal, Assassinate]
+
+    def __init__(self, num_of_players: int, capacity: int = 32):
+        self.buffers = [zeros((capacity, 12), dtype=int16) for _ in range(num_of_players)]
+        self.lengths = [0 for _ in range(num_of_players)]
+
+        # The History objects encoded so far, and the players that were given a row by each of them
+        self.entries = []
+        self.rows = []
+
+        # Bumped whenever the encoder rolls back, so anything holding on to the lengths can tell they're stale
+        self.generation = 0
+
+        # Caches kept by NumpyNetwork: key -> per-player list of the LSTM states after each row
+        self.lstm_states = {}
+
+    @staticmethod
+    def get(g: GameInfoSet, length: int = None):
+        """
+        Get the encoder attached to a game, creating it if needed, and bring it up to date with the game history
+        :param g: the game
+        :param length: the number of History entries to encode. Defaults to all of them
+        :return: the up to date encoder
+        """
+
+        encoder = g.history_encoder
+        if encoder is None or len(encoder.lengths) != len(g.players):
+            encoder = HistoryEncoder(len(g.players))
+            g.history_encoder = encoder
+
+        encoder.update(g.history, length)
+
+        return encoder
+
+    def update(self, history: [], length: int = None):
+        """
+        Bring the encoder up to date with a history list. Committed History objects are never changed, so entries
+        are matched by identity - any that no longer match (e.g. after Game.restore) are rolled back first
+        :param history: the game history
+        :param length: the number of entries of the history to encode. Defaults to all of them
+        """
+
+        if length is None:
+            length = len(history)
+
+        n = len(self.entries)
+        rolled_back = False
+
+        while n > 0 and (n > length or history[n - 1] is not self.entries[n - 1]):
+            n -= 1
+            self.entries.pop()
+            rolled_back = True
+
+            for p in self.rows.pop():
+                self.lengths[p] -= 1
+
+        # Cached LSTM states for rows that were rolled back no longer belong to the history
+        if rolled_back:
+            self.generation += 1
+            for states in self.lstm_states.values():
+                for p, player_states in enumerate(states):
+                    del player_states[self.lengths[p]:]
+
+        for h in history[n:length]:
+            self.__add(h)
+
+    def __add(self, h: History):
+        """
+        Encode a History entry, adding a row for the action player and one for the counteracting player
+        :param h: the History entry
+        """
+
+        rows = []
+
+        # Games that finish mid-action commit an empty history entry, which has nothing to encode
+        if h is not None:
+            act_vec = [1 if h.action == x else 0 for x in self.actions] + [0, 0, 0]
+            act_vec.append(1 if h.blocking_player is not None else 0)
+            act_vec.append(1 if h.block_successful else 0)
+
+            self.__append_row(h.action_player, act_vec)
+            rows.append(h.action_player)
+
+            if h.counteracting_player is not None:
+                c_act_vec = [0, 0, 0, 0, 0, 0, 0] + [1 if h.action == x else 0 for x in self.c_actions]
+                c_act_vec.append(1 if h.counteract_block_player is not None else 0)
+                c_act_vec.append(1 if h.counteract_block_successful else 0)
+
+                self.__append_row(h.counteracting_player, c_act_vec)
+                rows.append(h.counteracting_player)
+
+        self.entries.append(h)
+        self.rows.append(rows)
+
+    def __append_row(self, player: int, vec: []):
+        """
+        Append a row to a players buffer, doubling the buffer if it is full
+        :param player: the player
+        :param vec: the encoded row
+        """
+
+        buffer = self.buffers[player]
+        length = self.lengths[player]
+
+        if length == len(buffer):
+            buffer = zeros((2 * len(buffer), 12), dtype=int16)
+            buffer[:length] = self.buffers[player]
+            self.buffers[player] = buffer
+
+        buffer[length] = vec
+        self.lengths[player] = length + 1
+
+    def history_order(self, current_player: int) -> []:
+        """
+        Return the order the players' histories are given to the networks in
+        :param current_player: the current player
+        :return: a list of players, current player first
+        """
+        return [current_player] + [p for p in range(len(self.lengths)) if p != current_player]
+
+    def history_vectors(self, current_player: int) -> []:
+        """
+        Return the history vectors for each player, current player first, in the shape expected by the networks.
+        The vectors are copies, so they stay valid when the encoder rolls back
+        :param current_player: the current player
+        :return: a list of (1, n, 12) history arrays
+        """
+
+        order = self.history_order(current_player)
+
+        return [self.buffers[p][None, :self.lengths[p]].copy() if self.lengths[p] else zeros((1, 1, 12), dtype=int16)
+                for p in order]
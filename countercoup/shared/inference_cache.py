@@ -0,0 +1,90 @@
+from countercoup.shared.infoset import Infoset
+from collections import OrderedDict
+from threading import Lock
+
+
+class InferenceCache:
+    """
+    Bounded LRU cache of network outputs, keyed by the contents of the infoset. Identical infosets come up again
+    and again across traversals (the early game especially), so their outputs only need working out once for each
+    set of weights
+    """
+
+    def __init__(self, capacity: int = 100000):
+        """
+        Set up the cache
+        :param capacity: the maximum number of outputs held
+        """
+
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(infoset: Infoset) -> tuple:
+        """
+        Get the cache key of an infoset - the raw bytes of its vectors, which hash quickly and can't collide
+        :param infoset: the Infoset object
+        :return: the key
+        """
+        return (infoset.fixed_vector.tobytes(),) + tuple(x.tobytes() for x in infoset.history_vectors)
+
+    def get(self, key: tuple):
+        """
+        Look up an output, marking it as recently used
+        :param key: the cache key
+        :return: the output array, or None if it isn't cached
+        """
+
+        with self.lock:
+            value = self.entries.get(key)
+
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+
+            return value
+
+    def put(self, key: tuple, value):
+        """
+        Add an output, evicting the least recently used one if the cache is full. The output is made read only, as
+        it will be handed out again
+        :param key: the cache key
+        :param value: the output array
+        """
+
+        value.setflags(write=False)
+
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Empty the cache, i.e. when the weights of the network change
+        """
+
+        with self.lock:
+            self.entries.clear()
+
+    def take_counts(self) -> tuple:
+        """
+        Take the hit, miss and eviction counts so far, resetting them
+        :return: a tuple of the hits, misses and evictions
+        """
+
+        with self.lock:
+            counts = (self.hits, self.misses, self.evictions)
+            self.hits = self.misses = self.evictions = 0
+
+        return counts
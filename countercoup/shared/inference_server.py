@@ -0,0 +1,176 @@
+from countercoup.shared.infoset import Infoset
+from countercoup.shared.network import Network
+from countercoup.shared.compiled_model import CompiledModel
+from countercoup.shared.inference_cache import InferenceCache
+from concurrent.futures import Future
+from queue import Queue, Empty
+from threading import Thread
+from time import perf_counter
+
+
+class InferenceServer:
+    """
+    Collects queries to the networks from many concurrent traversals, and runs them through the networks in batches
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_wait: float = 0.002):
+        """
+        Set up the server
+        :param max_batch_size: the most queries that will be run through a network at once
+        :param max_wait: the longest time (in seconds) to wait for a batch to fill up
+        """
+
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self.requests = Queue()
+        self.thread = None
+
+        self.total_queries = 0
+        self.total_batches = 0
+
+    def start(self):
+        """
+        Start the server thread
+        """
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop the server thread, once all the queries so far have been answered
+        """
+        self.requests.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def submit(self, network: Network, infoset: Infoset) -> Future:
+        """
+        Submit a query to the server
+        :param network: the network to query
+        :param infoset: the Infoset object that forms the input
+        :return: a Future which resolves to the row of output from the network
+        """
+
+        future = Future()
+        self.requests.put((network, infoset, future))
+
+        return future
+
+    def wrap(self, network: Network):
+        """
+        Wrap a network so that it sends its queries through the server
+        :param network: the network to wrap
+        :return: a BatchedNetwork
+        """
+        return BatchedNetwork(network, self)
+
+    def run(self):
+        """
+        Main loop of the server - wait for a query, then collect any more that come in within max_wait and run
+        them all together
+        """
+
+        running = True
+
+        while running:
+            request = self.requests.get()
+            if request is None:
+                break
+
+            batch = [request]
+            deadline = perf_counter() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                try:
+                    request = self.requests.get(timeout=max(deadline - perf_counter(), 0))
+                except Empty:
+                    break
+
+                if request is None:
+                    running = False
+                    break
+
+                batch.append(request)
+
+            self.run_batch(batch)
+
+    def run_batch(self, batch: []):
+        """
+        Run a batch of queries, grouping them by network
+        :param batch: a list of (network, infoset, future) tuples
+        """
+
+        groups = {}
+        for request in batch:
+            groups.setdefault(id(request[0]), []).append(request)
+
+        for group in groups.values():
+            network = group[0][0]
+
+            try:
+                if network.compiled is not None:
+                    result = network.compiled.predict([x[1] for x in group])
+                else:
+                    inputs, masks = self.batch_inputs([x[1] for x in group])
+                    result = network.model(inputs, mask=masks).numpy()
+            except Exception as e:
+                for x in group:
+                    x[2].set_exception(e)
+                continue
+
+            for num, x in enumerate(group):
+                x[2].set_result(result[num])
+
+            self.total_queries += len(group)
+            self.total_batches += 1
+
+    @staticmethod
+    def batch_inputs(infosets: []) -> tuple:
+        """
+        Stack the inputs of several infosets, padding and masking the history vectors to the longest history
+        :param infosets: the list of Infoset objects
+        :return: a tuple of the list of inputs and the list of masks
+        """
+        return CompiledModel.batch_inputs(infosets)
+
+
+class BatchedNetwork:
+    """
+    Stands in for a Network in the traversers, sending its queries through an InferenceServer
+    """
+
+    def __init__(self, network: Network, server: InferenceServer):
+        self.network = network
+        self.server = server
+        self.outputs = network.outputs
+        self.uses_history = network.uses_history
+        self.cache = network.cache
+
+    def get_output(self, infoset: Infoset, filt: [] = None) -> dict:
+        """
+        Return the predicted output from the neural network, once the server has run the query
+        :param infoset: the Infoset object that forms the input
+        :param filt: the outputs that we want to potentially restrict on
+        :return: a dict of possible outputs and output values
+        """
+        return self.network.format_output(self.get_output_vector(infoset), filt)
+
+    def get_output_vector(self, infoset: Infoset):
+        """
+        Return the predicted output from the neural network as an array, once the server has run the query
+        :param infoset: the Infoset object that forms the input
+        :return: an array of output values, in the same order as outputs
+        """
+
+        if self.cache is None:
+            return self.server.submit(self.network, infoset).result()
+
+        key = InferenceCache.key(infoset)
+
+        output = self.cache.get(key)
+        if output is None:
+            output = self.server.submit(self.network, infoset).result()
+            self.cache.put(key, output)
+
+        return output
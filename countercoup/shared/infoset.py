@@ -1,6 +1,7 @@
 from countercoup.model.game import GameInfoSet
 from countercoup.model.items.cards import Duke, Assassin, Ambassador, Captain, Contessa
 from countercoup.model.items.actions import Income, ForeignAid, Coup, Tax, Assassinate, Exchange, Steal
+from countercoup.shared.history_encoder import HistoryEncoder
 from numpy import array, zeros, int16
 
 
@@ -10,10 +11,67 @@ class Infoset:
     a neural network
     """
 
-    def __init__(self, g: GameInfoSet):
+    cards = [Duke, Assassin, Ambassador, Captain, Contessa]
+    actions = [Income, ForeignAid, Coup, Tax, Assassinate, Exchange, Steal]
+
+    # The attributes that are worked out from the history, the first time one of them is used
+    history_parts = ['history_vectors', 'history_encoder', 'history_generation', 'history_players', 'history_lengths']
+
+    def __init__(self, g: GameInfoSet, history: bool = True):
+        """
+        Set up the infoset. The fixed vector is worked out straight away, but the history vectors are only worked
+        out the first time they're used, from the history as it was when the infoset was made
+        :param g: the game
+        :param history: whether the history vectors are wanted. If not (i.e. for structures that don't read them),
+                        the history is never encoded, and every player is given an empty history
+        """
 
         self.fixed_vector = self.__return_fixed_vector(g)
-        self.history_vectors = self.__return_history_vectors(g)
+        self.uses_history = history
+
+        self.__game = g
+        self.__current_player = g.current_player
+        self.__history_length = len(g.history)
+        self.__last_entry = g.history[-1] if g.history else None
+
+    def __getattr__(self, name):
+        # Only called for attributes that haven't been set, i.e. the history parts before they are first used
+        if name not in self.history_parts or self.__dict__.get('_Infoset__game') is None:
+            raise AttributeError(name)
+
+        self.__add_history()
+        return getattr(self, name)
+
+    def __add_history(self):
+        """
+        Work out the history parts of the infoset. The game can have moved on since the infoset was made, so long
+        as it hasn't been rolled back past that point
+        """
+
+        g = self.__game
+        players = [self.__current_player] + [p for p in range(len(g.players)) if p != self.__current_player]
+
+        if not self.uses_history:
+            self.history_vectors = [zeros((1, 1, 12), dtype=int16) for _ in players]
+            self.history_encoder = None
+            self.history_generation = 0
+            self.history_lengths = [0 for _ in players]
+        else:
+            length = self.__history_length
+            if len(g.history) < length or (length and g.history[length - 1] is not self.__last_entry):
+                raise ValueError('the game has been rolled back past this infoset')
+
+            encoder = HistoryEncoder.get(g, length)
+
+            self.history_vectors = encoder.history_vectors(self.__current_player)
+
+            # Where the history vectors came from, so NumpyNetwork can use the LSTM states cached on the encoder
+            self.history_encoder = encoder
+            self.history_generation = encoder.generation
+            self.history_lengths = [encoder.lengths[p] for p in players]
+
+        self.history_players = players
+        self.__game = None
 
     @staticmethod
     def __return_fixed_vector(g: GameInfoSet):
@@ -24,50 +82,45 @@ class Infoset:
                  the current moves.
         """
 
-        vec = []
-        cards = [Duke, Assassin, Ambassador, Captain, Contessa]
+        cards = Infoset.cards
+        current = g.players[g.current_player]
+        opponents = [(play_num, player) for play_num, player in enumerate(g.players) if play_num != g.current_player]
 
-        # First part of vector is the current players hand
-        vec += [g.players[g.current_player].cards.count(x) for x in cards]
+        vec = zeros((1, 16 + 10 * len(opponents)), dtype=int16)
+        v = vec[0]
 
-        # Next is the discard for the other players
-        for play_num, player in enumerate(g.players):
-            if play_num != g.current_player:
-                vec += [player.discard.count(x) for x in cards]
+        # First part of vector is the current players hand, then the discard for the other players
+        pos = 5 + 5 * len(opponents)
+        v[:pos] = [current.cards.count(x) for x in cards] \
+            + [player.discard.count(x) for _, player in opponents for x in cards]
 
-        # Number of coins for the current player
-        vec.append(g.players[g.current_player].coins)
-
-        # Number of coins for all other players
-        for play_num, player in enumerate(g.players):
-            if play_num != g.current_player:
-                vec.append(player.coins)
+        # Number of coins for the current player, then for all other players
+        v[pos:pos + 1 + len(opponents)] = [current.coins] + [player.coins for _, player in opponents]
+        pos += 1 + len(opponents)
 
         # Current action encoding
-        for action in [Income, ForeignAid, Coup, Tax, Assassinate, Exchange, Steal]:
-            vec.append(1 if g.current_action == action else 0)
-
-        # Action, counteraction and attacking - first for current player
-        vec.append(1 if g.current_player == g.action_player else 0)
-        vec.append(1 if g.current_player == g.counteract_player else 0)
-        vec.append(1 if g.current_player == g.attack_player else 0)
-
-        # And for other players, including in-game flag (technically could just rely on discard, but having
-        # it explicit should make network easier to train)
-        for play_num, player in enumerate(g.players):
-            if play_num != g.current_player:
-                vec.append(1 if g.action_player == play_num else 0)
-                vec.append(1 if g.counteract_player == play_num else 0)
-                vec.append(1 if g.attack_player == play_num else 0)
-                vec.append(1 if g.players[play_num].in_game else 0)
+        if g.current_action is not None:
+            v[pos + Infoset.actions.index(g.current_action)] = 1
+        pos += 7
+
+        # Action, counteraction and attacking - first for current player, then for other players, including
+        # in-game flag (technically could just rely on discard, but having it explicit should make network
+        # easier to train)
+        v[pos:] = [g.current_player == g.action_player
+                   , g.current_player == g.counteract_player
+                   , g.current_player == g.attack_player] \
+            + [x for play_num, player in opponents for x in (g.action_player == play_num
+                                                             , g.counteract_player == play_num
+                                                             , g.attack_player == play_num
+                                                             , player.in_game)]
 
-        return array([vec], dtype=int16)
+        return vec
 
     @staticmethod
-    def __return_history_vectors(g: GameInfoSet):
+    def return_full_history_vectors(g: GameInfoSet):
         """
-        Return the history vectors for each player, to be fed sequentially into a recurrent neural network
-        such as a LSTM cell
+        Return the history vectors for each player by walking the whole history. HistoryEncoder gives the same
+        result incrementally - this is kept as a reference
         :param g: the Game object
         :return: a list of list of history vectors
         """
@@ -0,0 +1,108 @@
+from countercoup.shared.array_memory import ArrayMemory
+from numpy.lib.format import open_memmap
+from os import makedirs, remove, replace
+from os.path import join, exists
+from json import load, dump
+
+
+class MappedMemory(ArrayMemory):
+    """
+    ArrayMemory that keeps its arrays in memory-mapped files in a directory, so the size of the reservoir is limited
+    by the disk rather than RAM. Calling flush saves the state of the reservoir, and creating a MappedMemory on the
+    same directory reopens it. Only a memory that was flushed and then closed reopens reliably - after a crash, the
+    arrays may have been changed since the last flush
+    """
+
+    meta_file = 'memory.json'
+
+    # Version of the sample layout, bumped when the arrays are stored differently
+    format = 2
+
+    def __init__(self, path: str, size: int, row_capacity: int = None):
+        """
+        Set up the memory, reopening it if the directory already holds one
+        :param path: the directory the files are kept in
+        :param size: the number of samples held in the reservoir
+        :param row_capacity: the initial number of history rows held in the row pool
+        """
+
+        super().__init__(size, row_capacity)
+
+        self.path = path
+        self.files = {}
+        self.stale_files = []
+
+        makedirs(path, exist_ok=True)
+
+        if exists(join(path, self.meta_file)):
+            self.__open()
+
+    def _allocate(self, name: str, shape: tuple, dtype):
+        """
+        Allocate one of the storage arrays as a memory-mapped .npy file. An array that is reallocated (i.e. the
+        row pool growing) goes to a new file, as the old one is still mapped while its contents are copied over,
+        and the last saved state may still refer to it
+        :param name: the name of the array
+        :param shape: the shape of the array
+        :param dtype: the type of the array
+        :return: the new array
+        """
+
+        generation = 0
+        if name in self.files:
+            generation = int(self.files[name].split('.')[1]) + 1
+            self.stale_files.append(self.files[name])
+
+        self.files[name] = '{name}.{gen}.npy'.format(name=name, gen=generation)
+
+        return open_memmap(join(self.path, self.files[name]), mode='w+', dtype=dtype, shape=shape)
+
+    def __open(self):
+        """
+        Reopen the reservoir saved in the directory
+        """
+
+        with open(join(self.path, self.meta_file)) as f:
+            meta = load(f)
+
+        if meta.get('format', 1) != self.format:
+            raise ValueError('memory in {path} was saved in an older format'.format(path=self.path))
+
+        if meta['size'] != self.size:
+            raise ValueError('memory in {path} has size {size}'.format(path=self.path, size=meta['size']))
+
+        self.counter = meta['counter']
+        self.length = meta['length']
+        self.rows_used = meta['rows_used']
+        self.files = meta['files']
+
+        for name, file in self.files.items():
+            setattr(self, name, open_memmap(join(self.path, file), mode='r+'))
+
+    def flush(self):
+        """
+        Write the arrays to disk, and save the state of the reservoir so that it can be reopened
+        """
+
+        for name in self.files:
+            getattr(self, name).flush()
+
+        meta = {'format': self.format
+                , 'size': self.size
+                , 'counter': self.counter
+                , 'length': self.length
+                , 'rows_used': self.rows_used
+                , 'files': self.files}
+
+        # Write to a temporary file first, so a crash mid-write can't leave a half written memory.json. This doesn't
+        # make the memory crash safe - the arrays are changed in place between flushes, and the OS can write those
+        # pages back at any time, so after a crash the saved offsets can point at rows that have since been moved
+        # or replaced
+        with open(join(self.path, self.meta_file + '.tmp'), 'w') as f:
+            dump(meta, f)
+
+        replace(join(self.path, self.meta_file + '.tmp'), join(self.path, self.meta_file))
+
+        for file in self.stale_files:
+            remove(join(self.path, file))
+        self.stale_files = []
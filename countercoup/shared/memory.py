@@ -1,4 +1,6 @@
-from random import randint
+from countercoup.shared.sample_encoding import SampleEncoding
+from random import randint, shuffle
+from numpy import array, concatenate, float32
 
 
 class Memory:
@@ -33,6 +35,37 @@ class Memory:
         for x in items:
             self.add(x)
 
+    def shuffle(self):
+        """
+        Shuffle the samples in the reservoir
+        """
+        shuffle(self.data)
+
+    def history_lengths(self, indexes):
+        """
+        Get the length of the longest history of some samples
+        :param indexes: a list of indexes
+        :return: an array of history lengths
+        """
+        return array([max(x.shape[1] for x in self.data[idx][0][1:]) for idx in indexes])
+
+    def get_batch(self, indexes) -> tuple:
+        """
+        Gather some samples into a minibatch. Each history input is padded with zeros at the end to the longest
+        history of that input in the batch - the structures mask the padding out
+        :param indexes: a list of indexes
+        :return: a tuple of the list of inputs, the targets and the iterations, all float32
+        """
+
+        items = [self.data[idx] for idx in indexes]
+        inputs = [concatenate([x[0][0] for x in items]).astype(float32)]
+
+        for h in range(1, len(items[0][0])):
+            inputs.append(SampleEncoding.unpack_history(SampleEncoding.pad_histories([x[0][h] for x in items])))
+
+        return inputs, concatenate([x[1] for x in items]).astype(float32) \
+            , concatenate([x[2].ravel() for x in items]).astype(float32)
+
     def __len__(self):
         return len(self.data)
 
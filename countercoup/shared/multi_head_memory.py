@@ -0,0 +1,79 @@
+from numpy import array, zeros, cumsum, searchsorted, float32
+
+
+class MultiHeadMemory:
+    """
+    Stands in for a Memory when training a model with a head for each decision type, mixing the samples of a memory
+    for each head. A sample only trains its own head - the targets and sample weights of every other head are zero
+    for it, so those heads' losses are masked out
+    """
+
+    def __init__(self, memories: [], sizes: []):
+        """
+        Set up the memory
+        :param memories: the memory of each head, in the same order as the model's outputs
+        :param sizes: the number of outputs of each head
+        """
+
+        self.memories = memories
+        self.sizes = sizes
+
+        # Index of the first sample of each memory
+        self.offsets = cumsum([0] + [len(x) for x in memories])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __split(self, indexes) -> []:
+        """
+        Split some indexes between the memories
+        :param indexes: an array of indexes
+        :return: a list of (positions in indexes, indexes in the memory) for each memory
+        """
+
+        indexes = array(indexes)
+        heads = searchsorted(self.offsets, indexes, side='right') - 1
+
+        return [((heads == h).nonzero()[0], indexes[heads == h] - self.offsets[h]) for h in range(len(self.memories))]
+
+    def history_lengths(self, indexes):
+        """
+        Get the length of the longest history of some samples
+        :param indexes: an array of indexes
+        :return: an array of history lengths
+        """
+
+        lengths = zeros(len(indexes), dtype=int)
+
+        for memory, (positions, local) in zip(self.memories, self.__split(indexes)):
+            if len(positions):
+                lengths[positions] = memory.history_lengths(local)
+
+        return lengths
+
+    def get_batch(self, indexes) -> tuple:
+        """
+        Gather some samples into a minibatch, with the targets and sample weights of each head as separate arrays
+        :param indexes: an array of indexes
+        :return: a tuple of the list of inputs, the list of targets of each head and the list of weights of each head
+        """
+
+        batches = [(h, positions, self.memories[h].get_batch(local))
+                   for h, (positions, local) in enumerate(self.__split(indexes)) if len(positions)]
+
+        # Each memory pads its histories to its own longest, so they're padded again to the longest overall
+        inputs = [zeros((len(indexes),) + x.shape[1:], dtype=float32) if n == 0
+                  else zeros((len(indexes), max(b[0][n].shape[1] for _, _, b in batches), x.shape[2]), dtype=float32)
+                  for n, x in enumerate(batches[0][2][0])]
+
+        targets = [zeros((len(indexes), x), dtype=float32) for x in self.sizes]
+        weights = [zeros(len(indexes), dtype=float32) for _ in self.sizes]
+
+        for h, positions, (batch_inputs, batch_targets, batch_weights) in batches:
+            for x, y in zip(inputs, batch_inputs):
+                x[positions, :y.shape[1]] = y
+
+            targets[h][positions] = batch_targets
+            weights[h][positions] = batch_weights
+
+        return inputs, targets, weights
@@ -0,0 +1,54 @@
+from countercoup.shared.networks.action_net import ActionNet
+from countercoup.shared.networks.block_counteract_net import BlockCounteractNet
+from countercoup.shared.networks.lose_net import LoseNet
+from countercoup.shared.structure import Structure
+from countercoup.shared.trainable_model import TrainableModel
+from countercoup.shared.multi_head_memory import MultiHeadMemory
+from keras.models import Model
+
+
+class MultiHeadNetwork(TrainableModel):
+    """
+    The advantage networks of a player for every decision type, as one model with a shared trunk and a head for each.
+    Each head is also a Network of its own type, whose model shares its layers with the full model, so it can be
+    queried just like the separate networks. The full model is trained on the samples of every head at once
+    """
+
+    heads = {'action': ActionNet
+             , 'block': BlockCounteractNet
+             , 'counteract': BlockCounteractNet
+             , 'lose': LoseNet}
+
+    def __init__(self, structure: Structure):
+        """
+        Set up the network
+        :param structure: a multi-head structure
+        """
+
+        self.model = structure.define_heads({name: x.outputs for name, x in self.heads.items()})
+
+        for name, network_type in self.heads.items():
+            head = Model(self.model.inputs, self.model.get_layer(name).output)
+            head.compile(loss='mean_squared_error', optimizer='adam')
+
+            setattr(self, name, network_type(model=head))
+
+    def train(self, memories: [], epochs: int = 10, epoch_size: int = None, batch_size: int = 32):
+        """
+        Train every head, with minibatches mixing the samples of all the memories
+        :param memories: the memory of each head - action, block, counteract and lose
+        :param epochs: number of epochs to train on
+        :param epoch_size: number of samples in each epoch. Defaults to a single pass over the memories over all epochs
+        :param batch_size: number of samples in each minibatch
+        """
+
+        memory = MultiHeadMemory(memories, [len(x.outputs) for x in self.heads.values()])
+        super().train(memory, epochs, epoch_size, batch_size)
+
+    def weights_changed(self):
+        """
+        Let each head know that the weights of the full model have changed
+        """
+
+        for name in self.heads:
+            getattr(self, name).weights_changed()
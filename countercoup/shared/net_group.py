@@ -2,77 +2,126 @@ from countercoup.shared.networks.lose_net import LoseNet
 from countercoup.shared.networks.block_counteract_net import BlockCounteractNet
 from countercoup.shared.networks.action_net import ActionNet
 from countercoup.shared.structure import Structure
+from countercoup.shared.numpy_group import NumpyNetworkGroup
 from zipfile import ZipFile
-from os import remove
+from keras.models import load_model
+from io import BytesIO
+from h5py import File
 
 
 class NetworkGroup:
     """
-    Combined group of networks used to define CounterCoup
+    Combined group of networks used to define CounterCoup. The group is saved as a single zip file, with each
+    network's model config and weight arrays read straight out of the archive. Networks are loaded the first time
+    they're used
     """
 
-    def __init__(self, file_path: str = None, structure: Structure = None):
+    networks = {'action': ActionNet
+                , 'block': BlockCounteractNet
+                , 'counteract': BlockCounteractNet
+                , 'lose': LoseNet}
 
-        if file_path is not None:
-            self.load(file_path)
-        else:
-            self.action = ActionNet(structure=structure)
-            self.block = BlockCounteractNet(structure=structure)
-            self.counteract = BlockCounteractNet(structure=structure)
-            self.lose = LoseNet(structure=structure)
+    # The number of outputs cached in front of each network, 0 for no caches
+    cache_size = 0
 
-    def train_networks(self, action_mem, block_mem, counteract_mem, lose_mem):
+    def __init__(self, file_path: str = None, structure: Structure = None, lazy: bool = True):
         """
-        Train the strategy networks, at the end
+        Set up the group
+        :param file_path: the path of a saved group to load
+        :param structure: the structure of new networks, when no file_path is given
+        :param lazy: if True, only load each network from the file when it is first used
         """
-        self.action.train(action_mem)
-        self.block.train(block_mem)
-        self.counteract.train(counteract_mem)
-        self.lose.train(lose_mem)
 
-    def load(self, file_path: str):
+        self.file_path = file_path
 
-        with ZipFile(file_path, 'r') as zf:
-            zf.extract('action.h5')
-            self.action = ActionNet('action.h5')
-            remove('action.h5')
+        if file_path is not None:
+            self.load(file_path, lazy)
+        else:
+            for name, network_type in self.networks.items():
+                setattr(self, name, network_type(structure=structure))
 
-            zf.extract('block.h5')
-            self.block = BlockCounteractNet('block.h5')
-            remove('block.h5')
+    def __setattr__(self, name, value):
+        # Networks get a cache as they're set, so ones loaded lazily pick it up too
+        if name in self.networks and self.cache_size > 0:
+            value.enable_cache(self.cache_size)
 
-            zf.extract('counteract.h5')
-            self.counteract = BlockCounteractNet('counteract.h5')
-            remove('counteract.h5')
+        super().__setattr__(name, value)
 
-            zf.extract('lose.h5')
-            self.lose = LoseNet('lose.h5')
-            remove('lose.h5')
+    def __getattr__(self, name):
+        # Only called for attributes that haven't been set, i.e. networks that haven't been loaded yet
+        if name not in self.networks or self.__dict__.get('file_path') is None:
+            raise AttributeError(name)
 
-    def save(self, file_path: str):
+        with ZipFile(self.file_path, 'r') as zf:
+            network = self.networks[name].load_archive(zf, name)
 
-        with ZipFile(file_path, 'a') as zf:
-            self.action.save('action.h5')
-            zf.write('action.h5')
-            remove('action.h5')
+        setattr(self, name, network)
+        return network
 
-            self.block.save('block.h5')
-            zf.write('block.h5')
-            remove('block.h5')
+    def enable_cache(self, capacity: int = 100000):
+        """
+        Put an LRU cache in front of each network, including those not loaded yet. Strategy networks are fixed once
+        trained, and the same infosets come up again and again over many games, the early game especially
+        :param capacity: the maximum number of outputs held by each network
+        """
 
-            self.counteract.save('counteract.h5')
-            zf.write('counteract.h5')
-            remove('counteract.h5')
+        self.cache_size = capacity
 
-            self.lose.save('lose.h5')
-            zf.write('lose.h5')
-            remove('lose.h5')
+        for name in self.networks:
+            if name in self.__dict__:
+                self.__dict__[name].enable_cache(capacity)
 
+    def train_networks(self, action_mem, block_mem, counteract_mem, lose_mem):
+        """
+        Train the strategy networks, at the end
+        """
+        self.action.train(action_mem)
+        self.block.train(block_mem)
+        self.counteract.train(counteract_mem)
+        self.lose.train(lose_mem)
 
+    def load(self, file_path: str, lazy: bool = True):
+        """
+        Load a group. Groups saved in the older format of one .h5 file per network are read into memory, and
+        can't be loaded lazily
+        :param file_path: the path to load the group from
+        :param lazy: if True, only load each network when it is first used
+        """
 
+        for name in self.networks:
+            self.__dict__.pop(name, None)
 
+        self.file_path = file_path
 
+        with ZipFile(file_path, 'r') as zf:
+            if 'action.h5' in zf.namelist():
+                for name, network_type in self.networks.items():
+                    with File(BytesIO(zf.read(name + '.h5')), 'r') as f:
+                        setattr(self, name, network_type(model=load_model(f)))
+            elif not lazy:
+                for name, network_type in self.networks.items():
+                    setattr(self, name, network_type.load_archive(zf, name))
 
+    def save(self, file_path: str):
+        """
+        Save the group to a single zip file, replacing anything already there
+        :param file_path: the path to save the group to
+        """
 
+        # Networks not loaded yet have to be read before the file is overwritten, if it's the same one
+        networks = {name: getattr(self, name) for name in self.networks}
 
+        with ZipFile(file_path, 'w') as zf:
+            for name, network in networks.items():
+                network.save_archive(zf, name)
 
+        self.file_path = file_path
+
+    def export(self, file_path: str, precision: str = 'float32'):
+        """
+        Export the networks as plain weight arrays, which can be played with by NumpyNetworkGroup without
+        TensorFlow
+        :param file_path: the path to export the group to
+        :param precision: the precision the weights are stored at - float32, float16 or int8
+        """
+        NumpyNetworkGroup.from_group(self).save(file_path, precision)
@@ -1,27 +1,45 @@
 from countercoup.shared.infoset import Infoset
-from countercoup.shared.memory import Memory
-from countercoup.shared.batch_memory import BatchMemory
 from countercoup.shared.structure import Structure
+from countercoup.shared.trainable_model import TrainableModel
+from countercoup.shared.numpy_network import NumpyNetwork
+from countercoup.shared.compiled_model import CompiledModel
+from countercoup.shared.inference_cache import InferenceCache
+from countercoup.shared.sample_encoding import SampleEncoding
 from countercoup.shared.structures.lstm import LSTMNet
-from keras.models import Model, load_model
-from numpy import array, int16
 
+# Imported so that the StackHistories layer is registered before any models are loaded
+from countercoup.shared.stack_histories import StackHistories
+from keras.models import Model, load_model, model_from_json
+from zipfile import ZipFile
+from numpy import array, int16, save, load
 
-class Network:
+
+class Network(TrainableModel):
     """Base class for the neural networks used in Deep CFR"""
 
     outputs = None
     final_activation = 'linear'
     model = None
+    runtime = None
+    compiled = None
+    cache = None
+
+    # Whether the model reads the history inputs, so infosets for it know whether to work out the history
+    uses_history = True
 
-    def __init__(self, file_path: str = None, structure: Structure = None):
+    def __init__(self, file_path: str = None, structure: Structure = None, model: Model = None):
 
-        if file_path is not None:
+        if model is not None:
+            self.model = model
+            self.uses_history = NumpyNetwork.config_uses_history(model.get_config())
+        elif file_path is not None:
             self.load(file_path)
-        elif structure is None:
-            self.model = LSTMNet.define_structure(self.outputs)
         else:
+            if structure is None:
+                structure = LSTMNet
+
             self.model = structure.define_structure(self.outputs)
+            self.uses_history = structure.uses_history
 
     def get_output(self, infoset: Infoset, filt: [] = None) -> dict:
         """
@@ -31,28 +49,110 @@ class Network:
         :return: a dict of possible outputs and output values
         """
 
-        result = self.model([infoset.fixed_vector] + infoset.history_vectors).numpy()
-        output = {}
+        return self.format_output(self.get_output_vector(infoset), filt)
 
-        for num, action in enumerate(self.outputs):
-            if filt is None or action in filt:
-                output[action] = result[0][num]
+    def get_output_vector(self, infoset: Infoset):
+        """
+        Return the predicted output from the neural network as an array
+        :param infoset: the Infoset object that forms the input
+        :return: an array of output values, in the same order as outputs
+        """
+
+        if self.cache is None:
+            return self.run(infoset)
+
+        key = InferenceCache.key(infoset)
+
+        output = self.cache.get(key)
+        if output is None:
+            output = self.run(infoset)
+            self.cache.put(key, output)
 
         return output
 
-    def train(self, memory: Memory, epochs: int = 10, batch_size: int = None):
+    def run(self, infoset: Infoset):
         """
-        Train the network
-        :param memory: a Memory of data to train on
-        :param epochs: number of epochs to train on
-        :param batch_size: size of each epoch
+        Run an infoset through the network, bypassing the cache
+        :param infoset: the Infoset object that forms the input
+        :return: an array of output values, in the same order as outputs
         """
 
-        if batch_size is None:
-            batch_size = round(len(memory) / epochs)
+        if self.runtime is not None:
+            return self.runtime.get_output_vector(infoset)
 
-        bm = BatchMemory(memory, batch_size)
-        self.model.fit(x=bm, epochs=epochs)
+        if self.compiled is not None:
+            return self.compiled.get_output_vector(infoset)
+
+        return self.model([infoset.fixed_vector] + infoset.history_vectors).numpy()[0]
+
+    def enable_incremental(self):
+        """
+        Switch to incremental inference - outputs are worked out by a NumpyNetwork, which only steps the history
+        LSTMs over the rows added since the last query from the same game. Best for single queries during traversal
+        """
+        self.runtime = NumpyNetwork.from_model(self.model, self.outputs)
+
+    def disable_incremental(self):
+        """
+        Switch back to running the Keras model for every query
+        """
+        self.runtime = None
+
+    def enable_compiled(self, buckets: [] = None):
+        """
+        Switch to compiled inference - queries are padded to a history length bucket and run through a traced
+        function, so the model isn't retraced for new history lengths
+        :param buckets: the history lengths that inputs are padded up to
+        """
+        self.compiled = CompiledModel(self.model, buckets)
+
+    def disable_compiled(self):
+        """
+        Switch back to calling the Keras model directly
+        """
+        self.compiled = None
+
+    def enable_cache(self, capacity: int = 100000):
+        """
+        Put an LRU cache in front of the network, so identical infosets are only run once. The cache is emptied
+        whenever the weights change
+        :param capacity: the maximum number of outputs held
+        """
+        self.cache = InferenceCache(capacity)
+
+    def disable_cache(self):
+        """
+        Remove the cache
+        """
+        self.cache = None
+
+    def weights_changed(self):
+        """
+        Rebuild the NumpyNetwork if incremental inference is on, and empty the cache, after the weights have changed.
+        Also called when another model that shares layers with this one has been trained
+        """
+
+        if self.runtime is not None:
+            self.enable_incremental()
+
+        if self.cache is not None:
+            self.cache.clear()
+
+    def format_output(self, result, filt: [] = None) -> dict:
+        """
+        Turn a row of output from the neural network into a dict
+        :param result: the output values, in the same order as outputs
+        :param filt: the outputs that we want to potentially restrict on
+        :return: a dict of possible outputs and output values
+        """
+
+        output = {}
+
+        for num, action in enumerate(self.outputs):
+            if filt is None or action in filt:
+                output[action] = result[num]
+
+        return output
 
     def save(self, file_path: str):
         """
@@ -67,25 +167,58 @@ class Network:
         :param file_path: the path to load the net from
         """
         self.model = load_model(file_path)
+        self.uses_history = NumpyNetwork.config_uses_history(self.model.get_config())
+        self.weights_changed()
+
+        if self.compiled is not None:
+            self.enable_compiled(self.compiled.buckets)
+
+    def save_archive(self, zf: ZipFile, prefix: str):
+        """
+        Save the network into an open zip file, as the model config and a .npy file for each weight array
+        :param zf: the zip file, open for writing
+        :param prefix: the directory in the zip file to save the network to
+        """
+
+        zf.writestr(prefix + '/model.json', self.model.to_json())
+
+        for n, w in enumerate(self.model.get_weights()):
+            with zf.open('{prefix}/{n}.npy'.format(prefix=prefix, n=n), 'w') as f:
+                save(f, w)
+
+    @classmethod
+    def load_archive(cls, zf: ZipFile, prefix: str):
+        """
+        Load a network saved by save_archive, reading straight from the zip file
+        :param zf: the zip file, open for reading
+        :param prefix: the directory in the zip file the network was saved to
+        :return: the network
+        """
+
+        model = model_from_json(zf.read(prefix + '/model.json').decode())
+        model.compile(loss='mean_squared_error', optimizer='adam')
+
+        weights = []
+        for n in range(len(model.get_weights())):
+            with zf.open('{prefix}/{n}.npy'.format(prefix=prefix, n=n)) as f:
+                weights.append(load(f))
+
+        model.set_weights(weights)
+
+        return cls(model=model)
 
     @classmethod
-    def create_train_data(cls, iput: Infoset, output: dict, iteration: int) -> tuple:
+    def create_train_data(cls, iput: Infoset, output, iteration: int) -> tuple:
         """
-        Turn the output dict into a tuple that can go into a NN
+        Turn the output array into a tuple that can go into a NN, packed with SampleEncoding so it takes up little
+        room in the memories
         :param iput: the Infoset input
-        :param output: the dict output
+        :param output: the output, as an array over outputs
         :param iteration: the iteration. Used to weigh when training.
         :return: a list output
         """
 
-        new_input = [iput.fixed_vector] + iput.history_vectors
-
-        new_output = []
-
-        for x in cls.outputs:
-            if x in output:
-                new_output.append(output[x])
-            else:
-                new_output.append(0)
+        new_input = [SampleEncoding.pack_fixed(iput.fixed_vector)] \
+            + [SampleEncoding.pack_history(x) for x in iput.history_vectors]
 
-        return new_input, array([new_output], dtype=int16), array([[iteration]], dtype=int16)
+        return new_input, array([output], dtype=SampleEncoding.target_type), array([[iteration]], dtype=int16)
@@ -1,7 +1,8 @@
 from countercoup.shared.network import Network
+from countercoup.shared.outputs import Outputs
 
 
 class BlockCounteractNet(Network):
     """Network used for counteraction and blocking decisions"""
 
-    outputs = [True, False]
+    outputs = Outputs.block_counteract
@@ -0,0 +1,121 @@
+from countercoup.shared.numpy_network import NumpyNetwork
+from countercoup.shared.outputs import Outputs
+from numpy import load, savez, array, abs as np_abs, where, rint, int8, float16, float32
+from zipfile import ZipFile
+from json import dumps, loads
+
+
+class NumpyNetworkGroup:
+    """
+    Group of strategy networks exported from a NetworkGroup, run with NumpyNetwork. The export is a single .npz
+    file of the model configs and plain weight arrays, so loading and playing with it never imports TensorFlow.
+    Weights can be exported at reduced precision to shrink the file - they're brought back to float32 on load
+    """
+
+    precisions = ['float32', 'float16', 'int8']
+
+    names = ['action', 'block', 'counteract', 'lose']
+    outputs = {'action': Outputs.action
+               , 'block': Outputs.block_counteract
+               , 'counteract': Outputs.block_counteract
+               , 'lose': Outputs.lose}
+
+    def __init__(self, file_path: str = None, networks: dict = None):
+        """
+        Load an exported group, or set one up from NumpyNetworks
+        :param file_path: the path of the exported group
+        :param networks: name -> NumpyNetwork, used when no file_path is given
+        """
+
+        if file_path is not None:
+            self.load(file_path)
+        else:
+            for name in self.names:
+                setattr(self, name, networks[name])
+
+    @classmethod
+    def from_group(cls, net_group):
+        """
+        Convert the Keras models of a NetworkGroup
+        :param net_group: the NetworkGroup
+        :return: the NumpyNetworkGroup
+        """
+        return cls(networks={x: NumpyNetwork.from_model(getattr(net_group, x).model, cls.outputs[x])
+                             for x in cls.names})
+
+    @staticmethod
+    def is_export(file_path: str) -> bool:
+        """
+        Check whether a file is an exported group rather than a saved NetworkGroup - both are zip files
+        :param file_path: the path of the file
+        :return: True if the file is an exported group
+        """
+
+        with ZipFile(file_path, 'r') as zf:
+            return 'config.npy' in zf.namelist()
+
+    @staticmethod
+    def quantise(w) -> tuple:
+        """
+        Quantise a weight matrix to int8, with a scale for each output channel (column)
+        :param w: the (inputs, outputs) weight matrix
+        :return: a tuple of the int8 matrix and the float32 scales
+        """
+
+        scale = np_abs(w).max(axis=0) / 127
+        scale = where(scale > 0, scale, 1).astype(float32)
+
+        return rint(w / scale).astype(int8), scale
+
+    def save(self, file_path: str, precision: str = 'float32'):
+        """
+        Save the group as a single .npz file. Weight arrays are stored as network/layer/index. With int8 precision,
+        weight matrices are stored with a network/layer/index.scale array of per-channel scales, and biases are
+        kept as float32
+        :param file_path: the path to save the group to
+        :param precision: float32, float16 or int8
+        """
+
+        if precision not in self.precisions:
+            raise ValueError('precision must be one of {precisions}'.format(precisions=self.precisions))
+
+        arrays = {'config': array(dumps({x: getattr(self, x).config for x in self.names}))}
+
+        for name in self.names:
+            for layer, weights in getattr(self, name).weights.items():
+                for n, w in enumerate(weights):
+                    key = '{net}/{layer}/{n}'.format(net=name, layer=layer, n=n)
+
+                    if precision == 'int8' and w.ndim == 2:
+                        arrays[key], arrays[key + '.scale'] = self.quantise(w)
+                    elif precision == 'float16':
+                        arrays[key] = w.astype(float16)
+                    else:
+                        arrays[key] = w
+
+        with open(file_path, 'wb') as f:
+            savez(f, **arrays)
+
+    def load(self, file_path: str):
+        """
+        Load an exported group
+        :param file_path: the path to load the group from
+        """
+
+        with load(file_path) as data:
+            configs = loads(str(data['config']))
+
+            weights = {x: {} for x in self.names}
+            for key in data.files:
+                if key != 'config' and not key.endswith('.scale'):
+                    name, layer, n = key.split('/')
+                    w = data[key]
+
+                    if key + '.scale' in data.files:
+                        w = w.astype(float32) * data[key + '.scale']
+
+                    weights[name].setdefault(layer, {})[int(n)] = w
+
+        for name in self.names:
+            layers = {layer: [w[n] for n in sorted(w)] for layer, w in weights[name].items()}
+            setattr(self, name, NumpyNetwork(configs[name], layers, self.outputs[name]))
@@ -0,0 +1,196 @@
+from countercoup.shared.infoset import Infoset
+from itertools import count
+from numpy import zeros, concatenate, stack, maximum, exp, tanh, float32
+
+
+class NumpyNetwork:
+    """
+    Runs the forward pass of a network's model in Numpy, one infoset at a time. History LSTMs are run incrementally -
+    the LSTM state after each row of a player's history is cached on the game's HistoryEncoder, so a query only
+    steps the LSTMs over the rows appended since the last query, and then runs the dense layers. As the states are
+    kept with the encoder they are shared by sibling branches, and are dropped when the encoder rolls back
+    """
+
+    activations = {'linear': lambda x: x
+                   , 'relu': lambda x: maximum(x, 0)
+                   , 'sigmoid': lambda x: 1 / (1 + exp(-x))
+                   , 'tanh': tanh}
+
+    # Keys for the LSTM states cached on encoders, unique to each NumpyNetwork
+    keys = count()
+
+    # The class name that StackHistories layers are saved under
+    stack_histories = 'countercoup>StackHistories'
+
+    def __init__(self, config: dict, weights: dict, outputs: [] = None):
+        """
+        Set up the network
+        :param config: the config of a Keras functional model, as returned by Model.get_config
+        :param weights: layer name -> list of weight arrays of that layer
+        :param outputs: the outputs of the network
+        """
+
+        self.key = next(self.keys)
+        self.config = config
+        self.outputs = outputs
+        self.inputs = [x[0] for x in config['input_layers']]
+        self.output = config['output_layers'][0][0]
+        self.uses_history = self.config_uses_history(config)
+
+        # (type, name, inbound layer names, layer config) for each layer, in the order they are run
+        self.layers = []
+        self.weights = {}
+
+        for layer in config['layers']:
+            name = layer['config']['name']
+            inbound = [x[0] for x in layer['inbound_nodes'][0]] if layer['inbound_nodes'] else []
+            self.layers.append((layer['class_name'], name, inbound, layer['config']))
+            self.weights[name] = [w.astype(float32) for w in weights.get(name, [])]
+
+        # The model inputs each LSTM reads (several when it is shared through StackHistories), and whether a
+        # Masking layer is in front of it
+        sources = {x[1]: ([x[1]], False) for x in self.layers if x[0] == 'InputLayer'}
+        for kind, name, inbound, _ in self.layers:
+            if kind == self.stack_histories:
+                sources[name] = ([sources[x][0][0] for x in inbound], False)
+            elif kind == 'Masking':
+                sources[name] = (sources[inbound[0]][0], True)
+            elif kind in ('LSTM', 'TimeDistributed'):
+                sources[name] = sources[inbound[0]]
+        self.lstm_inputs = {x[1]: sources[x[1]] for x in self.layers if x[0] in ('LSTM', 'TimeDistributed')}
+
+    @staticmethod
+    def config_uses_history(config: dict) -> bool:
+        """
+        Check whether a model reads its history inputs, for models that were loaded rather than made from
+        a Structure
+        :param config: the config of a Keras functional model, as returned by Model.get_config
+        :return: True if any of the history inputs are connected to a layer
+        """
+
+        histories = [x[0] for x in config['input_layers'][1:]]
+
+        return any(x[0] in histories for layer in config['layers'] for node in layer['inbound_nodes'] for x in node)
+
+    @classmethod
+    def from_model(cls, model, outputs: [] = None):
+        """
+        Create a NumpyNetwork from a Keras model
+        :param model: the Keras model
+        :param outputs: the outputs of the network
+        :return: the NumpyNetwork
+        """
+        return cls(model.get_config(), {x.name: x.get_weights() for x in model.layers}, outputs)
+
+    def get_output_vector(self, infoset: Infoset):
+        """
+        Return the output of the network for an infoset
+        :param infoset: the Infoset object that forms the input
+        :return: an array of output values, in the same order as the network's outputs
+        """
+
+        values = {self.inputs[0]: infoset.fixed_vector[0].astype(float32)}
+        if self.uses_history:
+            values.update((name, x[0].astype(float32)) for name, x in zip(self.inputs[1:], infoset.history_vectors))
+
+        for kind, name, inbound, config in self.layers:
+            if kind == 'Dense':
+                w = self.weights[name]
+                x = values[inbound[0]] @ w[0]
+                if config['use_bias']:
+                    x = x + w[1]
+                values[name] = self.activations[config['activation']](x)
+            elif kind == 'LSTM':
+                sources, masked = self.lstm_inputs[name]
+                values[name] = self.__lstm(name, config, infoset, sources[0], masked)
+            elif kind == 'TimeDistributed':
+                if config['layer']['class_name'] != 'LSTM':
+                    raise ValueError('only LSTM layers are supported in TimeDistributed layers')
+
+                sources, masked = self.lstm_inputs[name]
+                values[name] = stack([self.__lstm(name, config['layer']['config'], infoset, x, masked)
+                                      for x in sources])
+            elif kind == self.stack_histories:
+                # The LSTMs read the histories straight from the infoset
+                values[name] = None
+            elif kind == 'Flatten':
+                values[name] = values[inbound[0]].ravel()
+            elif kind == 'Concatenate':
+                values[name] = concatenate([values[x] for x in inbound])
+            elif kind in ('Dropout', 'Masking'):
+                values[name] = values[inbound[0]]
+            elif kind != 'InputLayer':
+                raise ValueError('{kind} layers are not supported'.format(kind=kind))
+
+        return values[self.output]
+
+    def __lstm(self, name: str, config: dict, infoset: Infoset, source: str, masked: bool):
+        """
+        Run an LSTM layer over a history input. With a Masking layer in front of the LSTM the empty history (a single
+        row of zeros) is skipped, and the states can be cached on the encoder the history came from
+        :param name: the name of the LSTM layer
+        :param config: the config of the LSTM layer
+        :param infoset: the Infoset object that forms the input
+        :param source: the name of the history input
+        :param masked: whether there is a Masking layer in front of the LSTM
+        :return: the final output of the LSTM
+        """
+
+        history = self.inputs.index(source) - 1
+        units = config['units']
+
+        encoder = infoset.history_encoder
+        if not masked or encoder is None or encoder.generation != infoset.history_generation:
+            rows = infoset.history_vectors[history][0]
+            if masked:
+                rows = rows[rows.any(axis=1)]
+
+            h = c = zeros(units, dtype=float32)
+            for h, c in self.__steps(name, config, rows, h, c):
+                pass
+            return h
+
+        player = infoset.history_players[history]
+        length = infoset.history_lengths[history]
+        if length == 0:
+            return zeros(units, dtype=float32)
+
+        states = encoder.lstm_states.setdefault((self.key, name), [[] for _ in encoder.lengths])[player]
+
+        if len(states) < length:
+            h, c = states[-1] if states else (zeros(units, dtype=float32), zeros(units, dtype=float32))
+            states += self.__steps(name, config, encoder.buffers[player][len(states):length], h, c)
+
+        return states[length - 1][0]
+
+    def __steps(self, name: str, config: dict, rows, h, c) -> []:
+        """
+        Step an LSTM layer over some rows
+        :param name: the name of the LSTM layer
+        :param config: the config of the LSTM layer
+        :param rows: the (n, features) rows
+        :param h: the starting hidden state
+        :param c: the starting cell state
+        :return: a list of the (hidden, cell) states after each row
+        """
+
+        kernel, recurrent = self.weights[name][:2]
+        units = config['units']
+        activation = self.activations[config['activation']]
+        recurrent_activation = self.activations[config['recurrent_activation']]
+
+        # The input part of every step is done in one go, and only the recurrent part is done row by row
+        z = rows.astype(float32) @ kernel
+        if config['use_bias']:
+            z += self.weights[name][2]
+
+        states = []
+        for x in z:
+            x = x + h @ recurrent
+            i = recurrent_activation(x[:units])
+            f = recurrent_activation(x[units:2 * units])
+            c = f * c + i * activation(x[2 * units:3 * units])
+            h = recurrent_activation(x[3 * units:]) * activation(c)
+            states.append((h, c))
+
+        return states
@@ -0,0 +1,42 @@
+from countercoup.model.hand import Hand
+from countercoup.model.items.cards import Duke, Assassin, Ambassador, Captain, Contessa
+from countercoup.model.items.actions import Income, ForeignAid, Coup, Tax, Assassinate, Exchange, Steal
+from numpy import array
+
+
+class Outputs:
+    """
+    The outputs of each type of network, and index tables that map choices straight to output slots. Strategies and
+    legal-choice masks are arrays over these outputs
+    """
+
+    action = [(Income, None), (ForeignAid, None), (Coup, 0), (Coup, 1), (Coup, 2), (Tax, None), (Assassinate, 0)
+              , (Assassinate, 1), (Assassinate, 2), (Exchange, None), (Steal, 0), (Steal, 1), (Steal, 2)]
+
+    block_counteract = [True, False]
+    block_counteract_mask = array([True, True])
+    block_counteract_mask.setflags(write=False)
+
+    lose = [Hand([Duke, Duke]), Hand([Duke, Assassin]), Hand([Duke, Ambassador]), Hand([Duke, Captain]),
+            Hand([Duke, Contessa]), Hand([Assassin, Assassin]), Hand([Assassin, Ambassador]),
+            Hand([Assassin, Captain]), Hand([Assassin, Contessa]), Hand([Ambassador, Ambassador]),
+            Hand([Ambassador, Captain]), Hand([Ambassador, Contessa]), Hand([Captain, Captain]),
+            Hand([Captain, Contessa]), Hand([Contessa, Contessa]), Hand([Duke]), Hand([Assassin]),
+            Hand([Ambassador]), Hand([Captain]), Hand([Contessa])]
+
+    # Action tuple -> action output slot, and action -> its output slots (one per opponent for attack actions)
+    action_index = {x: n for n, x in enumerate(action)}
+    action_slots = {Income: [0], ForeignAid: [1], Coup: [2, 3, 4], Tax: [5], Assassinate: [6, 7, 8], Exchange: [9]
+                    , Steal: [10, 11, 12]}
+
+    # Card -> row/column of lose_index
+    cards = [Duke, Assassin, Ambassador, Captain, Contessa]
+    card_index = {x: n for n, x in enumerate(cards)}
+
+    # lose_index[i][j] is the lose output slot for the hand of cards i and j, and lose_index[i][5] is the slot for
+    # card i on its own
+    lose_index = [[0, 1, 2, 3, 4, 15]
+                  , [1, 5, 6, 7, 8, 16]
+                  , [2, 6, 9, 10, 11, 17]
+                  , [3, 7, 10, 12, 13, 18]
+                  , [4, 8, 11, 13, 14, 19]]
@@ -0,0 +1,56 @@
+from numpy import arange, zeros, uint8, uint16, float16, float32
+
+
+class SampleEncoding:
+    """
+    Compact encoding of the samples held in the memories. History rows are 12 binary flags, so each is packed into
+    a single uint16, the fixed vector only holds small counts and flags, so it fits in uint8, and targets are kept
+    as float16 rather than truncated to integers. Samples are unpacked a whole minibatch at a time
+    """
+
+    # The bit each history column is packed into
+    bits = (1 << arange(12)).astype(uint16)
+
+    target_type = float16
+
+    @staticmethod
+    def pack_fixed(fixed):
+        """
+        Pack a fixed vector
+        :param fixed: the (1, n) fixed vector of an Infoset
+        :return: the (1, n) uint8 fixed vector
+        """
+        return fixed.astype(uint8)
+
+    @staticmethod
+    def pack_history(history):
+        """
+        Pack a history vector, one uint16 per row
+        :param history: the (1, n, 12) history vector of an Infoset
+        :return: the (1, n) uint16 packed history
+        """
+        return (history.astype(uint16) * SampleEncoding.bits).sum(axis=2, dtype=uint16)
+
+    @staticmethod
+    def unpack_history(packed):
+        """
+        Unpack packed history rows
+        :param packed: an array of packed rows, of any shape
+        :return: a float32 array with an extra last axis of the 12 flags of each row
+        """
+        return (packed[..., None] & SampleEncoding.bits).astype(bool).astype(float32)
+
+    @staticmethod
+    def pad_histories(histories: []):
+        """
+        Stack the packed histories of several samples, padding them with zeros at the end to the longest one
+        :param histories: a list of (1, n) packed histories
+        :return: a (samples, longest) array of packed rows
+        """
+
+        padded = zeros((len(histories), max(x.shape[1] for x in histories)), dtype=uint16)
+
+        for num, x in enumerate(histories):
+            padded[num, :x.shape[1]] = x[0]
+
+        return padded
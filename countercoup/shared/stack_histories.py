@@ -0,0 +1,18 @@
+from keras.layers import Layer
+from keras.utils import register_keras_serializable
+from tensorflow import stack, pad, shape, reduce_max
+
+
+@register_keras_serializable('countercoup')
+class StackHistories(Layer):
+    """
+    Keras layer that stacks several history inputs into one (batch, histories, steps, features) tensor, padding them
+    with zeros at the end to the longest, so they can all be encoded by one shared layer in a single call
+    """
+
+    def call(self, inputs):
+        length = reduce_max([shape(x)[1] for x in inputs])
+        return stack([pad(x, [[0, 0], [0, length - shape(x)[1]], [0, 0]]) for x in inputs], axis=1)
+
+    def compute_output_shape(self, input_shape):
+        return (input_shape[0][0], len(input_shape), None, input_shape[0][2])
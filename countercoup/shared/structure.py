@@ -6,6 +6,16 @@ class Structure:
     Base class for network structures
     """
 
+    # Whether the structure reads the history inputs. If not, infosets for its networks never work out the history
+    uses_history = True
+
+    # Whether the structure can put the networks of every decision type into one model, with a head for each
+    multi_head = False
+
     @staticmethod
     def define_structure(outputs: []) -> Model:
         pass
+
+    @staticmethod
+    def define_heads(heads: dict) -> Model:
+        pass
@@ -6,6 +6,9 @@ from countercoup.shared.structure import Structure
 class Basic(Structure):
     """Basic structure, 6 layers with no recurrent cells"""
 
+    # The history inputs are kept so the models are interchangeable, but aren't connected to anything
+    uses_history = False
+
     @staticmethod
     def define_structure(outputs: []) -> Model:
         fixed_input = Input(shape=(46,))
@@ -1,5 +1,5 @@
 from keras.models import Model, load_model
-from keras.layers import Dense, LSTM, Concatenate, Input, Dropout
+from keras.layers import Dense, LSTM, Concatenate, Input, Masking, Dropout
 from countercoup.shared.structure import Structure
 
 
@@ -14,10 +14,10 @@ class Enhanced(Structure):
         history_play_2_input = Input(shape=(None, 12))
         history_play_3_input = Input(shape=(None, 12))
 
-        hist_lstm_curr = LSTM(10)(history_curr_play_input)
-        hist_lstm_play_1 = LSTM(10)(history_play_1_input)
-        hist_lstm_play_2 = LSTM(10)(history_play_2_input)
-        hist_lstm_play_3 = LSTM(10)(history_play_3_input)
+        hist_lstm_curr = LSTM(10)(Masking()(history_curr_play_input))
+        hist_lstm_play_1 = LSTM(10)(Masking()(history_play_1_input))
+        hist_lstm_play_2 = LSTM(10)(Masking()(history_play_2_input))
+        hist_lstm_play_3 = LSTM(10)(Masking()(history_play_3_input))
 
         lstm_concat = Concatenate(axis=1)([hist_lstm_curr, hist_lstm_play_1, hist_lstm_play_2, hist_lstm_play_3])
 
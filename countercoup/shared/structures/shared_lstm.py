@@ -0,0 +1,39 @@
+from keras.models import Model
+from keras.layers import Dense, LSTM, Concatenate, Input, Masking, TimeDistributed, Flatten
+from countercoup.shared.structure import Structure
+from countercoup.shared.stack_histories import StackHistories
+
+
+class SharedLSTMNet(Structure):
+    """Default structure, but with one LSTM cell shared by the opponent histories, run on them all at once"""
+
+    @staticmethod
+    def define_structure(outputs: []) -> Model:
+        fixed_input = Input(shape=(46,))
+        history_curr_play_input = Input(shape=(None, 12))
+        history_play_1_input = Input(shape=(None, 12))
+        history_play_2_input = Input(shape=(None, 12))
+        history_play_3_input = Input(shape=(None, 12))
+
+        hist_lstm_curr = LSTM(10)(Masking()(history_curr_play_input))
+
+        opponent_histories = StackHistories()([history_play_1_input, history_play_2_input, history_play_3_input])
+        hist_lstm_opponents = Flatten()(TimeDistributed(LSTM(10))(Masking()(opponent_histories)))
+
+        concat = Concatenate(axis=1)([fixed_input, hist_lstm_curr, hist_lstm_opponents])
+
+        dense_1 = Dense(100, activation='linear')(concat)
+        dense_2 = Dense(100, activation='linear')(dense_1)
+        dense_3 = Dense(100, activation='linear')(dense_2)
+        dense_4 = Dense(100, activation='linear')(dense_3)
+        dense_5 = Dense(100, activation='linear')(dense_4)
+        dense_6 = Dense(100, activation='linear')(dense_5)
+
+        output = Dense(len(outputs), activation='linear')(dense_6)
+
+        model = Model(
+            [fixed_input, history_curr_play_input, history_play_1_input, history_play_2_input, history_play_3_input],
+            output)
+        model.compile(loss='mean_squared_error', optimizer='adam')
+
+        return model
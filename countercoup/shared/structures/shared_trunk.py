@@ -0,0 +1,47 @@
+from keras.models import Model
+from keras.layers import Dense, LSTM, Concatenate, Input, Masking
+from countercoup.shared.structure import Structure
+
+
+class SharedTrunk(Structure):
+    """Shared trunk structure, LSTM cells and 4 ReLU layers shared by a 2 layer head for each decision type"""
+
+    multi_head = True
+
+    @staticmethod
+    def define_structure(outputs: []) -> Model:
+        return SharedTrunk.define_heads({'output': outputs})
+
+    @staticmethod
+    def define_heads(heads: dict) -> Model:
+        fixed_input = Input(shape=(46,))
+        history_curr_play_input = Input(shape=(None, 12))
+        history_play_1_input = Input(shape=(None, 12))
+        history_play_2_input = Input(shape=(None, 12))
+        history_play_3_input = Input(shape=(None, 12))
+
+        hist_lstm_curr = LSTM(10)(Masking()(history_curr_play_input))
+        hist_lstm_play_1 = LSTM(10)(Masking()(history_play_1_input))
+        hist_lstm_play_2 = LSTM(10)(Masking()(history_play_2_input))
+        hist_lstm_play_3 = LSTM(10)(Masking()(history_play_3_input))
+
+        concat = Concatenate(axis=1)(
+            [fixed_input, hist_lstm_curr, hist_lstm_play_1, hist_lstm_play_2, hist_lstm_play_3])
+
+        dense_1 = Dense(100, activation='relu')(concat)
+        dense_2 = Dense(100, activation='relu')(dense_1)
+        dense_3 = Dense(100, activation='relu')(dense_2)
+        dense_4 = Dense(100, activation='relu')(dense_3)
+
+        # One head per decision type, each output layer named after its head
+        head_outputs = []
+        for name, outputs in heads.items():
+            head_dense = Dense(100, activation='relu')(dense_4)
+            head_outputs.append(Dense(len(outputs), activation='linear', name=name)(head_dense))
+
+        model = Model(
+            [fixed_input, history_curr_play_input, history_play_1_input, history_play_2_input, history_play_3_input],
+            head_outputs if len(head_outputs) > 1 else head_outputs[0])
+        model.compile(loss='mean_squared_error', optimizer='adam')
+
+        return model
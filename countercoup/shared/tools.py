@@ -1,5 +1,11 @@
 from countercoup.model.game import Game
+from countercoup.model.hand import Hand
 from countercoup.model.items.actions import Income, ForeignAid, Coup, Tax, Assassinate, Exchange, Steal
+from countercoup.model.items.states import SelectAction, DecideToBlock, DecideToCounteract, SelectCardsToDiscard\
+    , DecideToBlockCounteract, SelectCardToLose
+from countercoup.shared.outputs import Outputs
+from numpy import array, zeros, full, count_nonzero
+from itertools import combinations
 from random import random
 
 
@@ -9,56 +15,62 @@ class Tools:
     """
 
     @staticmethod
-    def select_from_strategy(dist: dict):
+    def select_from_strategy(strategy):
         """
-        Select a key from a strategy
-        :param dist: the strategy distribution in the form {action: prob}
-        :return: the action selected
+        Select an output from a strategy
+        :param strategy: the strategy, as an array of probabilities over the outputs of a network
+        :return: the index of the output selected
         """
 
         val = random()
-        for x in dist:
-            val -= dist[x]
+        for n, x in enumerate(strategy.tolist()):
+            val -= x
             if val <= 0:
-                return x
+                return n
 
         # Not properly normalised!
         return None
 
     @staticmethod
-    def select_multiple_from_strategy(dist: dict, num: int) -> []:
+    def select_multiple_from_strategy(strategy, num: int, mask=None) -> []:
         """
-        Select multiple keys from a strategy
-        :param dist: the strategy distribution in the form {action: prob}
-        :param num: number of keys to return
-        :return: a list of selected actions
+        Select multiple outputs from a strategy, without replacement
+        :param strategy: the strategy, as an array of probabilities over the outputs of a network
+        :param num: number of outputs to return
+        :param mask: the legal outputs, as a boolean array. Defaults to those with a non-zero probability
+        :return: a list of the indexes of the selected outputs
         """
 
         output = []
-        dist_c = dist.copy()
+        dist = strategy.copy()
+        legal = mask.copy() if mask is not None else strategy > 0
 
         for _ in range(num):
-            key = Tools.select_from_strategy(dist_c)
-            output.append(key)
+            dist = Tools.normalise(dist, legal)
+            idx = Tools.select_from_strategy(dist)
+            output.append(idx)
 
-            del dist_c[key]
-            dist_c = Tools.normalise(dist_c)
+            dist[idx] = 0
+            legal[idx] = False
 
         return output
 
     @staticmethod
-    def normalise(strategy: dict) -> dict:
+    def normalise(strategy, mask=None):
         """
-        Normalise a dictionary, or return an equal distribution if = 0
-        :param strategy: the strategy to normalise
+        Normalise a strategy, or return an equal distribution over the legal outputs if it sums to 0
+        :param strategy: the strategy to normalise, as an array over the outputs of a network
+        :param mask: the legal outputs, as a boolean array. Defaults to all of them
         :return: the normalised strategy
         """
 
-        total = sum(strategy.values())
+        total = strategy.sum()
         if total > 0:
-            return {x: strategy[x] / total for x in strategy}
+            return strategy / total
+        elif mask is not None:
+            return mask / count_nonzero(mask)
         else:
-            return {x: 1 / len(strategy) for x in strategy}
+            return full(len(strategy), 1 / len(strategy))
 
     @staticmethod
     def get_actions(g: Game):
@@ -86,3 +98,122 @@ class Tools:
                     act_actions.append((x, None))
 
         return act_actions
+
+    @staticmethod
+    def get_action_mask(g: Game):
+        """
+        Returns the available actions for the current player as a mask over the action outputs, assuming that
+        we're at the SelectAction state
+        :param g: the Coup game
+        :return: a boolean array over Outputs.action
+        """
+
+        mask = [False] * len(Outputs.action)
+        act = [Income, ForeignAid, Coup, Tax, Assassinate, Exchange, Steal]
+
+        coins = g.players[g.action_player].coins
+        in_game = [g.players[x].in_game for x in g.get_opponents()]
+
+        if coins >= 10:
+            act = [Coup]
+
+        for x in act:
+            if coins >= x.cost:
+                slots = Outputs.action_slots[x]
+                if x.attack_action:
+                    for p in range(len(in_game)):
+                        mask[slots[p]] = in_game[p]
+                else:
+                    mask[slots[0]] = True
+
+        return array(mask)
+
+    @staticmethod
+    def get_discard_mask(cards: []):
+        """
+        Returns the pairs of cards that can be discarded from a hand as a mask over the lose outputs
+        :param cards: the cards in the hand
+        :return: a boolean array over Outputs.lose
+        """
+
+        mask = zeros(len(Outputs.lose), dtype=bool)
+        mask[[Outputs.lose_index[Outputs.card_index[x]][Outputs.card_index[y]] for x, y in combinations(cards, 2)]] \
+            = True
+
+        return mask
+
+    @staticmethod
+    def get_lose_mask(cards: []):
+        """
+        Returns the cards that can be lost from a hand as a mask over the lose outputs
+        :param cards: the cards in the hand
+        :return: a boolean array over Outputs.lose
+        """
+
+        mask = zeros(len(Outputs.lose), dtype=bool)
+        mask[[Outputs.lose_index[Outputs.card_index[x]][5] for x in cards]] = True
+
+        return mask
+
+    @staticmethod
+    def get_choice_mask(g: Game):
+        """
+        Returns the available choices for the current player, at any decision state of the game, as a mask over
+        the outputs of the network used for that decision
+        :param g: the Coup game
+        :return: a boolean array
+        """
+
+        if g.state == SelectAction:
+            return Tools.get_action_mask(g)
+        elif g.state in [DecideToBlock, DecideToCounteract, DecideToBlockCounteract]:
+            return Outputs.block_counteract_mask
+        elif g.state == SelectCardsToDiscard:
+            return Tools.get_discard_mask(g.get_curr_player().cards)
+        elif g.state == SelectCardToLose:
+            return Tools.get_lose_mask(g.get_curr_player().cards)
+        else:
+            return None
+
+    @staticmethod
+    def get_choices(g: Game) -> []:
+        """
+        Returns the available choices for the current player, at any state of the game
+        :param g: the Coup game
+        :return: a list of choices, in the same form as the outputs of the networks
+        """
+
+        if g.state == SelectAction:
+            return Tools.get_actions(g)
+        elif g.state in [DecideToBlock, DecideToCounteract, DecideToBlockCounteract]:
+            return [True, False]
+        elif g.state == SelectCardsToDiscard:
+            return list(Hand.get_all_hands(g.get_curr_player().cards))
+        elif g.state == SelectCardToLose:
+            return list(Hand.get_singular_hands(g.get_curr_player().cards))
+        else:
+            return []
+
+    @staticmethod
+    def play_choice(g: Game, choice):
+        """
+        Play a choice returned by get_choices
+        :param g: the Coup game
+        :param choice: the choice to play
+        """
+
+        if g.state == SelectAction:
+            if choice[0].attack_action:
+                g.select_action(choice[0], g.get_opponents()[choice[1]])
+            else:
+                g.select_action(choice[0])
+        elif g.state == DecideToBlock:
+            g.decide_to_block(choice)
+        elif g.state == DecideToCounteract:
+            g.decide_to_counteract(choice)
+        elif g.state == DecideToBlockCounteract:
+            g.decide_to_block_counteract(choice)
+        elif g.state == SelectCardsToDiscard:
+            g.select_cards_to_discard(choice.card1, choice.card2)
+        elif g.state == SelectCardToLose:
+            g.select_card_to_lose(choice.card1)
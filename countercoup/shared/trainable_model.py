@@ -0,0 +1,62 @@
+from countercoup.shared.memory import Memory
+from countercoup.shared.batch_memory import BatchMemory
+from numpy import concatenate
+
+
+class TrainableModel:
+    """
+    Base class for the objects that wrap a Keras model trained on a memory - the training loop and the flat weight
+    arrays that get sent between processes
+    """
+
+    model = None
+
+    def weights_changed(self):
+        """
+        Called after the weights of the model have changed, so anything worked out from them can be refreshed
+        """
+        pass
+
+    def train(self, memory: Memory, epochs: int = 10, epoch_size: int = None, batch_size: int = 32):
+        """
+        Train the model
+        :param memory: a Memory of data to train on
+        :param epochs: number of epochs to train on
+        :param epoch_size: number of samples in each epoch. Defaults to a single pass over the memory over all epochs
+        :param batch_size: number of samples in each minibatch
+        """
+
+        if epoch_size is None:
+            epoch_size = max(round(len(memory) / epochs), 1)
+
+        bm = BatchMemory(memory, epoch_size, batch_size)
+
+        try:
+            self.model.fit(x=bm, epochs=epochs, shuffle=False)
+        finally:
+            bm.close()
+
+        self.weights_changed()
+
+    def get_flat_weights(self):
+        """
+        Get the weights of the model as a single flat array
+        :return: a flat Numpy array of all the weights
+        """
+        return concatenate([w.ravel() for w in self.model.get_weights()])
+
+    def set_flat_weights(self, flat_weights):
+        """
+        Set the weights of the model from a flat array returned by get_flat_weights
+        :param flat_weights: the flat Numpy array of weights
+        """
+
+        weights = []
+        pos = 0
+
+        for w in self.model.get_weights():
+            weights.append(flat_weights[pos:pos + w.size].reshape(w.shape))
+            pos += w.size
+
+        self.model.set_weights(weights)
+        self.weights_changed()
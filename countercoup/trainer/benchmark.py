@@ -0,0 +1,889 @@
+from countercoup.model.game import Game
+from countercoup.model.compact_game import CompactGame
+from countercoup.model.items.states import SelectAction, SelectCardsToDiscard, GameFinished, DecideToBlock\
+    , DecideToCounteract, DecideToBlockCounteract
+from countercoup.shared.tools import Tools
+from countercoup.shared.infoset import Infoset
+from countercoup.shared.history_encoder import HistoryEncoder
+from countercoup.shared.network import Network
+from countercoup.shared.numpy_network import NumpyNetwork
+from countercoup.shared.compiled_model import CompiledModel
+from countercoup.shared.numpy_group import NumpyNetworkGroup
+from countercoup.shared.net_group import NetworkGroup
+from countercoup.shared.inference_server import InferenceServer
+from countercoup.shared.memory import Memory
+from countercoup.shared.array_memory import ArrayMemory
+from countercoup.shared.networks.action_net import ActionNet
+from countercoup.shared.structure import Structure
+from countercoup.shared.multi_head_network import MultiHeadNetwork
+from threading import Thread
+from copy import copy, deepcopy
+from random import sample, seed, choice, Random
+from time import perf_counter
+from tracemalloc import start as start_tracing, stop as stop_tracing, get_traced_memory, reset_peak
+from sys import getsizeof, executable
+from subprocess import run
+from json import loads
+from numpy import histogram, array, array_equal, log, maximum
+from os.path import getsize, join
+from tensorflow import function
+
+
+class Benchmark:
+    """Tools used to measure the performance of the trainer"""
+
+    @staticmethod
+    def measure_branching(num_of_games: int, use_snapshot: bool = True, num_of_players: int = 4
+                          , random_seed: int = 0) -> tuple:
+        """
+        Measure how quickly the game tree can be explored when branching in the same way as LimitedRobust
+        :param num_of_games: the number of games to explore
+        :param use_snapshot: if True, roll back using Game.snapshot/restore, otherwise deepcopy the game
+        :param num_of_players: number of players in each game
+        :param random_seed: the seed used, so that both methods explore identical trees
+        :return: a tuple of the number of nodes explored and the nodes per second
+        """
+
+        seed(random_seed)
+
+        def explore(game: Game) -> int:
+            if game.state == GameFinished or game.get_game_length() >= 50:
+                return 1
+
+            choices = Tools.get_choices(game)
+
+            # Branch on the first players actions and discards, follow a single path for everyone else
+            if game.current_player == 0 and game.state in [SelectAction, SelectCardsToDiscard]:
+                width = (3 if game.state == SelectAction else 2) if game.get_game_length() < 16 else 1
+                nodes = 1
+
+                if use_snapshot:
+                    snapshot = game.snapshot()
+
+                    for x in sample(choices, min(width, len(choices))):
+                        Tools.play_choice(game, x)
+                        nodes += explore(game)
+                        game.restore(snapshot)
+                else:
+                    for x in sample(choices, min(width, len(choices))):
+                        next_game = deepcopy(game)
+                        Tools.play_choice(next_game, x)
+                        nodes += explore(next_game)
+
+                return nodes
+            else:
+                Tools.play_choice(game, choice(choices))
+                return 1 + explore(game)
+
+        total_nodes = 0
+        start = perf_counter()
+
+        for _ in range(num_of_games):
+            total_nodes += explore(Game(num_of_players))
+
+        return total_nodes, total_nodes / (perf_counter() - start)
+
+    @staticmethod
+    def compare_branching(num_of_games: int, num_of_players: int = 4) -> dict:
+        """
+        Compare the nodes per second when rolling back with snapshots against deepcopying the game
+        :param num_of_games: the number of games to explore with each method
+        :param num_of_players: number of players in each game
+        :return: a dict of the nodes per second for each method
+        """
+
+        results = {}
+
+        for name, use_snapshot in [('deepcopy', False), ('snapshot', True)]:
+            _, rate = Benchmark.measure_branching(num_of_games, use_snapshot, num_of_players)
+            results[name] = rate
+
+        results['speedup'] = results['snapshot'] / results['deepcopy']
+
+        return results
+
+    @staticmethod
+    def compare_traversals(traversers: [], num_of_traversals: int, num_of_players: int = 4
+                           , random_seed: int = 0) -> dict:
+        """
+        Compare the speed and memory use of some traversers, each run on the same seed
+        :param traversers: the traversers to run, on the iterations and networks they were created with
+        :param num_of_traversals: the number of traversals to run with each traverser
+        :param num_of_players: number of players in each game
+        :param random_seed: the seed used for every traverser
+        :return: a dict of the nodes per second, samples per second and peak traced memory in bytes, keyed by the
+                 name of the traverser's type
+        """
+
+        results = {}
+
+        for traverser in traversers:
+            seed(random_seed)
+            traverser.take_results()
+
+            start_tracing()
+            start = perf_counter()
+
+            for x in range(num_of_traversals):
+                traverser.traverse(Game(num_of_players), x % num_of_players)
+
+            seconds = perf_counter() - start
+            _, peak = get_traced_memory()
+            stop_tracing()
+
+            results[type(traverser).__name__] = {'nodes_per_second': traverser.stats.total_nodes_traversed / seconds
+                                                 , 'samples_per_second': traverser.get_sample_count() / seconds
+                                                 , 'peak_memory': peak}
+
+            traverser.take_results()
+
+        return results
+
+    @staticmethod
+    def compare_engine(pairs: [], num_of_traversals: int, num_of_players: int = 4, random_seed: int = 0) -> dict:
+        """
+        Compare the recursive traversers in trainer/recursive with the traversers run by TraversalEngine. Both of a
+        pair play the same seeded traversals, so they should return the same values and gather the same samples
+        :param pairs: (recursive traverser, engine traverser) pairs, each pair created with the same iteration and
+                      networks
+        :param num_of_traversals: the number of traversals to run with each traverser
+        :param num_of_players: number of players in each game
+        :param random_seed: the seed of the first traversal. Each traversal after uses the next seed
+        :return: a dict keyed by the name of the engine traverser's type, of the nodes per second and the peak traced
+                 memory in bytes of a single traversal for 'recursive' and 'engine', and 'matched' - whether their
+                 values, nodes traversed and samples were all the same
+        """
+
+        results = {}
+
+        for recursive, engine in pairs:
+            runs = []
+
+            for traverser in [recursive, engine]:
+                traverser.take_results()
+
+                # The traversals are timed without tracing, as tracing slows them down several times, and then run
+                # again with tracing for the peak memory of each
+                seconds = 0
+                for x in range(num_of_traversals):
+                    seed(random_seed + x)
+                    start = perf_counter()
+                    traverser.traverse(Game(num_of_players), x % num_of_players)
+                    seconds += perf_counter() - start
+
+                nodes = traverser.stats.total_nodes_traversed
+                traverser.take_results()
+
+                values = []
+                samples = []
+                peak = 0
+
+                start_tracing()
+
+                for x in range(num_of_traversals):
+                    seed(random_seed + x)
+                    held, _ = get_traced_memory()
+                    reset_peak()
+
+                    values.append(traverser.traverse(Game(num_of_players), x % num_of_players))
+                    peak = max(peak, get_traced_memory()[1] - held)
+
+                    taken = traverser.take_results()
+                    samples.extend(y for mem in taken[0:4] for m in mem for y in m)
+                    samples.extend(y for mem in taken[4:8] for y in mem)
+
+                stop_tracing()
+
+                runs.append(({'nodes_per_second': nodes / seconds, 'peak_memory': peak}, values, nodes, samples))
+
+            matched = runs[0][1] == runs[1][1] and runs[0][2] == runs[1][2] and len(runs[0][3]) == len(runs[1][3]) \
+                and all(Benchmark.same_sample(a, b) for a, b in zip(runs[0][3], runs[1][3]))
+
+            results[type(engine).__name__] = {'recursive': runs[0][0], 'engine': runs[1][0], 'matched': matched}
+
+        return results
+
+    @staticmethod
+    def same_sample(a: tuple, b: tuple) -> bool:
+        """
+        Check whether two samples, as made by Network.create_train_data, are the same
+        :param a: the first sample
+        :param b: the second sample
+        :return: True if every array of the samples is equal
+        """
+        return len(a[0]) == len(b[0]) and all(array_equal(x, y) for x, y in zip(a[0], b[0])) \
+            and array_equal(a[1], b[1]) and array_equal(a[2], b[2])
+
+    @staticmethod
+    def compare_variance(traversers: [], num_of_traversals: int, num_of_players: int = 4
+                         , random_seed: int = 0) -> dict:
+        """
+        Compare how quickly some traversers converge, each run on the same seed. Every traversal returns an unbiased
+        estimate of the same value, the traversing player's expected regret at the root, so the lower its variance
+        the fewer traversals are needed for the same accuracy. Traversers with baselines start with empty ones
+        :param traversers: the traversers to run, on the iterations and networks they were created with
+        :param num_of_traversals: the number of traversals to run with each traverser
+        :param num_of_players: number of players in each game
+        :param random_seed: the seed used for every traverser
+        :return: a dict keyed by the name of the traverser's type, of the mean and variance of the values, the
+                 seconds per traversal, the variance per second - the variance times the seconds per traversal,
+                 which is the variance of the mean after a second of traversals - and for traversers with baselines,
+                 the fraction of decisions that had one
+        """
+
+        results = {}
+
+        for traverser in traversers:
+            seed(random_seed)
+            traverser.take_results()
+
+            if traverser.baseline_policy is not None:
+                traverser.baseline_policy.clear()
+                traverser.baseline_policy.take_counts()
+
+            values = []
+            start = perf_counter()
+
+            for x in range(num_of_traversals):
+                values.append(traverser.traverse(Game(num_of_players), x % num_of_players))
+
+            seconds = (perf_counter() - start) / num_of_traversals
+            values = array(values)
+
+            results[type(traverser).__name__] = {'mean': float(values.mean()), 'variance': float(values.var())
+                                                 , 'seconds': seconds, 'variance_per_second': float(values.var())
+                                                 * seconds}
+
+            if traverser.baseline_policy is not None:
+                hits, misses = traverser.baseline_policy.take_counts()
+                results[type(traverser).__name__]['baseline_hit_rate'] = hits / max(hits + misses, 1)
+
+            traverser.take_results()
+
+        return results
+
+    @staticmethod
+    def record_game(num_of_players: int, random_seed: int, record_states: bool = False) -> tuple:
+        """
+        Play a game of random moves, recording the moves made
+        :param num_of_players: number of players in the game
+        :param random_seed: the seed used for the game. Moves are picked with their own generator, so replaying the
+                            moves with the same seed will give the same game
+        :param record_states: if True, also record the packed game state after each move
+        :return: a tuple of the list of moves and the list of packed states
+        """
+
+        seed(random_seed)
+        rng = Random(random_seed)
+
+        game = Game(num_of_players)
+        moves = []
+        states = [CompactGame.from_game(game).buffer] if record_states else []
+
+        while game.state != GameFinished and game.get_game_length() < 100:
+            move = rng.choice(Tools.get_choices(game))
+            Tools.play_choice(game, move)
+            moves.append(move)
+
+            if record_states:
+                states.append(CompactGame.from_game(game).buffer)
+
+        return moves, states
+
+    @staticmethod
+    def verify_compact_game(num_of_games: int, num_of_players: int = 4, first_seed: int = 0) -> int:
+        """
+        Differential test of CompactGame against Game. Each seeded game is played with Game, and then replayed on a
+        CompactGame, checking that both are in exactly the same state after every move
+        :param num_of_games: the number of games to check
+        :param num_of_players: number of players in each game
+        :param first_seed: the seed of the first game. Each game after uses the next seed
+        :return: the number of moves checked
+        """
+
+        total_moves = 0
+
+        for s in range(first_seed, first_seed + num_of_games):
+            moves, states = Benchmark.record_game(num_of_players, s, True)
+
+            seed(s)
+            game = CompactGame(num_of_players)
+
+            if game.buffer != states[0]:
+                raise AssertionError("Game {s} differs at the start".format(s=s))
+
+            for n, move in enumerate(moves):
+                Tools.play_choice(game, move)
+
+                if game.buffer != states[n + 1]:
+                    raise AssertionError("Game {s} differs after move {n}".format(s=s, n=n))
+
+            total_moves += len(moves)
+
+        return total_moves
+
+    @staticmethod
+    def compare_engines(num_of_games: int, num_of_players: int = 4) -> dict:
+        """
+        Compare the cost per move and per clone of Game and CompactGame, replaying the same random games on both
+        :param num_of_games: the number of games to replay
+        :param num_of_players: number of players in each game
+        :return: a dict of the microseconds per move and per clone for each engine
+        """
+
+        games = [Benchmark.record_game(num_of_players, s)[0] for s in range(num_of_games)]
+        total_moves = sum(len(x) for x in games)
+        results = {}
+
+        for name, engine in [('game', Game), ('compact', CompactGame)]:
+            move_time = 0
+            clone_time = 0
+
+            for s, moves in enumerate(games):
+                seed(s)
+                game = engine(num_of_players)
+
+                for move in moves:
+                    start = perf_counter()
+                    Tools.play_choice(game, move)
+                    move_time += perf_counter() - start
+
+                    start = perf_counter()
+                    if engine == CompactGame:
+                        game.clone()
+                    else:
+                        deepcopy(game)
+                    clone_time += perf_counter() - start
+
+            results[name] = {'move': move_time / total_moves * 1e6, 'clone': clone_time / total_moves * 1e6}
+
+        return results
+
+    @staticmethod
+    def record_infosets(num_of_games: int, num_of_players: int = 4) -> []:
+        """
+        Record the infoset at every decision of some random games
+        :param num_of_games: the number of games to play
+        :param num_of_players: number of players in each game
+        :return: a list of Infoset objects
+        """
+
+        infosets = []
+
+        for s in range(num_of_games):
+            moves, _ = Benchmark.record_game(num_of_players, s)
+
+            seed(s)
+            game = Game(num_of_players)
+
+            for move in moves:
+                infosets.append(Infoset(game))
+                Tools.play_choice(game, move)
+
+        return infosets
+
+    @staticmethod
+    def measure_inference(network: Network, infosets: [], batch_sizes: [] = None) -> dict:
+        """
+        Measure the throughput of a network queried directly, and through an InferenceServer with as many concurrent
+        clients as the batch size
+        :param network: the network to query
+        :param infosets: the infosets to query with
+        :param batch_sizes: the batch sizes to measure
+        :return: a dict of queries per second, keyed by batch size. Direct queries are keyed by None
+        """
+
+        if batch_sizes is None:
+            batch_sizes = [1, 4, 16, 64]
+
+        results = {}
+
+        start = perf_counter()
+        for x in infosets:
+            network.get_output(x)
+        results[None] = len(infosets) / (perf_counter() - start)
+
+        for batch_size in batch_sizes:
+            server = InferenceServer(max_batch_size=batch_size)
+            batched = server.wrap(network)
+
+            def client(n):
+                for x in infosets[n::batch_size]:
+                    batched.get_output(x)
+
+            threads = [Thread(target=client, args=(n,)) for n in range(batch_size)]
+
+            start = perf_counter()
+            server.start()
+
+            for t in threads:
+                t.start()
+
+            for t in threads:
+                t.join()
+
+            server.stop()
+            results[batch_size] = len(infosets) / (perf_counter() - start)
+
+        return results
+
+    @staticmethod
+    def play_to_length(length: int, num_of_players: int = 4, random_seed: int = 0) -> Game:
+        """
+        Play random moves until the game reaches a given length. Attacks and blocks are avoided where possible
+        so that long games can be reached
+        :param length: the game length to reach
+        :param num_of_players: number of players in the game
+        :param random_seed: the seed for the first game tried
+        :return: the game, or None if no game reached the length
+        """
+
+        for s in range(random_seed, random_seed + 100):
+            seed(s)
+            game = Game(num_of_players)
+
+            while game.state != GameFinished and game.get_game_length() < length:
+                choices = Tools.get_choices(game)
+                if game.state == SelectAction:
+                    choices = [x for x in choices if not x[0].attack_action] or choices
+                elif game.state in [DecideToBlock, DecideToCounteract, DecideToBlockCounteract]:
+                    choices = [False]
+
+                Tools.play_choice(game, choice(choices))
+
+            if game.state != GameFinished:
+                return game
+
+        return None
+
+    @staticmethod
+    def compare_infoset_encoding(lengths: [] = None, repeats: int = 1000) -> dict:
+        """
+        Compare the cost of encoding the history by walking the whole history against the incremental
+        HistoryEncoder, when one new History entry has been committed since the last infoset
+        :param lengths: the game lengths to measure at
+        :param repeats: the number of times to encode at each length
+        :return: a dict of microseconds per encoding for each method, keyed by game length
+        """
+
+        if lengths is None:
+            lengths = [5, 20, 60]
+
+        results = {}
+
+        for length in lengths:
+            game = Benchmark.play_to_length(length)
+
+            start = perf_counter()
+            for _ in range(repeats):
+                Infoset.return_full_history_vectors(game)
+            full = (perf_counter() - start) / repeats * 1e6
+
+            encoder = HistoryEncoder.get(game)
+            incremental = 0
+
+            for _ in range(repeats):
+                encoder.update(game.history[:-1])
+
+                start = perf_counter()
+                HistoryEncoder.get(game).history_vectors(game.current_player)
+                incremental += perf_counter() - start
+
+            start = perf_counter()
+            for _ in range(repeats):
+                Infoset(game).history_vectors
+            infoset = (perf_counter() - start) / repeats * 1e6
+
+            results[length] = {'full': full, 'incremental': incremental / repeats * 1e6, 'infoset': infoset}
+
+        return results
+
+    @staticmethod
+    def compare_history_skipping(network: Network, num_of_games: int, num_of_players: int = 4) -> dict:
+        """
+        Compare the cost of a decision - making the infoset, querying the network and making a training sample
+        from it - with the history worked out and with it skipped, as it is for structures that don't read it
+        :param network: the network to query
+        :param num_of_games: the number of random games to replay
+        :param num_of_players: number of players in each game
+        :return: a dict of microseconds per decision, keyed by whether the history was worked out
+        """
+
+        games = [Benchmark.record_game(num_of_players, s)[0] for s in range(num_of_games)]
+        results = {}
+
+        for history in [True, False]:
+            taken = 0
+            decisions = 0
+
+            for s, moves in enumerate(games):
+                seed(s)
+                game = Game(num_of_players)
+
+                for move in moves:
+                    start = perf_counter()
+                    infoset = Infoset(game, history)
+                    ActionNet.create_train_data(infoset, network.get_output_vector(infoset), 1)
+                    taken += perf_counter() - start
+
+                    decisions += 1
+                    Tools.play_choice(game, move)
+
+            results[history] = taken / decisions * 1e6
+
+        return results
+
+    @staticmethod
+    def compare_incremental_inference(network: Network, lengths: [] = None, repeats: int = 200) -> dict:
+        """
+        Compare the cost of a network query made by the Keras model, by a NumpyNetwork running the history LSTMs
+        over the full history, and by a NumpyNetwork stepping them incrementally, when one new History entry has
+        been committed since the last query
+        :param network: the network to query
+        :param lengths: the game lengths to measure at
+        :param repeats: the number of queries at each length
+        :return: a dict of microseconds per query for each method, keyed by game length
+        """
+
+        if lengths is None:
+            lengths = [5, 20, 60]
+
+        runtime = NumpyNetwork.from_model(network.model)
+        results = {}
+
+        for length in lengths:
+            game = Benchmark.play_to_length(length)
+            infoset = Infoset(game)
+
+            start = perf_counter()
+            for _ in range(repeats):
+                network.model([infoset.fixed_vector] + infoset.history_vectors).numpy()
+            keras = (perf_counter() - start) / repeats * 1e6
+
+            # Without an encoder to cache states on, the LSTMs are run over the whole history
+            infoset.history_encoder = None
+
+            start = perf_counter()
+            for _ in range(repeats):
+                runtime.get_output_vector(infoset)
+            full = (perf_counter() - start) / repeats * 1e6
+
+            encoder = HistoryEncoder.get(game)
+            runtime.get_output_vector(Infoset(game))
+            incremental = 0
+
+            for _ in range(repeats):
+                encoder.update(game.history[:-1])
+                infoset = Infoset(game)
+                infoset.history_vectors
+
+                start = perf_counter()
+                runtime.get_output_vector(infoset)
+                incremental += perf_counter() - start
+
+            results[length] = {'keras': keras, 'full': full, 'incremental': incremental / repeats * 1e6}
+
+        return results
+
+    @staticmethod
+    def measure_compiled_inference(network: Network, num_of_players: int = 4, random_seed: int = 0
+                                   , bins: [] = None) -> dict:
+        """
+        Measure single network queries over every decision of a random self-play game, calling the Keras model
+        eagerly, through a function traced for each new combination of input shapes, and through a CompiledModel
+        :param network: the network to query
+        :param num_of_players: number of players in the game
+        :param random_seed: the seed for the game
+        :param bins: the edges of the latency histogram, in microseconds
+        :return: a dict keyed by method, of the number of traces and the histogram of per-query latencies
+        """
+
+        if bins is None:
+            bins = [0, 250, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000, float('inf')]
+
+        seed(random_seed)
+        game = Game(num_of_players)
+        infosets = []
+
+        while game.state != GameFinished:
+            infosets.append(Infoset(game))
+            Tools.play_choice(game, choice(Tools.get_choices(game)))
+
+        traced = function(network.model)
+        compiled = CompiledModel(network.model)
+
+        methods = {'eager': lambda x: network.model([x.fixed_vector] + x.history_vectors).numpy()
+                   , 'traced': lambda x: traced([x.fixed_vector] + x.history_vectors).numpy()
+                   , 'compiled': compiled.get_output_vector}
+
+        results = {}
+
+        for name, method in methods.items():
+            latencies = []
+
+            for infoset in infosets:
+                start = perf_counter()
+                method(infoset)
+                latencies.append((perf_counter() - start) * 1e6)
+
+            latencies = array(latencies)
+
+            results[name] = {'queries': len(latencies)
+                             , 'traces': {'eager': 0, 'traced': traced.experimental_get_tracing_count()
+                                          , 'compiled': compiled.traces}[name]
+                             , 'median': float(sorted(latencies)[len(latencies) // 2])
+                             , 'histogram': dict(zip(bins[1:], histogram(latencies, bins)[0].tolist()))}
+
+        return results
+
+    @staticmethod
+    def measure_agent(file_path: str, num_of_games: int = 10) -> dict:
+        """
+        Measure a CounterCoup agent in a fresh process, playing SelfPlay games against copies of itself. A file
+        exported with NetworkGroup.export is run without TensorFlow, and a saved NetworkGroup with Keras
+        :param file_path: the path of the saved or exported group
+        :param num_of_games: the number of games to play
+        :return: a dict of the cold start time (imports and loading) in seconds, the peak RSS in MB (Linux), whether
+                 TensorFlow was imported, and the median and mean microseconds per decision
+        """
+
+        code = """
+import sys, json
+from time import perf_counter
+start = perf_counter()
+from countercoup.player.agents.countercoup import CounterCoup
+from countercoup.player.self_play import SelfPlay
+agent = CounterCoup(sys.argv[1])
+cold_start = perf_counter() - start
+latencies = []
+def timed(*args):
+    start = perf_counter()
+    result = CounterCoup.get_strategy(*args)
+    latencies.append((perf_counter() - start) * 1e6)
+    return result
+agent.get_strategy = timed
+play = SelfPlay([agent for _ in range(4)])
+for _ in range(int(sys.argv[2])):
+    play.run()
+latencies.sort()
+print(json.dumps({'cold_start': cold_start
+                  , 'rss': int(open('/proc/self/status').read().split('VmHWM:')[1].split()[0]) / 1024
+                  , 'tensorflow': 'tensorflow' in sys.modules
+                  , 'median': latencies[len(latencies) // 2]
+                  , 'mean': sum(latencies) / len(latencies)}))
+"""
+
+        result = run([executable, '-c', code, file_path, str(num_of_games)], capture_output=True, text=True
+                     , check=True)
+
+        return loads(result.stdout.strip().splitlines()[-1])
+
+    @staticmethod
+    def compare_precisions(net_group, infosets: [], directory: str) -> dict:
+        """
+        Compare exports of a NetworkGroup at each precision against the float32 export. The strategy of each net
+        is its output clipped at zero and normalised over all outputs, as CounterCoup plays it, and the accuracy
+        is the KL divergence of each quantised strategy from the float32 one
+        :param net_group: the NetworkGroup
+        :param infosets: the corpus of Infoset objects to compare over
+        :param directory: the directory the exports are written to
+        :return: a dict keyed by precision, of the file size in bytes, the mean and max KL divergence, and the mean
+                 microseconds per query
+        """
+
+        def strategy(output):
+            return Tools.normalise(maximum(output, 0))
+
+        groups = {}
+        results = {}
+
+        for precision in NumpyNetworkGroup.precisions:
+            file_path = join(directory, 'export_{precision}.npz'.format(precision=precision))
+            net_group.export(file_path, precision)
+            groups[precision] = NumpyNetworkGroup(file_path)
+
+            start = perf_counter()
+            outputs = [[getattr(groups[precision], name).get_output_vector(x) for x in infosets]
+                       for name in NumpyNetworkGroup.names]
+            latency = (perf_counter() - start) / (len(infosets) * len(NumpyNetworkGroup.names)) * 1e6
+
+            if precision == 'float32':
+                reference = [[strategy(x) for x in net] for net in outputs]
+
+            divergences = [float((p * log(maximum(p, 1e-12) / maximum(strategy(q), 1e-12))).sum())
+                           for ref, net in zip(reference, outputs) for p, q in zip(ref, net)]
+
+            results[precision] = {'size': getsize(file_path)
+                                  , 'mean_kl': sum(divergences) / len(divergences)
+                                  , 'max_kl': max(divergences)
+                                  , 'latency': latency}
+
+        return results
+
+    @staticmethod
+    def measure_checkpoints(net_group: NetworkGroup, prefix: str, iterations: [] = None) -> dict:
+        """
+        Measure saving and loading a sweep of {prefix}_i{it}.zip checkpoints, as written by Trainer.train
+        :param net_group: the NetworkGroup to save
+        :param prefix: the prefix of the checkpoint files
+        :param iterations: the iterations to write checkpoints for
+        :return: a dict of mean seconds to save, to load every network, and to load only the action network, and
+                 the size of each checkpoint in bytes
+        """
+
+        if iterations is None:
+            iterations = list(range(1, 6))
+
+        files = ["{prefix}_i{it}.zip".format(prefix=prefix, it=it) for it in iterations]
+
+        start = perf_counter()
+        for file_path in files:
+            net_group.save(file_path)
+        save = (perf_counter() - start) / len(files)
+
+        start = perf_counter()
+        for file_path in files:
+            NetworkGroup(file_path, lazy=False)
+        load = (perf_counter() - start) / len(files)
+
+        start = perf_counter()
+        for file_path in files:
+            NetworkGroup(file_path).action
+        action = (perf_counter() - start) / len(files)
+
+        return {'save': save, 'load': load, 'load_action': action, 'size': getsize(files[0])}
+
+    @staticmethod
+    def compare_memories(infosets: [], size: int, num_of_samples: int, chunk_size: int = 1000) -> dict:
+        """
+        Compare the list based Memory with ArrayMemory, adding samples in chunks as the trainer does
+        :param infosets: the infosets to make samples from, cycled through as needed
+        :param size: the size of each reservoir
+        :param num_of_samples: the number of samples to add to each reservoir
+        :param chunk_size: the number of samples in each call to add_bulk
+        :return: a dict of bytes per sample held and samples inserted per second, keyed by memory type
+        """
+
+        rng = Random(0)
+        samples = [ActionNet.create_train_data(infosets[x % len(infosets)]
+                                               , [rng.randint(-50, 50) for _ in ActionNet.outputs], x // 1000)
+                   for x in range(num_of_samples)]
+
+        # Samples should own their arrays, as they do in the trainer
+        samples = [([y.copy() for y in x[0]], x[1], x[2]) for x in samples]
+
+        results = {}
+
+        for memory in [Memory(size), ArrayMemory(size)]:
+            start = perf_counter()
+            for x in range(0, num_of_samples, chunk_size):
+                memory.add_bulk(samples[x:x + chunk_size])
+            taken = perf_counter() - start
+
+            if isinstance(memory, ArrayMemory):
+                nbytes = memory.nbytes()
+            else:
+                nbytes = getsizeof(memory.data) + sum(getsizeof(x) + getsizeof(x[0]) + sum(getsizeof(y) for y in x[0])
+                                                      + getsizeof(x[1]) + getsizeof(x[2]) for x in memory.data)
+
+            results[type(memory).__name__] = {'bytes_per_sample': nbytes / len(memory)
+                                              , 'samples_per_second': num_of_samples / taken}
+
+        return results
+
+    @staticmethod
+    def measure_training(network_type, memory, batch_sizes: [] = None, epochs: int = 4) -> dict:
+        """
+        Measure the training throughput of a network, after a warm up epoch to trace the model
+        :param network_type: the type of network to train
+        :param memory: the memory to train on
+        :param batch_sizes: the minibatch sizes to measure
+        :param epochs: the number of epochs to time, each a full pass over the memory
+        :return: a dict of samples per second, keyed by batch size
+        """
+
+        if batch_sizes is None:
+            batch_sizes = [32, 256]
+
+        results = {}
+
+        for batch_size in batch_sizes:
+            network = network_type()
+            network.train(memory, epochs=1, epoch_size=len(memory) // 4, batch_size=batch_size)
+
+            start = perf_counter()
+            network.train(memory, epochs=epochs, epoch_size=len(memory), batch_size=batch_size)
+            results[batch_size] = epochs * len(memory) / (perf_counter() - start)
+
+        return results
+
+    @staticmethod
+    def compare_multi_head(memories: [], structure: Structure, multi_head: Structure, epochs: int = 10) -> dict:
+        """
+        Compare training a player's four advantage networks separately with training one multi-head network
+        :param memories: the action, block, counteract and lose memories
+        :param structure: the structure of the separate networks
+        :param multi_head: the multi-head structure
+        :param epochs: the number of epochs to train for, as in the trainer
+        :return: a dict of the seconds taken to train and the number of weights, for each
+        """
+
+        results = {}
+
+        networks = [x(structure=structure) for x in MultiHeadNetwork.heads.values()]
+        start = perf_counter()
+        for network, memory in zip(networks, memories):
+            network.train(memory, epochs=epochs)
+        results['separate'] = {'seconds': perf_counter() - start
+                               , 'weights': sum(len(x.get_flat_weights()) for x in networks)}
+
+        network = MultiHeadNetwork(multi_head)
+        start = perf_counter()
+        network.train(memories, epochs=epochs)
+        results['multi_head'] = {'seconds': perf_counter() - start, 'weights': len(network.get_flat_weights())}
+
+        return results
+
+    @staticmethod
+    def compare_structures(structures: [], infosets: [], memory, epochs: int = 2) -> dict:
+        """
+        Compare the size, query latency and training speed of some structures, as action networks
+        :param structures: the structures to compare
+        :param infosets: the infosets to query the networks with
+        :param memory: a memory of action samples to train on
+        :param epochs: the number of epochs to time, after a warm up epoch to trace the model
+        :return: a dict of the number of weights, microseconds per Keras query, microseconds per NumpyNetwork query
+                 over the full history, and seconds per epoch, keyed by structure name
+        """
+
+        results = {}
+
+        for structure in structures:
+            network = ActionNet(structure=structure)
+            runtime = NumpyNetwork.from_model(network.model)
+
+            network.model([infosets[0].fixed_vector] + infosets[0].history_vectors)
+            start = perf_counter()
+            for x in infosets:
+                network.model([x.fixed_vector] + x.history_vectors).numpy()
+            keras = (perf_counter() - start) / len(infosets) * 1e6
+
+            # Without an encoder to cache states on, the LSTMs are run over the whole history
+            detached = [copy(x) for x in infosets]
+            for x in detached:
+                x.history_encoder = None
+
+            start = perf_counter()
+            for x in detached:
+                runtime.get_output_vector(x)
+            numpy = (perf_counter() - start) / len(infosets) * 1e6
+
+            network.train(memory, epochs=1, epoch_size=len(memory) // 4)
+            start = perf_counter()
+            network.train(memory, epochs=epochs, epoch_size=len(memory))
+            epoch = (perf_counter() - start) / epochs
+
+            results[structure.__name__] = {'weights': len(network.get_flat_weights()), 'keras': keras
+                                           , 'numpy': numpy, 'epoch': epoch}
+
+        return results
@@ -0,0 +1,29 @@
+class Decision:
+    """
+    How a traversal handles one of the decision states of the game - the networks and memories used for it, the
+    outputs that are legal, and how a chosen output is played
+    """
+
+    def __init__(self, nets: str, memory: str, strategy_memory: str, network_type, own_mask, opponent_mask, play
+                 , width: int):
+        """
+        Set up the decision
+        :param nets: the name of the traverser's list of networks for the decision
+        :param memory: the name of the traverser's list of advantage memories for the decision
+        :param strategy_memory: the name of the traverser's strategy memory for the decision
+        :param network_type: the type of network, used to format the samples
+        :param own_mask: function of the game returning the legal outputs at the traversing player's decisions
+        :param opponent_mask: function of the game returning the outputs an opponent's strategy is over, or None
+                              for all of them
+        :param play: function of the game and an output index, that plays the output
+        :param width: the most outputs explored at the traversing player's decisions
+        """
+
+        self.nets = nets
+        self.memory = memory
+        self.strategy_memory = strategy_memory
+        self.network_type = network_type
+        self.own_mask = own_mask
+        self.opponent_mask = opponent_mask
+        self.play = play
+        self.width = width
@@ -0,0 +1,276 @@
+from countercoup.model.game import Game
+from countercoup.model.items.states import SelectAction, DecideToBlock, DecideToCounteract, SelectCardsToDiscard\
+    , GameFinished, DecideToBlockCounteract, SelectCardToLose
+from countercoup.shared.networks.action_net import ActionNet
+from countercoup.shared.networks.block_counteract_net import BlockCounteractNet
+from countercoup.shared.networks.lose_net import LoseNet
+from countercoup.shared.infoset import Infoset
+from countercoup.shared.network import Network
+from countercoup.shared.outputs import Outputs
+from countercoup.shared.tools import Tools
+from countercoup.trainer.traverser import Traverser
+from countercoup.player.agents.timid import Timid
+from numpy import ones, zeros, maximum, count_nonzero
+from random import sample
+
+
+class TimidBiased(Traverser):
+    """
+    Traverser that defaults to a timid profile for zero regrets. The recursive version, kept unchanged from before
+    TraversalEngine as a reference to check the engine against
+    """
+
+    def traverse(self, game: Game, curr_play: int):
+        """
+        Traverse the Coup game tree recursively
+        :param game: the Game object from the model being played
+        :param curr_play: the current player model
+        :return: the instantaneous regret value for all histories at this prefix
+        """
+
+        self.stats.total_nodes_traversed += 1
+
+        # If the game is finished, then return 1 if the player won the game, else -1
+        if game.state == GameFinished:
+
+            self.stats.total_terminal_nodes += 1
+            self.stats.total_hist_length += game.get_game_length()
+
+            if game.winning_player == curr_play:
+                self.stats.game_wins += 1
+                return 1
+            else:
+                self.stats.game_loses += 1
+                return -1
+
+        else:
+
+            # If, for some reason the game has gone on for 50 turns, everyone declares the game
+            # a draw and goes to the pub
+            if game.get_game_length() >= 50:
+                return 0
+
+            # Game continues...
+            infoset = Infoset(game, self.uses_history)
+            values = {}
+            agent = Timid()
+
+            if game.current_player == curr_play:
+                if game.state == SelectAction:
+                    self.stats.total_turns += 1
+
+                    mask = Tools.get_action_mask(game)
+                    strategy = self.get_regret_strategy(self.action_nets[curr_play], infoset, mask)
+
+                    snapshot = game.snapshot()
+
+                    legal = mask.nonzero()[0].tolist()
+                    for x in sample(legal, min(3 if game.get_game_length() < 16 else 1, len(legal))):
+                        action = Outputs.action[x]
+                        if action[0].attack_action:
+                            game.select_action(action[0], game.get_opponents()[action[1]])
+                        else:
+                            game.select_action(action[0])
+
+                        values[x] = self.traverse(game, curr_play)
+                        game.restore(snapshot)
+
+                    return self.calculate_regrets(values
+                                                  , strategy
+                                                  , mask
+                                                  , self.action_mem[curr_play]
+                                                  , infoset
+                                                  , ActionNet.create_train_data)
+
+                elif game.state == DecideToBlock:
+                    mask = Tools.get_choice_mask(game)
+                    strategy = self.get_regret_strategy(self.block_nets[curr_play], infoset, mask)
+
+                    choice = sample(mask.nonzero()[0].tolist(), 1)[0]
+                    game.decide_to_block(Outputs.block_counteract[choice])
+                    values[choice] = self.traverse(game, curr_play)
+
+                    return self.calculate_regrets(values
+                                                  , strategy
+                                                  , mask
+                                                  , self.block_mem[curr_play]
+                                                  , infoset
+                                                  , BlockCounteractNet.create_train_data)
+
+                elif game.state == DecideToCounteract:
+                    mask = Tools.get_choice_mask(game)
+                    strategy = self.get_regret_strategy(self.counteract_nets[curr_play], infoset, mask)
+
+                    choice = sample(mask.nonzero()[0].tolist(), 1)[0]
+                    game.decide_to_counteract(Outputs.block_counteract[choice])
+                    values[choice] = self.traverse(game, curr_play)
+
+                    return self.calculate_regrets(values
+                                                  , strategy
+                                                  , mask
+                                                  , self.counteract_mem[curr_play]
+                                                  , infoset
+                                                  , BlockCounteractNet.create_train_data)
+
+                elif game.state == DecideToBlockCounteract:
+                    mask = Tools.get_choice_mask(game)
+                    strategy = self.get_regret_strategy(self.block_nets[curr_play], infoset, mask)
+
+                    choice = sample(mask.nonzero()[0].tolist(), 1)[0]
+                    game.decide_to_block_counteract(Outputs.block_counteract[choice])
+                    values[choice] = self.traverse(game, curr_play)
+
+                    return self.calculate_regrets(values
+                                                  , strategy
+                                                  , mask
+                                                  , self.block_mem[curr_play]
+                                                  , infoset
+                                                  , BlockCounteractNet.create_train_data)
+
+                elif game.state == SelectCardsToDiscard:
+                    mask = Tools.get_discard_mask(game.get_curr_player().cards)
+                    strategy = self.get_regret_strategy(self.lose_nets[curr_play], infoset, mask)
+
+                    # For Exchange, select 2 possible discard selections
+                    snapshot = game.snapshot()
+
+                    legal = mask.nonzero()[0].tolist()
+                    for x in sample(legal, min(2 if game.get_game_length() < 16 else 1, len(legal))):
+                        game.select_cards_to_discard(Outputs.lose[x].card1, Outputs.lose[x].card2)
+                        values[x] = self.traverse(game, curr_play)
+                        game.restore(snapshot)
+
+                    return self.calculate_regrets(values
+                                                  , strategy
+                                                  , mask
+                                                  , self.lose_mem[curr_play]
+                                                  , infoset
+                                                  , LoseNet.create_train_data)
+
+                elif game.state == SelectCardToLose:
+                    mask = Tools.get_lose_mask(game.get_curr_player().cards)
+                    strategy = self.get_regret_strategy(self.lose_nets[curr_play], infoset, mask)
+
+                    choice = sample(mask.nonzero()[0].tolist(), 1)[0]
+                    game.select_card_to_lose(Outputs.lose[choice].card1)
+                    values[choice] = self.traverse(game, curr_play)
+
+                    return self.calculate_regrets(values
+                                                  , strategy
+                                                  , mask
+                                                  , self.lose_mem[curr_play]
+                                                  , infoset
+                                                  , LoseNet.create_train_data)
+
+            else:
+                if game.state == SelectAction:
+                    self.stats.total_turns += 1
+
+                    strategy = self.get_regret_strategy(self.action_nets[game.current_player]
+                                                        , infoset
+                                                        , Tools.get_action_mask(game)
+                                                        , agent.get_action_strategy(game))
+                    self.action_strategy_mem.append(ActionNet.create_train_data(infoset, strategy, self.iteration))
+
+                    choice = Outputs.action[Tools.select_from_strategy(strategy)]
+
+                    if choice[0].attack_action:
+                        game.select_action(choice[0], game.get_opponents()[choice[1]])
+                    else:
+                        game.select_action(choice[0])
+
+                    return self.traverse(game, curr_play)
+
+                elif game.state == DecideToBlock:
+                    strategy = self.get_regret_strategy(self.block_nets[game.current_player]
+                                                        , infoset
+                                                        , zero_data=agent.get_block_strategy(game))
+                    self.block_strategy_mem.append(
+                        BlockCounteractNet.create_train_data(infoset, strategy, self.iteration))
+
+                    choice = Outputs.block_counteract[Tools.select_from_strategy(strategy)]
+
+                    game.decide_to_block(choice)
+
+                    return self.traverse(game, curr_play)
+
+                elif game.state == DecideToCounteract:
+                    strategy = self.get_regret_strategy(self.counteract_nets[game.current_player]
+                                                        , infoset
+                                                        , zero_data=agent.get_counteract_strategy(game))
+                    self.counteract_strategy_mem.append(
+                        BlockCounteractNet.create_train_data(infoset, strategy, self.iteration))
+
+                    choice = Outputs.block_counteract[Tools.select_from_strategy(strategy)]
+
+                    game.decide_to_counteract(choice)
+
+                    return self.traverse(game, curr_play)
+
+                elif game.state == DecideToBlockCounteract:
+                    strategy = self.get_regret_strategy(self.block_nets[game.current_player]
+                                                        , infoset
+                                                        , zero_data=agent.get_block_counteract_strategy(game))
+                    self.block_strategy_mem.append(
+                        BlockCounteractNet.create_train_data(infoset, strategy, self.iteration))
+
+                    choice = Outputs.block_counteract[Tools.select_from_strategy(strategy)]
+
+                    game.decide_to_block_counteract(choice)
+
+                    return self.traverse(game, curr_play)
+
+                elif game.state == SelectCardsToDiscard:
+                    strategy = self.get_regret_strategy(self.lose_nets[game.current_player]
+                                                        , infoset
+                                                        , Tools.get_discard_mask(game.get_curr_player().cards)
+                                                        , agent.get_discard_strategy(game))
+                    self.lose_strategy_mem.append(LoseNet.create_train_data(infoset, strategy, self.iteration))
+
+                    choice = Outputs.lose[Tools.select_from_strategy(strategy)]
+
+                    game.select_cards_to_discard(choice.card1, choice.card2)
+
+                    return self.traverse(game, curr_play)
+
+                elif game.state == SelectCardToLose:
+                    strategy = self.get_regret_strategy(self.lose_nets[game.current_player]
+                                                        , infoset
+                                                        , Tools.get_lose_mask(game.get_curr_player().cards)
+                                                        , agent.get_lose_card_strategy(game))
+                    self.lose_strategy_mem.append(LoseNet.create_train_data(infoset, strategy, self.iteration))
+
+                    choice = Outputs.lose[Tools.select_from_strategy(strategy)]
+
+                    game.select_card_to_lose(choice.card1)
+
+                    return self.traverse(game, curr_play)
+
+    def get_regret_strategy(self, network: Network, infoset: Infoset, mask=None, zero_data=None):
+        """
+        Get the strategy calculated from the advantage networks
+        :param network: the network to calculate the advantages
+        :param infoset: the infoset for the game state
+        :param mask: the outputs that we're allowed to output, as a boolean array. Defaults to all of them
+        :param zero_data: the strategy to use if all the advantages are zero
+        :return: an array of the strategy over the outputs of the network, zero for outputs not allowed
+        """
+
+        if mask is None:
+            mask = ones(len(network.outputs), dtype=bool)
+
+        # If we're on the first iteration, don't bother using the NNs. Speeds up this iteration, and
+        # resolves issues where the networks don't zero correctly.
+        if self.iteration == 1:
+            positive = zeros(len(mask))
+        else:
+            positive = maximum(network.get_output_vector(infoset), 0) * mask
+
+        total = positive.sum()
+
+        if total == 0 and zero_data is not None:
+            return zero_data
+        elif total == 0:
+            return mask / count_nonzero(mask)
+        else:
+            return positive / total
@@ -0,0 +1,107 @@
+from countercoup.shared.infoset import Infoset
+from collections import OrderedDict
+from threading import Lock
+from numpy import zeros
+
+
+class Baseline:
+    """
+    Tabular baselines for variance-reduced sampling (as in VR-MCCFR). Keeps a running average of the value of each
+    output explored at the traversing player's decisions, keyed by network and the fixed part of the infoset - the
+    player's hand, the coins and discards, and the move being decided on. The history is left out, as keyed on it
+    the same decision is almost never reached twice, so the baselines would hardly ever be used. The regrets are then
+    worked out from the baseline for every output, corrected by the sampled values, which has the same expectation
+    but far less variance than scoring unsampled outputs as zero, however rough the baseline. The table is shared by
+    the traversers in a process, and kept across iterations by persistent workers, with older values fading out as
+    the strategies change
+    """
+
+    def __init__(self, rate: float = 0.1, capacity: int = 100000):
+        """
+        Set up the baselines
+        :param rate: the weight given to each new value once an output has been explored 1 / rate times - before
+                     then, the baseline is the plain average
+        :param capacity: the maximum number of infosets held, dropping the least recently used
+        """
+
+        self.rate = rate
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(nets: str, infoset: Infoset) -> tuple:
+        """
+        Get the key of a decision
+        :param nets: the name of the traverser's list of networks for the decision
+        :param infoset: the infoset for the game state
+        :return: the key
+        """
+        return nets, infoset.fixed_vector.tobytes()
+
+    def get(self, key: tuple, num_of_outputs: int):
+        """
+        Get the baselines for a decision
+        :param key: the key of the decision
+        :param num_of_outputs: the number of outputs of the decision's network
+        :return: an array of the baseline for each output, zero for outputs never explored
+        """
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return zeros(num_of_outputs)
+
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0].copy()
+
+    def update(self, key: tuple, values: {}, num_of_outputs: int):
+        """
+        Add the values of the outputs explored at a decision to their baselines
+        :param key: the key of the decision
+        :param values: the values, keyed by output index
+        :param num_of_outputs: the number of outputs of the decision's network
+        """
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                entry = (zeros(num_of_outputs), zeros(num_of_outputs))
+                self.entries[key] = entry
+
+                if len(self.entries) > self.capacity:
+                    self.entries.popitem(last=False)
+            else:
+                self.entries.move_to_end(key)
+
+            means, counts = entry
+            for x in values:
+                counts[x] += 1
+                means[x] += (values[x] - means[x]) * max(1 / counts[x], self.rate)
+
+    def clear(self):
+        """
+        Forget every baseline
+        """
+
+        with self.lock:
+            self.entries.clear()
+
+    def take_counts(self) -> tuple:
+        """
+        Take the counts of decisions that did and didn't have a baseline so far, resetting them
+        :return: a tuple of the hits and misses
+        """
+
+        with self.lock:
+            counts = (self.hits, self.misses)
+            self.hits = self.misses = 0
+
+        return counts
@@ -0,0 +1,39 @@
+from countercoup.model.game import Game
+from countercoup.model.items.states import SelectAction, DecideToBlock, DecideToCounteract, SelectCardsToDiscard\
+    , DecideToBlockCounteract, SelectCardToLose
+from countercoup.player.agents.timid import Timid
+from numpy import count_nonzero
+
+
+class Fallback:
+    """
+    Policy for the strategy another player plays when their advantages are all zero. Plays uniformly over the legal
+    outputs
+    """
+
+    def get_strategy(self, game: Game, mask):
+        """
+        Get the strategy to play
+        :param game: the game
+        :param mask: the legal outputs, as a boolean array
+        :return: an array of the strategy over the outputs of the network
+        """
+        return mask / count_nonzero(mask)
+
+
+class TimidFallback(Fallback):
+    """
+    Play the Timid agent's strategy when the advantages are all zero
+    """
+
+    agent = Timid()
+
+    strategies = {SelectAction: Timid.get_action_strategy
+                  , DecideToBlock: Timid.get_block_strategy
+                  , DecideToCounteract: Timid.get_counteract_strategy
+                  , DecideToBlockCounteract: Timid.get_block_counteract_strategy
+                  , SelectCardsToDiscard: Timid.get_discard_strategy
+                  , SelectCardToLose: Timid.get_lose_card_strategy}
+
+    def get_strategy(self, game: Game, mask):
+        return self.strategies[game.state](self.agent, game)
@@ -0,0 +1,76 @@
+from random import random
+
+
+class Pruning:
+    """
+    Regret-based pruning. Sampled outputs whose advantage is below a negative threshold are skipped with a
+    probability, and the values of those that are still explored are scaled up to make up for it. Below a
+    probability of 1 the regrets stay unbiased. At 1, pruned outputs are scored as zero, which biases the regrets
+    whenever they have weight in the strategy - e.g. when every advantage at a decision is at most zero, and the
+    strategy is uniform over all the outputs. Every few iterations nothing is pruned, so the networks can recheck
+    outputs that have been pruned, and on the other iterations a fraction of traversals are left unpruned as a
+    control to measure the speedup against
+    """
+
+    def __init__(self, threshold: float = -0.5, probability: float = 0.5, recheck: int = 10, control: float = 0.1):
+        """
+        Set up the policy
+        :param threshold: the advantage below which outputs can be pruned, at most zero
+        :param probability: the probability of skipping an output below the threshold. The values of the outputs
+                            still explored are scaled by 1 / (1 - probability). At 1 they are always skipped, and
+                            the regrets for them are only updated on the rechecking iterations
+        :param recheck: nothing is pruned on iterations that are multiples of this, or None to always prune
+        :param control: the fraction of traversals left unpruned on the iterations that are pruned
+        """
+
+        if threshold > 0:
+            raise ValueError('the threshold must be at most zero')
+
+        if not 0 <= probability <= 1:
+            raise ValueError('the probability must be between 0 and 1')
+
+        if not 0 <= control < 1:
+            raise ValueError('the control fraction must be at least 0 and below 1')
+
+        self.threshold = threshold
+        self.probability = probability
+        self.recheck = recheck
+        self.control = control
+        self.weight = 1 / (1 - probability) if probability < 1 else 1.
+
+    def is_active(self, iteration: int) -> bool:
+        """
+        Check whether outputs are pruned on an iteration. The networks aren't used on the first iteration, so there
+        is nothing to prune by
+        :param iteration: the iteration
+        :return: True if outputs are pruned
+        """
+        return iteration > 1 and (self.recheck is None or iteration % self.recheck != 0)
+
+    def is_control(self) -> bool:
+        """
+        Decide whether a traversal on a pruned iteration is left unpruned, as a control
+        :return: True if the traversal isn't pruned
+        """
+        return random() < self.control
+
+    def prune(self, choices: [], advantages) -> tuple:
+        """
+        Prune the outputs sampled at a decision
+        :param choices: the indexes of the sampled outputs
+        :param advantages: the advantages predicted for the decision
+        :return: a tuple of the outputs to explore, and the weight of each of their values, keyed by output index
+        """
+
+        explored = []
+        weights = {}
+
+        for x in choices:
+            if advantages[x] >= self.threshold:
+                explored.append(x)
+                weights[x] = 1.
+            elif random() >= self.probability:
+                explored.append(x)
+                weights[x] = self.weight
+
+        return explored, weights
@@ -0,0 +1,28 @@
+from countercoup.shared.tools import Tools
+from random import sample
+
+
+class Selection:
+    """
+    Policy for which outputs a traversal explores at the traversing player's decisions. Selects uniformly from the
+    legal outputs
+    """
+
+    def select(self, strategy, mask, num: int) -> []:
+        """
+        Select the outputs to explore, without replacement
+        :param strategy: the regret strategy at the decision
+        :param mask: the legal outputs, as a boolean array
+        :param num: the number of outputs to select, no more than the number of legal outputs
+        :return: a list of the indexes of the selected outputs
+        """
+        return sample(mask.nonzero()[0].tolist(), num)
+
+
+class StrategySelection(Selection):
+    """
+    Select outputs in proportion to the regret strategy
+    """
+
+    def select(self, strategy, mask, num: int) -> []:
+        return Tools.select_multiple_from_strategy(strategy, num, mask)
@@ -0,0 +1,83 @@
+from countercoup.model.game import Game
+from math import log2
+
+
+class Width:
+    """
+    Policy for how many outputs a traversal explores at the traversing player's decisions. Explores up to the width
+    of the decision, for full robust sampling
+    """
+
+    def get_width(self, game: Game, width: int) -> int:
+        """
+        Get the most outputs to explore at a decision
+        :param game: the game
+        :param width: the most outputs explored at this type of decision
+        :return: the most outputs to explore
+        """
+        return width
+
+    def update(self, nodes: int, seconds: float):
+        """
+        Called at the end of every traversal, for policies that adapt to how long traversals take
+        :param nodes: the number of nodes in the traversal
+        :param seconds: the time the traversal took
+        """
+        pass
+
+
+class SingleWidth(Width):
+    """
+    Explore one output at every decision, for outcome sampling
+    """
+
+    def get_width(self, game: Game, width: int) -> int:
+        return 1
+
+
+class LimitedWidth(Width):
+    """
+    Explore up to the width of the decision early in the game, then one output once the game gets long
+    """
+
+    def __init__(self, length: int = 16):
+        """
+        Set up the policy
+        :param length: the game length from which only one output is explored
+        """
+        self.length = length
+
+    def get_width(self, game: Game, width: int) -> int:
+        return width if game.get_game_length() < self.length else 1
+
+
+class BudgetWidth(LimitedWidth):
+    """
+    LimitedWidth, with the game length at which branching stops adjusted after every traversal to hit a budget of
+    nodes or seconds per traversal. The cost of a traversal grows roughly exponentially with that length, so it's
+    moved by the log of how far the last traversal was from the budget
+    """
+
+    def __init__(self, nodes: int = None, seconds: float = None, length: float = 16, gain: float = 2
+                 , max_length: float = 64):
+        """
+        Set up the policy. Give one of nodes or seconds
+        :param nodes: the target number of nodes per traversal
+        :param seconds: the target number of seconds per traversal
+        :param length: the game length to start branching up to
+        :param gain: how many moves the length changes by when a traversal is double or half the budget
+        :param max_length: the longest the length can grow to
+        """
+
+        if (nodes is None) == (seconds is None):
+            raise ValueError('give one of nodes or seconds as the budget')
+
+        super().__init__(length)
+        self.nodes = nodes
+        self.seconds = seconds
+        self.gain = gain
+        self.max_length = max_length
+
+    def update(self, nodes: int, seconds: float):
+        used, budget = (nodes, self.nodes) if self.nodes is not None else (seconds, self.seconds)
+        self.length = min(max(self.length + self.gain * log2(budget / max(used, 1e-9)), 0), self.max_length)
@@ -3,15 +3,20 @@ from countercoup.shared.networks.action_net import ActionNet
 from countercoup.shared.networks.block_counteract_net import BlockCounteractNet
 from countercoup.shared.networks.lose_net import LoseNet
 from countercoup.shared.net_group import NetworkGroup
-from countercoup.shared.memory import Memory
+from countercoup.shared.multi_head_network import MultiHeadNetwork
+from countercoup.shared.array_memory import ArrayMemory
+from countercoup.shared.mapped_memory import MappedMemory
 from countercoup.shared.structure import Structure
 from countercoup.trainer.traverser import Traverser
 from countercoup.trainer.trainer_stats import TrainerStats
 from countercoup.trainer.traversers.limited_robust import LimitedRobust
+from countercoup.shared.inference_server import InferenceServer
 from multiprocessing import Queue, Process
-from time import sleep
+from threading import Thread
+from time import perf_counter
 from logging import getLogger
 from csv import writer
+from os.path import join
 
 
 class Trainer:
@@ -26,13 +31,26 @@ class Trainer:
                  , advantage_memory_size
                  , strategy_memory_size
                  , structure: Structure = None
-                 , traverser: Traverser = None):
+                 , traverser: Traverser = None
+                 , chunk_size: int = 1000
+                 , persistent_workers: bool = True
+                 , memory_path: str = None
+                 , cache_size: int = 100000):
         """
         Set up our Trainer
         :param num_of_traversals: number of tree traversals per player
         :param advantage_memory_size: size of memory used to train advantage networks
         :param strategy_memory_size: size of memory used to train strategy networks
-        :param structure: the structure of our neural networks
+        :param structure: the structure of our neural networks. With a multi-head structure, the advantage networks
+                          of each player are a single MultiHeadNetwork
+        :param traverser: the type of traverser used to traverse the game tree
+        :param chunk_size: the number of samples each process gathers before sending them back to be merged
+        :param persistent_workers: if True, keep the traversal processes running between iterations, rather than
+                                   starting new ones for each iteration
+        :param memory_path: if not None, keep the memories in memory-mapped files in this directory rather than in
+                            RAM. Memories already in the directory are reopened, and training resumes from them
+        :param cache_size: the number of outputs cached in front of each advantage network in the traversal
+                           processes. 0 turns the caches off
         """
 
         self.num_of_player = 4
@@ -40,24 +58,30 @@ class Trainer:
         self.advantage_memory_size = advantage_memory_size
         self.strategy_memory_size = strategy_memory_size
         self.iteration = 0
+        self.memory_path = memory_path
 
         self.action_nets = None
-        self.action_mem = [Memory(self.advantage_memory_size) for _ in range(self.num_of_player)]
-        self.action_strategy_mem = Memory(self.strategy_memory_size)
+        self.action_mem = [self.create_memory(self.advantage_memory_size, 'action_{p}'.format(p=p))
+                           for p in range(self.num_of_player)]
+        self.action_strategy_mem = self.create_memory(self.strategy_memory_size, 'action_strategy')
 
         self.block_nets = None
-        self.block_mem = [Memory(self.advantage_memory_size) for _ in range(self.num_of_player)]
-        self.block_strategy_mem = Memory(self.strategy_memory_size)
+        self.block_mem = [self.create_memory(self.advantage_memory_size, 'block_{p}'.format(p=p))
+                          for p in range(self.num_of_player)]
+        self.block_strategy_mem = self.create_memory(self.strategy_memory_size, 'block_strategy')
 
         self.counteract_nets = None
-        self.counteract_mem = [Memory(self.advantage_memory_size) for _ in range(self.num_of_player)]
-        self.counteract_strategy_mem = Memory(self.strategy_memory_size)
+        self.counteract_mem = [self.create_memory(self.advantage_memory_size, 'counteract_{p}'.format(p=p))
+                               for p in range(self.num_of_player)]
+        self.counteract_strategy_mem = self.create_memory(self.strategy_memory_size, 'counteract_strategy')
 
         self.lose_nets = None
-        self.lose_mem = [Memory(self.advantage_memory_size) for _ in range(self.num_of_player)]
-        self.lose_strategy_mem = Memory(self.strategy_memory_size)
+        self.lose_mem = [self.create_memory(self.advantage_memory_size, 'lose_{p}'.format(p=p))
+                         for p in range(self.num_of_player)]
+        self.lose_strategy_mem = self.create_memory(self.strategy_memory_size, 'lose_strategy')
 
         self.strategy_nets = None
+        self.shared_nets = None
         self.net_structure = structure
 
         if traverser is not None:
@@ -65,19 +89,89 @@ class Trainer:
         else:
             self.traverser = LimitedRobust
 
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
         self.stats = dict()
+        self.worker_stats = dict()
+
+        self.persistent_workers = persistent_workers
+        self.workers = None
+        self.worker_config = None
+        self.input_queue = None
+        self.output_queue = None
 
         self.init_advantage_nets()
 
+        # Resuming from reopened memories - carry on from the last iteration in them
+        self.iteration = max(int(m.iterations[:len(m)].max()) if len(m) > 0 else 0 for m in self.all_memories())
+        if self.iteration > 0:
+            self._log.info('Resuming from iteration {num}'.format(num=self.iteration))
+            self.train_advantage_nets()
+
+    def create_memory(self, size: int, name: str):
+        """
+        Create one of the memories, either in RAM or memory-mapped under memory_path
+        :param size: the size of the memory
+        :param name: the name of the memory, used as the directory for memory-mapped files
+        :return: the memory
+        """
+
+        if self.memory_path is None:
+            return ArrayMemory(size)
+
+        return MappedMemory(join(self.memory_path, name), size)
+
+    def all_memories(self) -> []:
+        """
+        Get every memory held by the trainer
+        :return: a list of the advantage memories, followed by the strategy memories
+        """
+        return self.action_mem + self.block_mem + self.counteract_mem + self.lose_mem \
+            + [self.action_strategy_mem, self.block_strategy_mem, self.counteract_strategy_mem, self.lose_strategy_mem]
+
     def init_advantage_nets(self):
         """
         Set up empty advantage networks
         """
         self._log.info('Setting up advantage networks')
-        self.action_nets = [ActionNet(structure=self.net_structure) for _ in range(self.num_of_player)]
-        self.block_nets = [BlockCounteractNet(structure=self.net_structure) for _ in range(self.num_of_player)]
-        self.counteract_nets = [BlockCounteractNet(structure=self.net_structure) for _ in range(self.num_of_player)]
-        self.lose_nets = [LoseNet(structure=self.net_structure) for _ in range(self.num_of_player)]
+        self.shared_nets, (self.action_nets, self.block_nets, self.counteract_nets, self.lose_nets) \
+            = self.create_advantage_nets(self.net_structure, self.num_of_player)
+
+    @staticmethod
+    def create_advantage_nets(structure: Structure, num_of_players: int) -> tuple:
+        """
+        Create a set of advantage networks
+        :param structure: the structure of the networks
+        :param num_of_players: total number of players in the game
+        :return: a tuple of the list of MultiHeadNetworks (None unless the structure is multi-head), and the
+                 lists of action, block, counteract and lose networks
+        """
+
+        if structure is not None and structure.multi_head:
+            shared = [MultiHeadNetwork(structure) for _ in range(num_of_players)]
+
+            return shared, ([x.action for x in shared], [x.block for x in shared], [x.counteract for x in shared]
+                            , [x.lose for x in shared])
+
+        return None, ([ActionNet(structure=structure) for _ in range(num_of_players)]
+                      , [BlockCounteractNet(structure=structure) for _ in range(num_of_players)]
+                      , [BlockCounteractNet(structure=structure) for _ in range(num_of_players)]
+                      , [LoseNet(structure=structure) for _ in range(num_of_players)])
+
+    @staticmethod
+    def synced_models(shared_nets: [], nets: []) -> []:
+        """
+        Get the models whose weights are sent to the traversal processes - with multi-head networks the heads share
+        their weights, so only the full models are sent
+        :param shared_nets: the MultiHeadNetworks, or None
+        :param nets: the lists of action, block, counteract and lose networks
+        :return: a list of objects with get_flat_weights and set_flat_weights
+        """
+
+        if shared_nets is not None:
+            return shared_nets
+
+        return [x for group in nets for x in group]
 
     def train_advantage_nets(self):
         """
@@ -85,27 +179,35 @@ class Trainer:
         """
         self._log.info('Training advantage networks')
         for x in range(self.num_of_player):
-            self.action_nets[x].train(self.action_mem[x])
-            self.block_nets[x].train(self.block_mem[x])
-            self.counteract_nets[x].train(self.counteract_mem[x])
-            self.lose_nets[x].train(self.lose_mem[x])
+            if self.shared_nets is not None:
+                self.shared_nets[x].train([self.action_mem[x], self.block_mem[x], self.counteract_mem[x]
+                                           , self.lose_mem[x]])
+            else:
+                self.action_nets[x].train(self.action_mem[x])
+                self.block_nets[x].train(self.block_mem[x])
+                self.counteract_nets[x].train(self.counteract_mem[x])
+                self.lose_nets[x].train(self.lose_mem[x])
 
-    def perform_run(self, num_of_processes: int, num_of_traversals: int, save_prefix: str = None):
+    def perform_run(self, num_of_processes: int, num_of_traversals: int, save_prefix: str = None
+                    , num_of_threads: int = 1):
         """
         Perform a set number of traversals, and train the strategy networks
         :param num_of_processes: number of threads to run the traversals on
         :param num_of_traversals: number of traversals to
         :param save_prefix: Save the strategy nets to files with this prefix if not none
+        :param num_of_threads: number of concurrent traversals in each process, sharing batched network queries
         """
         for t in range(num_of_traversals):
             self._log.info('Performing iteration {num}'.format(num=self.iteration + 1))
-            self.perform_iteration(num_of_processes)
+            self.perform_iteration(num_of_processes, num_of_threads)
 
             # First iteration will be close to a uniform dist - no point training!
             if save_prefix is not None and self.iteration > 1:
                 self.train_strategy_nets()
                 self.save_strategy_nets("{prefix}_i{it}.zip".format(prefix=save_prefix, it=self.iteration - 1))
 
+        self.stop_workers()
+
         if save_prefix is not None:
             self.save_stats("{prefix}_stats.csv".format(prefix=save_prefix))
         else:
@@ -122,89 +224,285 @@ class Trainer:
                                           , self.counteract_strategy_mem
                                           , self.lose_strategy_mem)
 
-    def perform_iteration(self, num_of_processes: int = 2):
+    def start_workers(self, num_of_processes: int, num_of_threads: int):
+        """
+        Start the traversal processes. Each process builds its own copy of the advantage networks once, and then
+        waits for the weights for each iteration
+        :param num_of_processes: number of processes to run the traversals on
+        :param num_of_threads: number of concurrent traversals in each process, sharing batched network queries
+        """
+
+        self.input_queue = Queue()
+
+        # Bounded, so that workers block rather than pile up results if we fall behind merging them
+        self.output_queue = Queue(maxsize=2 * num_of_processes)
+
+        self.workers = []
+        for w in range(num_of_processes):
+            task_queue = Queue()
+            process = Process(target=self.run_worker, args=(w
+                                                            , task_queue
+                                                            , self.input_queue
+                                                            , self.output_queue
+                                                            , self.traverser
+                                                            , self.net_structure
+                                                            , self.num_of_player
+                                                            , num_of_threads
+                                                            , self.chunk_size
+                                                            , self.cache_size)
+                              , daemon=True)
+            process.start()
+            self.workers.append((process, task_queue))
+
+        self.worker_config = (num_of_processes, num_of_threads)
+
+    def stop_workers(self):
+        """
+        Stop the traversal processes, if they are running
+        """
+
+        if self.workers is None:
+            return
+
+        for _, task_queue in self.workers:
+            task_queue.put(None)
+
+        for process, _ in self.workers:
+            process.join()
+
+        self.workers = None
+        self.worker_config = None
+
+    def perform_iteration(self, num_of_processes: int = 2, num_of_threads: int = 1):
         """
         Perform one iteration of the Deep CFR algorithm
         :param num_of_processes: number of threads to run the traversals on
+        :param num_of_threads: number of concurrent traversals in each process, sharing batched network queries
         """
         self.iteration += 1
         self.stats[self.iteration] = TrainerStats()
+        self.worker_stats[self.iteration] = {}
+
+        start = perf_counter()
 
-        input_queue = Queue()
-        output_queue = Queue()
+        if self.worker_config != (num_of_processes, num_of_threads):
+            self.stop_workers()
+            self.start_workers(num_of_processes, num_of_threads)
 
         # We need one game for each player in each traversal
         for k in range(self.num_of_traversals):
             for p in range(self.num_of_player):
-                input_queue.put(p)
-
-        processes = []
-
-        # Spin up our processes
-        for p in range(num_of_processes):
-            traverser = self.traverser(self.action_nets
-                                       , self.block_nets
-                                       , self.counteract_nets
-                                       , self.lose_nets
-                                       , self.iteration)
-            processes.append(Process(target=self.run_process, args=(input_queue
-                                                                    , output_queue
-                                                                    , traverser
-                                                                    , self.num_of_player)))
-            processes[p].start()
-
-        # Wait for each process to finish. When the results from a thread come through, add them to
-        # the memories
-        counter = 0
-        while counter < num_of_processes:
-            if output_queue.empty():
-                self._log.info('Queue size: {size}'.format(size=input_queue.qsize()))
-                sleep(30)
-            else:
-                x = output_queue.get()
+                self.input_queue.put(p)
 
-                for p in range(self.num_of_player):
-                    self.action_mem[p].add_bulk(x[0][p])
-                    self.block_mem[p].add_bulk(x[1][p])
-                    self.counteract_mem[p].add_bulk(x[2][p])
-                    self.lose_mem[p].add_bulk(x[3][p])
+        # Followed by a stop marker for every traversal thread
+        for _ in range(num_of_processes * num_of_threads):
+            self.input_queue.put(None)
 
-                self.action_strategy_mem.add_bulk(x[4])
-                self.block_strategy_mem.add_bulk(x[5])
-                self.counteract_strategy_mem.add_bulk(x[6])
-                self.lose_strategy_mem.add_bulk(x[7])
+        # Send the current advantage network weights to every process
+        models = self.synced_models(self.shared_nets, [self.action_nets, self.block_nets, self.counteract_nets
+                                                       , self.lose_nets])
+        weights = [x.get_flat_weights() for x in models]
 
-                self.stats[self.iteration].add_data(x[8])
+        for w, (_, task_queue) in enumerate(self.workers):
+            task_queue.put((self.iteration, weights))
+            self.worker_stats[self.iteration][w] = {'startup': 0, 'traversals': 0, 'samples': 0, 'seconds': 0}
 
+        # Merge the results into the memories as they are streamed back, until every process is finished
+        counter = 0
+        while counter < num_of_processes:
+            worker, kind, payload = self.output_queue.get()
+            worker_stats = self.worker_stats[self.iteration][worker]
+
+            if kind == 'ready':
+                worker_stats['startup'] = perf_counter() - start
+                self._log.info('Worker {w} started in {sec:.2f}s'.format(w=worker, sec=worker_stats['startup']))
+                continue
+
+            if kind == 'done':
                 counter += 1
+                self._log.info('Worker {w} finished: {t} traversals, {s} samples in {sec:.1f}s'
+                               .format(w=worker, t=worker_stats['traversals'], s=worker_stats['samples']
+                                       , sec=worker_stats['seconds']))
+                continue
+
+            results, traversals = payload
+            self.merge_results(results)
+
+            worker_stats['traversals'] += traversals
+            worker_stats['samples'] += Traverser.count_samples(results)
+            worker_stats['seconds'] = perf_counter() - start
+
+            self._log.info('Worker {w}: {t} traversals, {rate:.1f} samples/s, {left} traversals left'
+                           .format(w=worker, t=worker_stats['traversals']
+                                   , rate=worker_stats['samples'] / worker_stats['seconds']
+                                   , left=max(self.input_queue.qsize() - num_of_processes * num_of_threads, 0)))
+
+        stats = self.stats[self.iteration]
+        if stats.total_traversals > 0:
+            self._log.info('{n:.0f} nodes and {sec:.3f}s per traversal, branching by depth {b}'
+                           .format(n=stats.total_nodes_traversed / stats.total_traversals
+                                   , sec=stats.total_traversal_time / stats.total_traversals
+                                   , b=' '.join('-' if x is None else '{:.2f}'.format(x)
+                                                for x in stats.get_branching_factors())))
+
+            # Compare against the unpruned control traversals run on the same networks
+            pruning = self.traverser.pruning_policy
+            if pruning is not None and pruning.is_active(self.iteration):
+                message = 'Pruned {frac:.1%} of sampled subtrees'.format(frac=stats.get_pruned_fraction())
+
+                speedup = stats.get_pruning_speedup()
+                if speedup is not None:
+                    message += ', {time:.2f}x faster with {nodes:.2f}x fewer nodes per traversal than {c} ' \
+                               'unpruned control traversals'.format(time=speedup[0], nodes=speedup[1]
+                                                                     , c=stats.total_control_traversals)
+
+                self._log.info(message)
+
+        if not self.persistent_workers:
+            self.stop_workers()
+
+        if self.memory_path is not None:
+            for memory in self.all_memories():
+                memory.flush()
 
         # Set up and train the advantage networks
         self.init_advantage_nets()
         self.train_advantage_nets()
 
+    def merge_results(self, results: tuple):
+        """
+        Merge a chunk of results from a traverser into the memories
+        :param results: the results, as returned by Traverser.take_results
+        """
+
+        for p in range(self.num_of_player):
+            self.action_mem[p].add_bulk(results[0][p])
+            self.block_mem[p].add_bulk(results[1][p])
+            self.counteract_mem[p].add_bulk(results[2][p])
+            self.lose_mem[p].add_bulk(results[3][p])
+
+        self.action_strategy_mem.add_bulk(results[4])
+        self.block_strategy_mem.add_bulk(results[5])
+        self.counteract_strategy_mem.add_bulk(results[6])
+        self.lose_strategy_mem.add_bulk(results[7])
+
+        self.stats[self.iteration].add_data(results[8])
+
+    @staticmethod
+    def run_worker(worker: int, task_queue: Queue, input_queue: Queue, output_queue: Queue, traverser_type
+                   , structure: Structure, num_of_players: int, num_of_threads: int, chunk_size: int
+                   , cache_size: int):
+        """
+        Long-running process that performs the traversals for each iteration it is sent
+        :param worker: the ID of this process
+        :param task_queue: queue of (iteration, weights) tasks for this process. None stops the process
+        :param input_queue: input queue containing traversals that need to be done
+        :param output_queue: output queue that results from the process are streamed to
+        :param traverser_type: the type of traverser to use
+        :param structure: the structure of the advantage networks
+        :param num_of_players: total number of players in the game
+        :param num_of_threads: number of concurrent traversals, whose network queries are batched together
+        :param chunk_size: the number of samples to gather before sending them to the output queue
+        :param cache_size: the number of outputs cached in front of each network, 0 for no caches
+        """
+
+        shared_nets, nets = Trainer.create_advantage_nets(structure, num_of_players)
+
+        # A single traversal at a time makes one query at a time, which is best done incrementally - concurrent
+        # traversals are batched up by the InferenceServer instead, through compiled models
+        for group in nets:
+            for net in group:
+                if num_of_threads == 1:
+                    net.enable_incremental()
+                else:
+                    net.enable_compiled()
+
+                # Cleared whenever the weights for the next iteration are set
+                if cache_size > 0:
+                    net.enable_cache(cache_size)
+
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            iteration, weights = task
+
+            for model, w in zip(Trainer.synced_models(shared_nets, nets), weights):
+                model.set_flat_weights(w)
+
+            output_queue.put((worker, 'ready', None))
+
+            traverser = traverser_type(nets[0], nets[1], nets[2], nets[3], iteration)
+            Trainer.run_process(worker, input_queue, output_queue, traverser, num_of_players, num_of_threads
+                                , chunk_size)
+
     @staticmethod
-    def run_process(input_queue: Queue, output_queue: Queue, traverser: Traverser, num_of_players: int):
+    def run_process(worker: int, input_queue: Queue, output_queue: Queue, traverser: Traverser, num_of_players: int
+                    , num_of_threads: int = 1, chunk_size: int = 1000):
         """
-        Process that runs in each thread during game tree traversal
+        Perform the traversals for one iteration
+        :param worker: the ID of this process
         :param input_queue: input queue containing traversals that need to be done
-        :param output_queue: output queue containing results from the thread
+        :param output_queue: output queue that results from the thread are streamed to
         :param traverser: the Traverser object for this thread
         :param num_of_players: total number of players in the game
+        :param num_of_threads: number of concurrent traversals, whose network queries are batched together
+        :param chunk_size: the number of samples to gather before sending them to the output queue
+        """
+
+        if num_of_threads == 1:
+            Trainer.run_traversals(worker, input_queue, output_queue, traverser, num_of_players, chunk_size)
+        else:
+            server = InferenceServer(max_batch_size=num_of_threads)
+            server.start()
+
+            threads = [Thread(target=Trainer.run_traversals
+                              , args=(worker, input_queue, output_queue, traverser.use_server(server)
+                                      , num_of_players, chunk_size))
+                       for _ in range(num_of_threads)]
+
+            for t in threads:
+                t.start()
+
+            for t in threads:
+                t.join()
+
+            server.stop()
+
+        # Let the trainer know that this process is finished
+        output_queue.put((worker, 'done', None))
+
+    @staticmethod
+    def run_traversals(worker: int, input_queue: Queue, output_queue: Queue, traverser: Traverser
+                       , num_of_players: int, chunk_size: int):
+        """
+        Keep performing traversals until a stop marker is taken from the input queue, sending the results to the
+        output queue whenever a chunk has been gathered
+        :param worker: the ID of the process
+        :param input_queue: input queue containing traversals that need to be done
+        :param output_queue: output queue that results are streamed to
+        :param traverser: the Traverser object to use
+        :param num_of_players: total number of players in the game
+        :param chunk_size: the number of samples to gather before sending them to the output queue
         """
 
-        while not input_queue.empty():
+        traversals = 0
+
+        while True:
             p = input_queue.get()
+            if p is None:
+                break
+
             traverser.traverse(Game(num_of_players), p)
+            traversals += 1
+
+            if traverser.get_sample_count() >= chunk_size:
+                output_queue.put((worker, 'results', (traverser.take_results(), traversals)))
+                traversals = 0
 
-        output_queue.put((traverser.action_mem
-                          , traverser.block_mem
-                          , traverser.counteract_mem
-                          , traverser.lose_mem
-                          , traverser.action_strategy_mem
-                          , traverser.block_strategy_mem
-                          , traverser.counteract_strategy_mem
-                          , traverser.lose_strategy_mem
-                          , traverser.stats.get_data()))
+        if traversals > 0:
+            output_queue.put((worker, 'results', (traverser.take_results(), traversals)))
 
     def save_strategy_nets(self, file_path):
         """
@@ -1,12 +1,74 @@
 class TrainerStats:
     """Holder for stats we pick up whilst training"""
 
+    # Branching is recorded by the game length of the decision, in buckets of this many moves
+    depth_bucket_size = 4
+    depth_buckets = 16
+
     total_nodes_traversed = 0
     total_turns = 0
     total_terminal_nodes = 0
     total_hist_length = 0
     game_wins = 0
     game_loses = 0
+    cache_hits = 0
+    cache_misses = 0
+    cache_evictions = 0
+    total_traversals = 0
+    total_traversal_time = 0
+    total_pruned = 0
+    total_control_traversals = 0
+    total_control_nodes = 0
+    total_control_time = 0
+
+    def __init__(self):
+        # The number of the traversing player's decisions, and the outputs explored at them, for each depth bucket
+        self.branch_decisions = [0] * self.depth_buckets
+        self.branch_choices = [0] * self.depth_buckets
+
+    def add_branching(self, game_length: int, choices: int):
+        """
+        Record the number of outputs explored at one of the traversing player's decisions
+        :param game_length: the length of the game at the decision
+        :param choices: the number of outputs explored
+        """
+
+        bucket = min(game_length // self.depth_bucket_size, self.depth_buckets - 1)
+        self.branch_decisions[bucket] += 1
+        self.branch_choices[bucket] += choices
+
+    def get_branching_factors(self) -> []:
+        """
+        Get the average number of outputs explored at the traversing player's decisions, for each depth bucket
+        :return: a list of the branching factors, None for buckets without any decisions
+        """
+        return [c / d if d > 0 else None for d, c in zip(self.branch_decisions, self.branch_choices)]
+
+    def get_pruned_fraction(self) -> float:
+        """
+        Get the fraction of the sampled subtrees that were pruned, over every traversal including the unpruned
+        control ones
+        :return: the fraction, 0 if nothing was sampled
+        """
+
+        sampled = self.total_pruned + sum(self.branch_choices)
+        return self.total_pruned / sampled if sampled > 0 else 0
+
+    def get_pruning_speedup(self):
+        """
+        Compare the pruned traversals with the unpruned control traversals run alongside them
+        :return: a tuple of how many times less time and fewer nodes the pruned traversals took on average, or None
+                 if there weren't both
+        """
+
+        pruned = self.total_traversals - self.total_control_traversals
+        if pruned <= 0 or self.total_control_traversals <= 0 or self.total_traversal_time == self.total_control_time:
+            return None
+
+        return ((self.total_control_time / self.total_control_traversals)
+                / ((self.total_traversal_time - self.total_control_time) / pruned)
+                , (self.total_control_nodes / self.total_control_traversals)
+                / max((self.total_nodes_traversed - self.total_control_nodes) / pruned, 1))
 
     def get_data(self) -> []:
         return [self.total_nodes_traversed
@@ -14,7 +76,16 @@ class TrainerStats:
             , self.total_terminal_nodes
             , self.total_hist_length
             , self.game_wins
-            , self.game_loses]
+            , self.game_loses
+            , self.cache_hits
+            , self.cache_misses
+            , self.cache_evictions
+            , self.total_traversals
+            , self.total_traversal_time
+            , self.total_pruned
+            , self.total_control_traversals
+            , self.total_control_nodes
+            , self.total_control_time] + self.branch_decisions + self.branch_choices
 
     def add_data(self, stats: []):
         self.total_nodes_traversed += stats[0]
@@ -23,6 +94,16 @@ class TrainerStats:
         self.total_hist_length += stats[3]
         self.game_wins += stats[4]
         self.game_loses += stats[5]
+        self.cache_hits += stats[6]
+        self.cache_misses += stats[7]
+        self.cache_evictions += stats[8]
+        self.total_traversals += stats[9]
+        self.total_traversal_time += stats[10]
+        self.total_pruned += stats[11]
+        self.total_control_traversals += stats[12]
+        self.total_control_nodes += stats[13]
+        self.total_control_time += stats[14]
 
-
-
+        for x in range(self.depth_buckets):
+            self.branch_decisions[x] += stats[15 + x]
+            self.branch_choices[x] += stats[15 + self.depth_buckets + x]
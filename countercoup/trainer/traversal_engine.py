@@ -0,0 +1,206 @@
+from countercoup.model.game import Game
+from countercoup.model.items.states import SelectAction, DecideToBlock, DecideToCounteract, SelectCardsToDiscard\
+    , GameFinished, DecideToBlockCounteract, SelectCardToLose
+from countercoup.shared.networks.action_net import ActionNet
+from countercoup.shared.networks.block_counteract_net import BlockCounteractNet
+from countercoup.shared.networks.lose_net import LoseNet
+from countercoup.shared.infoset import Infoset
+from countercoup.shared.outputs import Outputs
+from countercoup.shared.tools import Tools
+from countercoup.trainer.decision import Decision
+
+
+class TraversalEngine:
+    """
+    Runs traversals without recursion. Each of the traversing player's decisions pushes its pending regret
+    calculation onto an explicit stack, along with the outputs still to be explored, and every other step of the
+    game is played in a flat loop. Each step is dispatched on the state of the game through the table of Decisions,
+    and the sampling rules come from the traverser's policies
+    """
+
+    decisions = {SelectAction: Decision('action_nets', 'action_mem', 'action_strategy_mem', ActionNet
+                                        , Tools.get_action_mask
+                                        , Tools.get_action_mask
+                                        , lambda g, x: Tools.play_choice(g, Outputs.action[x])
+                                        , 3)
+                 , DecideToBlock: Decision('block_nets', 'block_mem', 'block_strategy_mem', BlockCounteractNet
+                                           , Tools.get_choice_mask
+                                           , None
+                                           , lambda g, x: g.decide_to_block(Outputs.block_counteract[x])
+                                           , 1)
+                 , DecideToCounteract: Decision('counteract_nets', 'counteract_mem', 'counteract_strategy_mem'
+                                                , BlockCounteractNet
+                                                , Tools.get_choice_mask
+                                                , None
+                                                , lambda g, x: g.decide_to_counteract(Outputs.block_counteract[x])
+                                                , 1)
+                 , DecideToBlockCounteract: Decision('block_nets', 'block_mem', 'block_strategy_mem', BlockCounteractNet
+                                                     , Tools.get_choice_mask
+                                                     , None
+                                                     , lambda g, x: g.decide_to_block_counteract(
+                                                         Outputs.block_counteract[x])
+                                                     , 1)
+                 , SelectCardsToDiscard: Decision('lose_nets', 'lose_mem', 'lose_strategy_mem', LoseNet
+                                                  , lambda g: Tools.get_discard_mask(g.get_curr_player().cards)
+                                                  , lambda g: Tools.get_discard_mask(g.get_curr_player().cards)
+                                                  , lambda g, x: g.select_cards_to_discard(Outputs.lose[x].card1
+                                                                                           , Outputs.lose[x].card2)
+                                                  , 2)
+                 , SelectCardToLose: Decision('lose_nets', 'lose_mem', 'lose_strategy_mem', LoseNet
+                                              , lambda g: Tools.get_lose_mask(g.get_curr_player().cards)
+                                              , lambda g: Tools.get_lose_mask(g.get_curr_player().cards)
+                                              , lambda g, x: g.select_card_to_lose(Outputs.lose[x].card1)
+                                              , 1)}
+
+    @staticmethod
+    def traverse(traverser, game: Game, curr_play: int):
+        """
+        Traverse the Coup game tree
+        :param traverser: the Traverser, which gives the sampling rules and holds the networks, memories and stats
+        :param game: the Game object from the model being played
+        :param curr_play: the current player model
+        :return: the instantaneous regret value for all histories at the start
+        """
+
+        stack = []
+
+        while True:
+            value = TraversalEngine.step(traverser, game, curr_play, stack)
+            if value is None:
+                continue
+
+            # Hand the value back up the stack, until reaching a decision with outputs left to explore
+            while stack:
+                pending = stack[-1]
+                pending.values[pending.choices[len(pending.values)]] = value
+
+                if pending.snapshot is not None:
+                    game.restore(pending.snapshot)
+
+                if len(pending.values) < len(pending.choices):
+                    pending.decision.play(game, pending.choices[len(pending.values)])
+                    break
+
+                stack.pop()
+                value = traverser.calculate_regrets(pending.values
+                                                    , pending.strategy
+                                                    , pending.mask
+                                                    , getattr(traverser, pending.decision.memory)[curr_play]
+                                                    , pending.infoset
+                                                    , pending.decision.network_type.create_train_data
+                                                    , pending.sampled
+                                                    , pending.weights
+                                                    , pending.baselines)
+
+                if pending.baselines is not None:
+                    traverser.baseline_policy.update(pending.key, pending.values, len(pending.mask))
+            else:
+                return value
+
+    @staticmethod
+    def step(traverser, game: Game, curr_play: int, stack: []):
+        """
+        Take one step of a traversal from the current state of the game. At the traversing player's decisions the
+        outputs to explore are sampled, and the first is played - at everyone else's, one output is played
+        :param traverser: the Traverser
+        :param game: the Game object from the model being played
+        :param curr_play: the current player model
+        :param stack: the stack of pending regret calculations
+        :return: the value of the state if the traversal ends there (the game is finished, or cut off), else None
+        """
+
+        stats = traverser.stats
+        stats.total_nodes_traversed += 1
+
+        # If the game is finished, then return 1 if the player won the game, else -1
+        if game.state == GameFinished:
+
+            stats.total_terminal_nodes += 1
+            stats.total_hist_length += game.get_game_length()
+
+            if game.winning_player == curr_play:
+                stats.game_wins += 1
+                return 1
+            else:
+                stats.game_loses += 1
+                return -1
+
+        if traverser.is_cut_off(game):
+            return 0
+
+        infoset = Infoset(game, traverser.uses_history)
+        decision = TraversalEngine.decisions[game.state]
+
+        if game.state == SelectAction:
+            stats.total_turns += 1
+
+        if game.current_player == curr_play:
+            network = getattr(traverser, decision.nets)[curr_play]
+            mask = decision.own_mask(game)
+            advantages = traverser.get_advantages(network, infoset)
+            strategy = traverser.get_regret_strategy(network, infoset, mask, advantages=advantages)
+
+            choices = traverser.select_choices(game, strategy, mask, decision.width)
+            sampled = len(choices)
+            weights = None
+
+            if traverser.pruning is not None and advantages is not None:
+                choices, weights = traverser.pruning.prune(choices, advantages)
+                stats.total_pruned += sampled - len(choices)
+
+            stats.add_branching(game.get_game_length(), len(choices))
+
+            key = None
+            baselines = None
+
+            if traverser.baseline_policy is not None:
+                key = traverser.baseline_policy.key(decision.nets, infoset)
+                baselines = traverser.baseline_policy.get(key, len(mask))
+
+            # If every sampled output was pruned, their values are all estimated from the baselines, or as zero
+            if not choices:
+                return traverser.calculate_regrets({}, strategy, mask, getattr(traverser, decision.memory)[curr_play]
+                                                   , infoset, decision.network_type.create_train_data, sampled
+                                                   , weights, baselines)
+
+            # Only decisions that explore more than one output need to go back to where they started
+            snapshot = game.snapshot() if len(choices) > 1 else None
+
+            pending = PendingRegret(decision, infoset, strategy, mask, choices, snapshot, sampled, weights, key
+                                    , baselines)
+            stack.append(pending)
+
+            decision.play(game, pending.choices[0])
+        else:
+            network = getattr(traverser, decision.nets)[game.current_player]
+
+            strategy = traverser.opponent_strategy(game, decision, network, infoset)
+            getattr(traverser, decision.strategy_memory).append(
+                decision.network_type.create_train_data(infoset, strategy, traverser.iteration))
+
+            decision.play(game, Tools.select_from_strategy(strategy))
+
+        return None
+
+
+class PendingRegret:
+    """
+    A regret calculation waiting on the values of the outputs explored at one of the traversing player's decisions
+    """
+
+    __slots__ = ['decision', 'infoset', 'strategy', 'mask', 'choices', 'snapshot', 'sampled', 'weights', 'key'
+                 , 'baselines', 'values']
+
+    def __init__(self, decision: Decision, infoset: Infoset, strategy, mask, choices: [], snapshot, sampled: int
+                 , weights: {}, key: tuple, baselines):
+        self.decision = decision
+        self.infoset = infoset
+        self.strategy = strategy
+        self.mask = mask
+        self.choices = choices
+        self.snapshot = snapshot
+        self.sampled = sampled
+        self.weights = weights
+        self.key = key
+        self.baselines = baselines
+        self.values = {}
@@ -2,10 +2,38 @@ from countercoup.trainer.trainer_stats import TrainerStats
 from countercoup.model.game import Game
 from countercoup.shared.network import Network
 from countercoup.shared.infoset import Infoset
+from countercoup.shared.inference_server import InferenceServer
+from countercoup.trainer.traversal_engine import TraversalEngine
+from countercoup.trainer.decision import Decision
+from countercoup.trainer.sampling.width import Width
+from countercoup.trainer.sampling.selection import Selection
+from countercoup.trainer.sampling.fallback import Fallback
+from numpy import ones, maximum, count_nonzero
+from copy import copy
+from time import perf_counter
 
 
 class Traverser:
-    """Base class for traversers"""
+    """
+    Base class for traversers. Traversals are run by TraversalEngine, and the sampling scheme is made up of the
+    policies below - subclasses only need to pick them
+    """
+
+    # How many outputs are explored at the traversing player's decisions, and how they're selected
+    width_policy = Width()
+    selection_policy = Selection()
+
+    # The strategy other players play when their advantages are all zero
+    fallback_policy = Fallback()
+
+    # The game length at which a traversal is declared a draw, or None to play every game out
+    max_game_length = None
+
+    # Regret-based pruning of the outputs explored, or None to explore every output sampled
+    pruning_policy = None
+
+    # Baselines for the values of the traversing player's outputs, or None to score unsampled outputs as zero
+    baseline_policy = None
 
     def __init__(self, action_nets: [], block_nets: [], counteract_nets: [], lose_nets: [], iteration: int):
         self.action_nets = action_nets
@@ -15,6 +43,15 @@ class Traverser:
 
         self.iteration = iteration
 
+        # Each traverser gets its own width policy, as it can adapt to the traversals run by the traverser
+        self.width_policy = copy(self.width_policy)
+
+        self.prunes = self.pruning_policy is not None and self.pruning_policy.is_active(iteration)
+        self.pruning = self.pruning_policy if self.prunes else None
+
+        # The networks all share a structure, so the history is either needed for every infoset or none of them
+        self.uses_history = any(x.uses_history for x in action_nets + block_nets + counteract_nets + lose_nets)
+
         self.action_mem = [[] for _ in action_nets]
         self.block_mem = [[] for _ in block_nets]
         self.counteract_mem = [[] for _ in counteract_nets]
@@ -27,61 +64,237 @@ class Traverser:
 
         self.stats = TrainerStats()
 
-    def get_regret_strategy(self, network: Network, infoset: Infoset, filt: [] = None):
+    def use_server(self, server: InferenceServer):
         """
-        Get the strategy calculated from the advantage networks
+        Create a new traverser of the same type, with networks that send their queries through an InferenceServer
+        :param server: the server to use
+        :return: the new traverser
+        """
+
+        return type(self)([server.wrap(x) for x in self.action_nets]
+                          , [server.wrap(x) for x in self.block_nets]
+                          , [server.wrap(x) for x in self.counteract_nets]
+                          , [server.wrap(x) for x in self.lose_nets]
+                          , self.iteration)
+
+    def take_results(self) -> tuple:
+        """
+        Take the memories and stats gathered so far, leaving the traverser with empty ones
+        :return: a tuple of the memories and the stats data
+        """
+
+        self.take_cache_counts()
+
+        results = (self.action_mem
+                   , self.block_mem
+                   , self.counteract_mem
+                   , self.lose_mem
+                   , self.action_strategy_mem
+                   , self.block_strategy_mem
+                   , self.counteract_strategy_mem
+                   , self.lose_strategy_mem
+                   , self.stats.get_data())
+
+        self.action_mem = [[] for _ in self.action_mem]
+        self.block_mem = [[] for _ in self.block_mem]
+        self.counteract_mem = [[] for _ in self.counteract_mem]
+        self.lose_mem = [[] for _ in self.lose_mem]
+
+        self.action_strategy_mem = []
+        self.block_strategy_mem = []
+        self.counteract_strategy_mem = []
+        self.lose_strategy_mem = []
+
+        self.stats = TrainerStats()
+
+        return results
+
+    def take_cache_counts(self):
+        """
+        Add the hits, misses and evictions of the networks' caches since they were last taken to the stats
+        """
+
+        for net in self.action_nets + self.block_nets + self.counteract_nets + self.lose_nets:
+            if net.cache is not None:
+                hits, misses, evictions = net.cache.take_counts()
+
+                self.stats.cache_hits += hits
+                self.stats.cache_misses += misses
+                self.stats.cache_evictions += evictions
+
+    def get_sample_count(self) -> int:
+        """
+        Get the number of samples gathered since the results were last taken
+        :return: the number of samples
+        """
+        return sum(len(x) for x in self.action_mem + self.block_mem + self.counteract_mem + self.lose_mem) \
+            + len(self.action_strategy_mem) + len(self.block_strategy_mem) \
+            + len(self.counteract_strategy_mem) + len(self.lose_strategy_mem)
+
+    @staticmethod
+    def count_samples(results: tuple) -> int:
+        """
+        Count the samples in a set of results returned by take_results
+        :param results: the results
+        :return: the number of samples
+        """
+        return sum(len(x) for mem in results[0:4] for x in mem) + sum(len(x) for x in results[4:8])
+
+    def get_advantages(self, network: Network, infoset: Infoset):
+        """
+        Get the advantages predicted by a network
         :param network: the network to calculate the advantages
         :param infoset: the infoset for the game state
-        :param filt: the outputs that we're allowed to output
-        :return: a dict of available actions and the strategy
+        :return: an array of the advantages over the outputs of the network, or None on the first iteration
         """
 
         # If we're on the first iteration, don't bother using the NNs. Speeds up this iteration, and
         # resolves issues where the networks don't zero correctly.
         if self.iteration == 1:
-            output = {x: 0 for x in (filt if filt is not None else network.outputs)}
-        else:
-            output = network.get_output(infoset, filt)
+            return None
+
+        return network.get_output_vector(infoset)
+
+    def get_regret_strategy(self, network: Network, infoset: Infoset, mask=None, game: Game = None
+                            , advantages=None):
+        """
+        Get the strategy calculated from the advantage networks
+        :param network: the network to calculate the advantages
+        :param infoset: the infoset for the game state
+        :param mask: the outputs that we're allowed to output, as a boolean array. Defaults to all of them
+        :param game: the game, to play the fallback policy's strategy if all the advantages are zero. Defaults to
+                     a uniform strategy over the mask
+        :param advantages: the advantages, if they've already been taken from get_advantages
+        :return: an array of the strategy over the outputs of the network, zero for outputs not allowed
+        """
 
-        total = sum(filter(lambda x: x > 0, output.values()))
+        if mask is None:
+            mask = ones(len(network.outputs), dtype=bool)
 
-        if total == 0:
-            return {x: 1 / len(output) for x in output}
+        if advantages is None:
+            advantages = self.get_advantages(network, infoset)
+
+        if advantages is None:
+            total = 0
         else:
-            return {x: (output[x] if output[x] > 0 else 0) / total for x in output}
+            positive = maximum(advantages, 0) * mask
+            total = positive.sum()
 
-    def calculate_regrets(self, values: {}, strategy: {}, memory: [], infoset: Infoset, output_formatter):
+        if total == 0 and game is not None:
+            return self.fallback_policy.get_strategy(game, mask)
+        elif total == 0:
+            return mask / count_nonzero(mask)
+        else:
+            return positive / total
+
+    def calculate_regrets(self, values: {}, strategy, mask, memory: [], infoset: Infoset, output_formatter
+                          , sampled: int = None, weights: {} = None, baselines=None):
         """
         Calculate the regret values (and insert them into memory)
-        :param values: the advantage values
-        :param strategy: the calculated strategy
+        :param values: the advantage values, keyed by output index
+        :param strategy: the calculated strategy, as an array over the outputs
+        :param mask: the outputs that were available, as a boolean array
         :param memory: the memory to insert the calculated regrets into
         :param infoset: the infoset for the game state
         :param output_formatter: a function that formats the regret data before being inserted into the memory
+        :param sampled: the number of outputs sampled, if some of them were pruned. Defaults to the number of values
+        :param weights: the weight of each value, keyed by output index, if some of the outputs could be pruned
+        :param baselines: the baseline value of each output, as an array over the outputs, for variance reduction
         :return: the total instr_regret
         """
 
+        # Calculate the scale factor - for robust sampling, it is the inverse of the fraction of actions selected
+        scale_factor = count_nonzero(mask) / (len(values) if sampled is None else sampled)
+
+        if weights is not None:
+            values = {x: values[x] * weights[x] for x in values}
+
+        if baselines is not None:
+            # Every output is estimated from its baseline, with the explored ones corrected by their sampled values
+            estimates = baselines * mask
+            for x in values:
+                estimates[x] += (values[x] - baselines[x] * (1 if weights is None else weights[x])) * scale_factor
+
+            instr_regret = float((strategy * estimates).sum())
+            memory.append(output_formatter(infoset, (estimates - instr_regret) * mask, self.iteration))
+
+            return instr_regret
+
         instr_regret = 0
 
         for x in values:
             instr_regret += strategy[x] * values[x]
 
-        # Calculate the scale factor - for robust sampling, it is the inverse of the fraction of actions selected
-        scale_factor = len(strategy) / len(values)
-
         # Scale the instantaneous regret by the scale factor
-        instr_regret *= scale_factor
+        instr_regret = float(instr_regret) * scale_factor
 
-        new_regrets = {}
-        for x in strategy:
-            if x in values:
-                new_regrets[x] = (values[x] * scale_factor) - instr_regret
-            else:
-                new_regrets[x] = 0 - instr_regret
+        new_regrets = mask * -instr_regret
+        for x in values:
+            new_regrets[x] += values[x] * scale_factor
 
         memory.append(output_formatter(infoset, new_regrets, self.iteration))
 
         return instr_regret
 
-    def traverse(self, game: Game, curr_play: int) -> int:
-        pass
+    def traverse(self, game: Game, curr_play: int) -> float:
+        """
+        Traverse the Coup game tree
+        :param game: the Game object from the model being played
+        :param curr_play: the current player model
+        :return: the instantaneous regret value for all histories at this prefix
+        """
+
+        # Some traversals on pruned iterations are left unpruned, to measure the pruned ones against
+        if self.prunes:
+            self.pruning = None if self.pruning_policy.is_control() else self.pruning_policy
+
+        nodes = self.stats.total_nodes_traversed
+        start = perf_counter()
+
+        value = TraversalEngine.traverse(self, game, curr_play)
+
+        seconds = perf_counter() - start
+        nodes = self.stats.total_nodes_traversed - nodes
+        self.stats.total_traversals += 1
+        self.stats.total_traversal_time += seconds
+        self.width_policy.update(nodes, seconds)
+
+        if self.prunes and self.pruning is None:
+            self.stats.total_control_traversals += 1
+            self.stats.total_control_nodes += nodes
+            self.stats.total_control_time += seconds
+
+        return value
+
+    def is_cut_off(self, game: Game) -> bool:
+        """
+        Check whether a traversal stops at a game state, scoring it as a draw
+        :param game: the game
+        :return: True if the traversal stops
+        """
+        return self.max_game_length is not None and game.get_game_length() >= self.max_game_length
+
+    def select_choices(self, game: Game, strategy, mask, width: int) -> []:
+        """
+        Choose the outputs explored at one of the traversing player's decisions, with the width and selection
+        policies
+        :param game: the game
+        :param strategy: the regret strategy at the decision
+        :param mask: the legal outputs, as a boolean array
+        :param width: the most outputs explored at this type of decision
+        :return: a list of the indexes of the outputs to explore
+        """
+        return self.selection_policy.select(strategy, mask
+                                            , min(self.width_policy.get_width(game, width), count_nonzero(mask)))
+
+    def opponent_strategy(self, game: Game, decision: Decision, network: Network, infoset: Infoset):
+        """
+        Get the strategy played at another player's decision
+        :param game: the game
+        :param decision: the Decision for the state of the game
+        :param network: the player's network for the decision
+        :param infoset: the infoset for the game state
+        :return: an array of the strategy over the outputs of the network
+        """
+        return self.get_regret_strategy(network, infoset, None if decision.opponent_mask is None
+                                        else decision.opponent_mask(game), game)
@@ -0,0 +1,12 @@
+from countercoup.trainer.traverser import Traverser
+from countercoup.trainer.sampling.width import BudgetWidth
+
+
+class Budgeted(Traverser):
+    """
+    Limited robust traversals, with the branching adjusted to a budget of nodes per traversal. For another budget,
+    subclass with a different BudgetWidth
+    """
+
+    width_policy = BudgetWidth(nodes=2000)
+    max_game_length = 50
@@ -0,0 +1,10 @@
+from countercoup.trainer.traversers.limited_robust import LimitedRobust
+from countercoup.trainer.sampling.pruning import Pruning
+
+
+class Pruned(LimitedRobust):
+    """
+    Limited robust traversals with regret-based pruning
+    """
+
+    pruning_policy = Pruning()
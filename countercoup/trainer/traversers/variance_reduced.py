@@ -0,0 +1,11 @@
+from countercoup.trainer.traversers.outcome import Outcome
+from countercoup.trainer.sampling.baseline import Baseline
+
+
+class VarianceReduced(Outcome):
+    """
+    Traverser for variance-reduced outcome sampling - select one action per turn, and estimate the rest from
+    baselines
+    """
+
+    baseline_policy = Baseline()
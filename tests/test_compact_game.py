@@ -0,0 +1,43 @@
+from countercoup.model.game import Game
+from countercoup.model.compact_game import CompactGame
+from countercoup.model.items.states import GameFinished
+from countercoup.shared.tools import Tools
+from random import seed, Random
+import pytest
+
+
+def replay(num_of_players: int, random_seed: int):
+    """
+    Play a seeded game of random moves with Game, and replay the moves on a CompactGame with the same seed,
+    checking the packed states match after every move
+    :param num_of_players: number of players in the game
+    :param random_seed: the seed for the game
+    """
+
+    seed(random_seed)
+    rng = Random(random_seed)
+
+    game = Game(num_of_players)
+    moves = []
+    states = [CompactGame.from_game(game).buffer]
+
+    while game.state != GameFinished and game.get_game_length() < 100:
+        move = rng.choice(Tools.get_choices(game))
+        Tools.play_choice(game, move)
+        moves.append(move)
+        states.append(CompactGame.from_game(game).buffer)
+
+    seed(random_seed)
+    compact = CompactGame(num_of_players)
+    assert compact.buffer == states[0], 'game {s} differs at the start'.format(s=random_seed)
+
+    for n, move in enumerate(moves):
+        Tools.play_choice(compact, move)
+        assert compact.buffer == states[n + 1], 'game {s} differs after move {n}'.format(s=random_seed, n=n)
+
+
+@pytest.mark.parametrize('num_of_players', [2, 3, 4, 5, 6])
+def test_compact_game_matches_game(num_of_players):
+    for s in range(2000):
+        replay(num_of_players, s)
+
@@ -0,0 +1,84 @@
+from countercoup.model.game import Game
+from countercoup.shared.networks.action_net import ActionNet
+from countercoup.shared.networks.block_counteract_net import BlockCounteractNet
+from countercoup.shared.networks.lose_net import LoseNet
+from countercoup.shared.structures.lstm import LSTMNet
+from countercoup.trainer.recursive import outcome, limited_robust, full_robust, strategy_optimised, timid_biased
+from countercoup.trainer.traversers.outcome import Outcome
+from countercoup.trainer.traversers.limited_robust import LimitedRobust
+from countercoup.trainer.traversers.full_robust import FullRobust
+from countercoup.trainer.traversers.strategy_optimised import StrategyOptimised
+from countercoup.trainer.traversers.timid_biased import TimidBiased
+from keras.utils import set_random_seed
+from numpy import array_equal
+from random import seed
+import pytest
+
+# Each recursive traverser, and the traverser built from sampling policies that should match it
+pairs = [(outcome.Outcome, Outcome)
+         , (limited_robust.LimitedRobust, LimitedRobust)
+         , (full_robust.FullRobust, FullRobust)
+         , (strategy_optimised.StrategyOptimised, StrategyOptimised)
+         , (timid_biased.TimidBiased, TimidBiased)]
+
+
+@pytest.fixture(scope='module')
+def nets():
+    """
+    Untrained advantage networks with fixed weights, shared by all four players to save building sixteen models.
+    Their advantages aren't zero, so from the second iteration the strategies aren't uniform
+    """
+
+    set_random_seed(0)
+    nets = []
+
+    for network_type in [ActionNet, BlockCounteractNet, BlockCounteractNet, LoseNet]:
+        net = network_type(structure=LSTMNet)
+        net.enable_incremental()
+        nets.append([net] * 4)
+
+    return nets
+
+
+def run(traverser_type, nets: [], iteration: int, seeds: []) -> tuple:
+    """
+    Run a seeded traversal for each seed, with the traversing player also taken from the seed
+    :param traverser_type: the type of traverser
+    :param nets: the advantage networks
+    :param iteration: the iteration
+    :param seeds: the seed of each traversal
+    :return: a tuple of the values of the traversals, the samples in every memory and the nodes traversed
+    """
+
+    traverser = traverser_type(nets[0], nets[1], nets[2], nets[3], iteration)
+    values = []
+
+    for s in seeds:
+        seed(s)
+        values.append(traverser.traverse(Game(4), s % 4))
+
+    nodes = traverser.stats.total_nodes_traversed
+    results = traverser.take_results()
+
+    return values, [x for mem in results[0:4] for x in mem] + list(results[4:8]), nodes
+
+
+def same_sample(a: tuple, b: tuple) -> bool:
+    return len(a[0]) == len(b[0]) and all(array_equal(x, y) for x, y in zip(a[0], b[0])) \
+        and array_equal(a[1], b[1]) and array_equal(a[2], b[2])
+
+
+# Traversal trees vary hugely in size from the second iteration, and without a cut off FullRobust can recurse too
+# deep for the recursive version, so only seeds whose trees are small for every traverser are used there
+@pytest.mark.parametrize('iteration, seeds', [(1, range(10)), (2, [1, 3, 7])])
+@pytest.mark.parametrize('recursive_type, engine_type', pairs)
+def test_engine_matches_recursive(nets, recursive_type, engine_type, iteration, seeds):
+    recursive_values, recursive_memories, recursive_nodes = run(recursive_type, nets, iteration, seeds)
+    engine_values, engine_memories, engine_nodes = run(engine_type, nets, iteration, seeds)
+
+    assert engine_values == recursive_values
+    assert engine_nodes == recursive_nodes
+
+    for n, (x, y) in enumerate(zip(recursive_memories, engine_memories)):
+        assert len(x) == len(y), 'memory {n} has a different number of samples'.format(n=n)
+        assert all(same_sample(a, b) for a, b in zip(x, y)), 'memory {n} has different samples'.format(n=n)